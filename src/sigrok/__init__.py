@@ -1 +1,145 @@
-from sigrok.sigrok import *
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sigrok.sigrok import (
+        AnalogPacket,
+        Channel,
+        ChannelGroup,
+        ChannelType,
+        ConfigKey,
+        ConfigKeyInfo,
+        Device,
+        DeviceConfig,
+        DeviceConfigSnapshot,
+        DeviceConfiguration,
+        DeviceDriver,
+        DeviceNotFoundError,
+        EndPacket,
+        HeaderPacket,
+        IOCondition,
+        LogicPacket,
+        MetaPacket,
+        Packet,
+        ReplaySession,
+        Session,
+        Sigrok,
+        SigrokArgError,
+        SigrokBugError,
+        SigrokCError,
+        SigrokChannelGroupError,
+        SigrokChannelGroupNotFoundError,
+        SigrokChannelNotFoundError,
+        SigrokCUnknownError,
+        SigrokDataError,
+        SigrokDeviceClosedError,
+        SigrokDriverNotFoundError,
+        SigrokError,
+        SigrokGenericError,
+        SigrokInputFormatNotFoundError,
+        SigrokIOError,
+        SigrokMallocError,
+        SigrokNotApplicableError,
+        SigrokSampleRateError,
+        SigrokSubinterpreterError,
+        SigrokTimeoutError,
+        SigrokTransformNotFoundError,
+        Source,
+        TransformModule,
+        TransformOption,
+        live_resources,
+        parse_packet,
+    )
+
+# everything is resolved on first access, so importing sigrok neither loads
+# libsigrok nor any submodule which is not used
+_Submodules = (
+    "bindings",
+    "export",
+    "library",
+    "logic",
+    "polling",
+    "preview",
+    "profiling",
+    "resources",
+    "search",
+    "sigrok",
+    "staging",
+    "testing",
+    "transforms",
+    "tuning",
+    "watch",
+    "windows",
+)
+
+# enums mirroring libsigrok definitions load the C library when they are built,
+# so they are left out of __all__ and only resolved when imported by name
+_LibraryEnums = ("ChannelType", "ConfigKey")
+
+__all__ = [
+    "AnalogPacket",
+    "Channel",
+    "ChannelGroup",
+    "ConfigKeyInfo",
+    "Device",
+    "DeviceConfig",
+    "DeviceConfigSnapshot",
+    "DeviceConfiguration",
+    "DeviceDriver",
+    "DeviceNotFoundError",
+    "EndPacket",
+    "HeaderPacket",
+    "IOCondition",
+    "LogicPacket",
+    "MetaPacket",
+    "Packet",
+    "ReplaySession",
+    "Session",
+    "Sigrok",
+    "SigrokArgError",
+    "SigrokBugError",
+    "SigrokCError",
+    "SigrokCUnknownError",
+    "SigrokChannelGroupError",
+    "SigrokChannelGroupNotFoundError",
+    "SigrokChannelNotFoundError",
+    "SigrokDataError",
+    "SigrokDeviceClosedError",
+    "SigrokDriverNotFoundError",
+    "SigrokError",
+    "SigrokGenericError",
+    "SigrokIOError",
+    "SigrokInputFormatNotFoundError",
+    "SigrokMallocError",
+    "SigrokNotApplicableError",
+    "SigrokSampleRateError",
+    "SigrokSubinterpreterError",
+    "SigrokTimeoutError",
+    "SigrokTransformNotFoundError",
+    "Source",
+    "TransformModule",
+    "TransformOption",
+    "live_resources",
+    "parse_packet",
+]
+if TYPE_CHECKING:
+    # the enums are exports to type checkers, star imports leave them out
+    __all__ += ["ChannelType", "ConfigKey"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _Submodules:
+        return importlib.import_module(f"sigrok.{name}")
+    if not name.startswith("__"):
+        try:
+            value = getattr(importlib.import_module("sigrok.sigrok"), name)
+        except AttributeError:
+            pass
+        else:
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__, *_LibraryEnums, *_Submodules})
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import importlib
+import json
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Protocol
+
+import numpy as np
+
+from sigrok.sigrok import AnalogPacket, EndPacket, LogicPacket
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+    from types import TracebackType
+
+    import numpy.typing as npt
+    from typing_extensions import Self
+
+    from sigrok.sigrok import Device, Packet, Session
+
+# every chunk becomes one row:
+#   sample_index: int64, index of the first logic sample in the chunk
+#   num_samples: int64, number of logic samples in the chunk
+#   timestamp: float64, seconds since the start of the capture (needs a samplerate)
+# captures without logic channels count analog samples (per channel) instead
+#   <logic channel>: binary, one bit per sample, least significant bit first
+#   <analog channel>: list<float32>, analog values received within the chunk
+Columns = dict[str, Any]
+
+
+class ChunkWriter(Protocol):
+    def write_chunk(self, columns: Columns) -> None: ...
+
+    def close(self, metadata: dict[str, Any]) -> None: ...
+
+
+class NpzChunkWriter:
+    """writes one .npz file per chunk plus a manifest.json, needs only numpy"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._chunks: list[str] = []
+
+    def write_chunk(self, columns: Columns) -> None:
+        name = f"chunk-{len(self._chunks):06}.npz"
+        arrays: dict[str, Any] = {
+            column: np.frombuffer(value, dtype=np.uint8)
+            if isinstance(value, bytes)
+            else np.asarray(value)
+            for column, value in columns.items()
+        }
+        np.savez(self.path / name, **arrays)
+        self._chunks.append(name)
+
+    def close(self, metadata: dict[str, Any]) -> None:
+        (self.path / "manifest.json").write_text(
+            json.dumps({**metadata, "chunks": self._chunks}, indent=2)
+        )
+
+
+class ParquetChunkWriter:
+    """
+    writes each chunk as a row group of a single parquet file, needs pyarrow.
+    the schema is taken from the first chunk, all chunks must have its columns
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._pa = importlib.import_module("pyarrow")
+        self._pq = importlib.import_module("pyarrow.parquet")
+        self._writer: Any = None
+
+    def _schema(self, columns: Columns) -> Any:
+        pa = self._pa
+        fields = []
+        for name, value in columns.items():
+            if isinstance(value, bytes):
+                fields.append(pa.field(name, pa.binary()))
+            elif isinstance(value, np.ndarray):
+                fields.append(pa.field(name, pa.list_(pa.float32())))
+            elif isinstance(value, float):
+                fields.append(pa.field(name, pa.float64()))
+            else:
+                fields.append(pa.field(name, pa.int64()))
+        return pa.schema(fields)
+
+    def write_chunk(self, columns: Columns) -> None:
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, self._schema(columns))
+        if set(columns) != set(names := self._writer.schema.names):
+            raise ValueError(
+                f"chunk columns {sorted(columns)} differ from the schema {names}"
+            )
+        self._writer.write_table(
+            self._pa.Table.from_pylist([columns], schema=self._writer.schema)
+        )
+
+    def close(self, metadata: dict[str, Any]) -> None:
+        if self._writer is None:
+            return
+        self._writer.add_key_value_metadata({"sigrok": json.dumps(metadata)})
+        self._writer.close()
+
+
+def open_chunk_writer(
+    path: Path, writer: Literal["auto", "parquet", "npz"] = "auto"
+) -> ChunkWriter:
+    """parquet files get the suffix .parquet, npz chunks go into the directory `path`"""
+    if writer == "auto":
+        try:
+            return ParquetChunkWriter(path.with_suffix(".parquet"))
+        except ImportError:
+            return NpzChunkWriter(path)
+    if writer == "parquet":
+        return ParquetChunkWriter(path.with_suffix(".parquet"))
+    return NpzChunkWriter(path)
+
+
+class ExportStats(NamedTuple):
+    chunks: int
+    logic_samples: int
+    analog_samples: int
+
+
+class ColumnarExporter:
+    """
+    streams logic and analog packets into fixed-size chunks of columns,
+    buffering at most one chunk in memory. the given channels are columns of
+    every chunk, even before their first samples arrived.
+    chunks follow the logic samples, analog values are added to the chunk
+    they arrived in. captures without logic are chunked by analog samples
+    """
+
+    def __init__(
+        self,
+        writer: ChunkWriter,
+        *,
+        logic_channels: Mapping[str, int] | None = None,
+        analog_channels: Iterable[str] = (),
+        samplerate: int | None = None,
+        chunk_samples: int = 1 << 20,
+    ) -> None:
+        if chunk_samples < 8 or chunk_samples % 8:  # noqa: PLR2004 bits per byte
+            raise ValueError(f"chunk_samples must be a multiple of 8: {chunk_samples}")
+
+        self._writer = writer
+        self._logic_channels = dict(logic_channels) if logic_channels else None
+        self.samplerate = samplerate
+        self.chunk_samples = chunk_samples
+
+        self._unitsize = 0
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._analog: dict[str, list[npt.NDArray[np.float32]]] = {
+            channel: [] for channel in analog_channels
+        }
+        # samples buffered per analog channel, and the index of the first one
+        self._analog_buffered: dict[str, int] = {}
+        self._analog_index = 0
+        self._sample_index = 0
+        self._chunks = 0
+        self._analog_samples = 0
+        self._closed = False
+
+    @classmethod
+    def for_device(
+        cls,
+        path: Path,
+        device: Device,
+        *,
+        samplerate: int | None = None,
+        chunk_samples: int = 1 << 20,
+        writer: Literal["auto", "parquet", "npz"] = "auto",
+    ) -> Self:
+        enabled = [ch for ch in device.channels() if ch.enabled]
+        return cls(
+            open_chunk_writer(path, writer),
+            logic_channels={
+                ch.name: ch.index for ch in enabled if ch.type.name == "Logic"
+            },
+            analog_channels=[ch.name for ch in enabled if ch.type.name == "Analog"],
+            samplerate=samplerate,
+            chunk_samples=chunk_samples,
+        )
+
+    @property
+    def stats(self) -> ExportStats:
+        return ExportStats(
+            chunks=self._chunks,
+            logic_samples=self._sample_index + self._buffered,
+            analog_samples=self._analog_samples,
+        )
+
+    def feed(self, packet: Packet) -> None:
+        if isinstance(packet, LogicPacket):
+            self.feed_logic(packet.data, packet.unitsize)
+        elif isinstance(packet, AnalogPacket):
+            self.feed_analog(packet.channels, packet.data)
+        elif isinstance(packet, EndPacket):
+            self.flush()
+
+    def feed_logic(self, data: bytes, unitsize: int) -> None:
+        if self._unitsize != unitsize:
+            self.flush()
+            self._unitsize = unitsize
+            self._buffer = bytearray(self.chunk_samples * unitsize)
+
+        view = memoryview(data)
+        while view:
+            free = (self.chunk_samples - self._buffered) * unitsize
+            start = self._buffered * unitsize
+            take = min(free, len(view))
+            self._buffer[start : start + take] = view[:take]
+            self._buffered += take // unitsize
+            view = view[take:]
+            if self._buffered == self.chunk_samples:
+                self.flush()
+
+    def feed_analog(self, channels: list[str], data: bytes) -> None:
+        values = np.frombuffer(data, dtype=np.float32)
+        # packets carrying several channels are interleaved sample by sample
+        for offset, channel in enumerate(channels):
+            self._analog.setdefault(channel, []).append(values[offset :: len(channels)])
+        samples = len(values) // len(channels)
+        for channel in channels:
+            self._analog_buffered[channel] = (
+                self._analog_buffered.get(channel, 0) + samples
+            )
+        self._analog_samples += len(values)
+        # with logic, the logic samples decide where chunks end
+        if self._analog_only and self._analog_samples_buffered >= self.chunk_samples:
+            self.flush()
+
+    @property
+    def _analog_only(self) -> bool:
+        return not self._unitsize and not self._logic_channels
+
+    @property
+    def _analog_samples_buffered(self) -> int:
+        return max(self._analog_buffered.values(), default=0)
+
+    def flush(self) -> None:
+        analog_samples = self._analog_samples_buffered
+        if not self._buffered and not analog_samples:
+            return
+
+        if self._analog_only:
+            sample_index, num_samples = self._analog_index, analog_samples
+        else:
+            sample_index, num_samples = self._sample_index, self._buffered
+        columns: Columns = {"sample_index": sample_index, "num_samples": num_samples}
+        if self.samplerate:
+            columns["timestamp"] = sample_index / self.samplerate
+
+        if not self._unitsize:
+            for name in self._logic_channels or {}:
+                columns[name] = b""
+        else:
+            samples = np.frombuffer(
+                self._buffer, dtype=np.uint8, count=self._buffered * self._unitsize
+            ).reshape(-1, self._unitsize)
+            channels = self._logic_channels or {
+                f"D{idx}": idx for idx in range(self._unitsize * 8)
+            }
+            for name, idx in channels.items():
+                bits = (samples[:, idx // 8] >> (idx % 8)) & 1
+                columns[name] = np.packbits(bits, bitorder="little").tobytes()
+
+        for channel, values in self._analog.items():
+            columns[channel] = (
+                np.concatenate(values) if values else np.empty(0, dtype=np.float32)
+            )
+
+        self._writer.write_chunk(columns)
+        self._chunks += 1
+        self._sample_index += self._buffered
+        self._buffered = 0
+        self._analog = {channel: [] for channel in self._analog}
+        self._analog_buffered.clear()
+        self._analog_index += analog_samples
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._writer.close(
+            {
+                "samplerate": self.samplerate,
+                "chunk_samples": self.chunk_samples,
+                "logic_channels": self._logic_channels,
+                "analog_channels": list(self._analog),
+                "logic_samples": self._sample_index,
+                "analog_samples": self._analog_samples,
+            }
+        )
+        self._closed = True
+
+    def export(self, session: Session, timeout: float | None = None) -> ExportStats:
+        while not isinstance(packet := session.next_packet(timeout=timeout), EndPacket):
+            self.feed(packet)
+        self.close()
+        return self.stats
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,176 @@
+import contextlib
+import hashlib
+import importlib.metadata
+import importlib.resources
+import logging
+import os
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+import pkgconfig  # type: ignore[import-untyped]
+import platformdirs
+from pyclibrary import CLibrary, CParser  # type: ignore[import-untyped]
+
+
+class LibPaths(NamedTuple):
+    libsigrok: Path
+    libsigrok_includes: Path
+    glib_includes: Path
+
+
+def windows_lib_paths(dll_path: Path) -> LibPaths:
+    return LibPaths(
+        libsigrok=dll_path / "libsigrok.dll",
+        libsigrok_includes=dll_path / "include/libsigrok",
+        glib_includes=dll_path / "include/glib",
+    )
+
+
+@contextlib.contextmanager
+def platform_lib_paths() -> Iterator[LibPaths]:
+    platform: str
+    if sys.platform.startswith("linux"):
+        platform = "linux"
+    elif sys.platform == "darwin":
+        platform = "macos"
+    elif sys.platform.startswith("win"):
+        platform = "windows"
+    else:
+        raise RuntimeError(f"unsupported platform: {sys.platform}")
+
+    if platform == "windows":
+        target = "x86_64" if sys.maxsize > 2**32 else "i686"
+        with importlib.resources.path(
+            "sigrok", f"libsigrok-windows-{target}"
+        ) as dll_path:
+            yield windows_lib_paths(dll_path)
+    else:
+        libsigrok_config = pkgconfig.variables("libsigrok")
+        glib_config = pkgconfig.variables("glib-2.0")
+
+        yield LibPaths(
+            libsigrok=Path(libsigrok_config["libdir"], "libsigrok").with_suffix(
+                ".dylib" if platform == "macos" else ".so"
+            ),
+            libsigrok_includes=Path(libsigrok_config["includedir"], "libsigrok"),
+            glib_includes=Path(glib_config["includedir"], "glib-2.0/glib"),
+        )
+
+
+HeaderFiles = (
+    "libsigrok/libsigrok.h",
+    "libsigrok/version.h",
+    "libsigrok/proto.h",
+    "glib/gslist.h",
+    "glib/gtypes.h",
+    "glib/gvariant.h",
+    "glib/gvarianttype.h",
+    "glib/garray.h",
+    "glib/ghash.h",
+    "glib/gmain.h",
+    "glib/gpoll.h",
+    "glib/gstring.h",
+    "package/fixes.h",
+)
+
+
+def header_paths(lib_paths: LibPaths, package_includes: Path) -> list[Path]:
+    include_dirs = {
+        "libsigrok": lib_paths.libsigrok_includes,
+        "glib": lib_paths.glib_includes,
+        "package": package_includes,
+    }
+    return [
+        (include_dirs[directory] / name).absolute()
+        for directory, name in (header.split("/") for header in HeaderFiles)
+    ]
+
+
+def cache_key(headers: list[Path], library: Path) -> str:
+    digest = hashlib.sha256(importlib.metadata.version("pyclibrary").encode())
+    for path in [*headers, library.resolve()]:
+        digest.update(path.name.encode())
+        with path.open("rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def cache_filename(key: str) -> str:
+    return f"libsigrok.{key}.pyclibrary.cache"
+
+
+@contextlib.contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    with path.open("a+b") as f:
+        if sys.platform.startswith("win"):
+            import msvcrt
+
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 attempts
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_cache_atomic(parser: CParser, cache_path: Path) -> None:
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        parser.write_cache(str(tmp_path))
+        tmp_path.replace(cache_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_parser(headers: list[Path], library: Path) -> CParser:
+    parser = CParser([str(header) for header in headers], process_all=False)
+    filename = cache_filename(cache_key(headers, library))
+
+    # caches are keyed by content, there is no need for pyclibrary's mtime checks
+    with importlib.resources.as_file(
+        importlib.resources.files("sigrok") / "cache" / filename
+    ) as prebuilt_path:
+        if prebuilt_path.is_file() and parser.load_cache(str(prebuilt_path)):
+            return parser
+
+    cache_dir = platformdirs.user_cache_path("python-sigrok", ensure_exists=True)
+    cache_path = cache_dir / filename
+    with file_lock(cache_dir / f"{filename}.lock"):
+        # another process may have written the cache while we waited for the lock
+        if cache_path.is_file() and parser.load_cache(str(cache_path)):
+            return parser
+
+        logging.getLogger("sigrok").warning(
+            "parsing header files on first invocation. this may take a while!"
+        )
+        parser.process_all()
+        write_cache_atomic(parser, cache_path)
+    return parser
+
+
+def load_library() -> CLibrary:
+    with (
+        platform_lib_paths() as lib_paths,
+        importlib.resources.path("sigrok", "include") as package_includes,
+    ):
+        return CLibrary(
+            str(lib_paths.libsigrok.absolute()),
+            load_parser(header_paths(lib_paths, package_includes), lib_paths.libsigrok),
+        )
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+
+def sample_count(data: bytes | memoryview, unitsize: int) -> int:
+    return len(data) // unitsize
+
+
+def unpack_channels(data: bytes | memoryview, unitsize: int) -> npt.NDArray[np.uint8]:
+    """returns a (samples, unitsize * 8) array with one 0/1 column per channel"""
+    samples = np.frombuffer(
+        data, dtype=np.uint8, count=sample_count(data, unitsize) * unitsize
+    ).reshape(-1, unitsize)
+    return np.unpackbits(samples, axis=1, bitorder="little")
+
+
+def sample_words(data: bytes | memoryview, unitsize: int) -> npt.NDArray[np.uint64]:
+    """returns one little-endian integer per sample, bit n being channel n"""
+    count = sample_count(data, unitsize)
+    if unitsize in (1, 2, 4, 8):
+        return np.frombuffer(data, dtype=f"<u{unitsize}", count=count).astype(np.uint64)
+    padded = np.zeros((count, 8), dtype=np.uint8)
+    padded[:, :unitsize] = np.frombuffer(
+        data, dtype=np.uint8, count=count * unitsize
+    ).reshape(-1, unitsize)
+    return padded.view("<u8").ravel().astype(np.uint64)
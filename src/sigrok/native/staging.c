@@ -0,0 +1,170 @@
+/*
+ * datafeed callback which copies logic payloads into a single-producer
+ * single-consumer ring buffer without entering python.
+ * all other packets are forwarded to a (python) callback.
+ *
+ * records are 8-byte aligned: [sdi][length][unitsize][payload, padded]
+ * a record with length UINT64_MAX marks the wrap around to the buffer start.
+ */
+#include <stdatomic.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include <libsigrok/libsigrok.h>
+
+#if defined(_WIN32)
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT __attribute__((visibility("default")))
+#endif
+
+#define HEADER_SIZE (3 * sizeof(uint64_t))
+#define WRAP UINT64_MAX
+#define ALIGN8(size) (((size) + 7) & ~(size_t)7)
+
+typedef void (*forward_callback)(const struct sr_dev_inst *sdi,
+                                 const struct sr_datafeed_packet *packet,
+                                 void *cb_data);
+
+struct sigrok_staging {
+    uint8_t *buffer;
+    size_t capacity;
+    /* only written by the producer */
+    _Atomic size_t head;
+    /* only written by the consumer */
+    _Atomic size_t tail;
+    _Atomic uint64_t written;
+    _Atomic uint64_t dropped;
+    forward_callback forward;
+    void *forward_data;
+};
+
+EXPORT struct sigrok_staging *sigrok_staging_new(size_t capacity,
+                                                 forward_callback forward,
+                                                 void *forward_data)
+{
+    struct sigrok_staging *staging = calloc(1, sizeof(*staging));
+    if (!staging)
+        return NULL;
+    staging->capacity = ALIGN8(capacity);
+    staging->buffer = malloc(staging->capacity);
+    if (!staging->buffer) {
+        free(staging);
+        return NULL;
+    }
+    staging->forward = forward;
+    staging->forward_data = forward_data;
+    return staging;
+}
+
+EXPORT void sigrok_staging_free(struct sigrok_staging *staging)
+{
+    if (!staging)
+        return;
+    free(staging->buffer);
+    free(staging);
+}
+
+static void write_header(uint8_t *dst, uint64_t sdi, uint64_t length,
+                         uint64_t unitsize)
+{
+    memcpy(dst, &sdi, sizeof(sdi));
+    memcpy(dst + sizeof(uint64_t), &length, sizeof(length));
+    memcpy(dst + 2 * sizeof(uint64_t), &unitsize, sizeof(unitsize));
+}
+
+static int push(struct sigrok_staging *staging, const struct sr_dev_inst *sdi,
+                const struct sr_datafeed_logic *logic)
+{
+    size_t size = HEADER_SIZE + ALIGN8((size_t)logic->length);
+    size_t head = atomic_load_explicit(&staging->head, memory_order_relaxed);
+    size_t tail = atomic_load_explicit(&staging->tail, memory_order_acquire);
+    /* one slot stays free, so head == tail always means empty */
+    size_t free_bytes = tail > head ? tail - head - 8
+                                    : staging->capacity - head + tail - 8;
+
+    if (head + size > staging->capacity) {
+        /* the record does not fit at the end, continue at the start */
+        if (tail <= head && size + 8 <= tail) {
+            if (staging->capacity - head >= HEADER_SIZE)
+                write_header(staging->buffer + head, 0, WRAP, 0);
+            head = 0;
+            free_bytes = tail - 8;
+        } else {
+            return 0;
+        }
+    }
+    if (size > free_bytes)
+        return 0;
+
+    write_header(staging->buffer + head, (uint64_t)(uintptr_t)sdi,
+                 logic->length, logic->unitsize);
+    memcpy(staging->buffer + head + HEADER_SIZE, logic->data, logic->length);
+    head += size;
+    if (head == staging->capacity)
+        head = 0;
+    atomic_store_explicit(&staging->head, head, memory_order_release);
+    return 1;
+}
+
+EXPORT void sigrok_staging_callback(const struct sr_dev_inst *sdi,
+                                    const struct sr_datafeed_packet *packet,
+                                    void *cb_data)
+{
+    struct sigrok_staging *staging = cb_data;
+
+    if (packet->type != SR_DF_LOGIC) {
+        staging->forward(sdi, packet, staging->forward_data);
+        return;
+    }
+    if (push(staging, sdi, packet->payload))
+        atomic_fetch_add_explicit(&staging->written, 1, memory_order_release);
+    else
+        atomic_fetch_add_explicit(&staging->dropped, 1, memory_order_relaxed);
+}
+
+/* copies whole records into out, returns the number of bytes copied */
+EXPORT size_t sigrok_staging_read(struct sigrok_staging *staging, uint8_t *out,
+                                  size_t size)
+{
+    size_t tail = atomic_load_explicit(&staging->tail, memory_order_relaxed);
+    size_t head = atomic_load_explicit(&staging->head, memory_order_acquire);
+    size_t copied = 0;
+
+    while (tail != head) {
+        uint64_t length;
+        size_t record;
+
+        if (staging->capacity - tail < HEADER_SIZE) {
+            tail = 0;
+            continue;
+        }
+        memcpy(&length, staging->buffer + tail + sizeof(uint64_t),
+               sizeof(length));
+        if (length == WRAP) {
+            tail = 0;
+            continue;
+        }
+        record = HEADER_SIZE + ALIGN8((size_t)length);
+        if (copied + record > size)
+            break;
+        memcpy(out + copied, staging->buffer + tail, record);
+        copied += record;
+        tail += record;
+        if (tail == staging->capacity)
+            tail = 0;
+    }
+    atomic_store_explicit(&staging->tail, tail, memory_order_release);
+    return copied;
+}
+
+EXPORT uint64_t sigrok_staging_written(struct sigrok_staging *staging)
+{
+    return atomic_load_explicit(&staging->written, memory_order_acquire);
+}
+
+EXPORT uint64_t sigrok_staging_dropped(struct sigrok_staging *staging)
+{
+    return atomic_load_explicit(&staging->dropped, memory_order_relaxed);
+}
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from sigrok.sigrok import AnalogPacket, EndPacket, SigrokError, _address, sigrok_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import TracebackType
+
+    import numpy.typing as npt
+    from typing_extensions import Self
+
+    from sigrok.sigrok import Device, Packet, Session, Sigrok
+
+logger = sigrok_logger.getChild("polling")
+
+# the initial capacity of a series, it doubles up to max_samples
+SeriesCapacity = 256
+
+
+class SeriesKey(NamedTuple):
+    instrument: str
+    channel: str
+    # the measured quantity and unit, as sr_mq and sr_unit values
+    mq: int
+    unit: int
+
+
+class Measurements(NamedTuple):
+    key: SeriesKey
+    # seconds since the epoch (or of the engine clock), when the packet arrived
+    timestamps: npt.NDArray[np.float64]
+    values: npt.NDArray[np.float32]
+
+
+class _Series:
+    """preallocated timestamps and values, which only grow on demand"""
+
+    def __init__(self, max_samples: int) -> None:
+        self.max_samples = max_samples
+        capacity = min(SeriesCapacity, max_samples)
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty(capacity, dtype=np.float32)
+        self.length = 0
+        self.dropped = 0
+
+    def _reserve(self, samples: int) -> None:
+        capacity = len(self.values)
+        if self.length + samples <= capacity:
+            return
+        if capacity < self.max_samples:
+            capacity = min(max(capacity * 2, self.length + samples), self.max_samples)
+            self.timestamps = np.resize(self.timestamps, capacity)
+            self.values = np.resize(self.values, capacity)
+        if (excess := self.length + samples - capacity) > 0:
+            # the oldest samples make room, nobody took them in time
+            drop = min(excess, self.length)
+            self.timestamps[: self.length - drop] = self.timestamps[drop : self.length]
+            self.values[: self.length - drop] = self.values[drop : self.length]
+            self.length -= drop
+            self.dropped += drop
+
+    def append(self, timestamp: float, values: npt.NDArray[np.float32]) -> None:
+        values = values[-self.max_samples :]
+        self._reserve(len(values))
+        end = self.length + len(values)
+        self.timestamps[self.length : end] = timestamp
+        self.values[self.length : end] = values
+        self.length = end
+
+    def take(self) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float32]]:
+        taken = self.timestamps[: self.length].copy(), self.values[: self.length].copy()
+        self.length = 0
+        return taken
+
+
+class Instrument:
+    def __init__(self, name: str, device: Device, rate: float | None) -> None:
+        self.name = name
+        self.device = device
+        self.rate = rate
+        # set when the samplerate of the device was set to the rate
+        self.paced = False
+        # the arrival of the last reading kept
+        self.last: float | None = None
+        self.ended = False
+
+
+class PollingEngine:
+    """
+    runs all instruments in one session while running and collects their analog
+    readings, batched per instrument, channel, quantity and unit.
+    with a `rate` the samplerate of an instrument is set to it, where its driver
+    has one, and only the latest reading is kept at most `rate` times per second,
+    otherwise all readings are.
+    series keep at most `max_samples` readings until they are taken.
+    the engine can be started again after it was stopped
+    """
+
+    def __init__(
+        self,
+        sr: Sigrok,
+        *,
+        max_samples: int = 1_000_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_samples < 1:
+            raise ValueError(f"max_samples must be positive: {max_samples}")
+        self.sr = sr
+        self.max_samples = max_samples
+        self.clock = clock
+        self.instruments: dict[str, Instrument] = {}
+        # a new session on every start of the engine, sessions only run once
+        self.session: Session | None = None
+        # the instruments by the address of their device, to route packets
+        self._routes: dict[int | None, Instrument] = {}
+        self._series: dict[SeriesKey, _Series] = {}
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._running = False
+
+    def add(
+        self, device: Device, *, name: str | None = None, rate: float | None = None
+    ) -> Instrument:
+        """adds an instrument, a running engine restarts its session with it"""
+        if rate is not None and rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        name = name or device.model or f"instrument{len(self.instruments)}"
+        if name in self.instruments:
+            raise ValueError(f"instrument {name} already added")
+        instrument = Instrument(name, device, rate)
+        self.instruments[name] = instrument
+        if self._running:
+            self.stop()
+            self.start()
+        return instrument
+
+    @staticmethod
+    def _pace(instrument: Instrument) -> None:
+        """sets the samplerate of the device to the rate, where the driver has one"""
+        if instrument.rate is None:
+            return
+        if "samplerate" not in (config := instrument.device.config):
+            return
+        try:
+            config["samplerate"] = math.ceil(instrument.rate)
+        except SigrokError:
+            logger.debug("%s takes no samplerate of %s", instrument, instrument.rate)
+            return
+        instrument.paced = True
+
+    def _receive(self, packet: Packet) -> Packet | None:
+        """runs on the session thread, only the end packets get queued"""
+        instrument = self._routes[_address(packet.device._dev)]  # noqa: SLF001 access private member
+        if isinstance(packet, EndPacket):
+            instrument.ended = True
+            logger.info("instrument %s ended", instrument.name)
+            return packet
+        if not isinstance(packet, AnalogPacket) or not packet.num_samples:
+            return None
+        now = self.clock()
+        if instrument.rate is not None:
+            if instrument.last is not None and now - instrument.last < (
+                1 / instrument.rate
+            ):
+                return None
+            instrument.last = now
+        channels = packet.channels
+        values = np.frombuffer(packet.data, dtype=np.float32).reshape(-1, len(channels))
+        if instrument.rate is not None:
+            values = values[-1:]
+        with self._available:
+            for index, channel in enumerate(channels):
+                key = SeriesKey(instrument.name, channel, packet.mq, packet.unit)
+                if (series := self._series.get(key)) is None:
+                    series = self._series[key] = _Series(self.max_samples)
+                series.append(now, values[:, index])
+            self._available.notify_all()
+        return None
+
+    def _take(self) -> list[Measurements]:
+        return [
+            Measurements(key, *series.take())
+            for key, series in self._series.items()
+            if series.length
+        ]
+
+    def measurements(self) -> list[Measurements]:
+        """takes the readings collected since the last call, without blocking"""
+        with self._lock:
+            return self._take()
+
+    def next_measurements(self, timeout: float | None = None) -> list[Measurements]:
+        """waits for readings and takes them"""
+        with self._available:
+            if not self._available.wait_for(
+                lambda: any(series.length for series in self._series.values()), timeout
+            ):
+                raise TimeoutError(timeout)
+            return self._take()
+
+    @property
+    def dropped(self) -> int:
+        """readings lost because a series was full"""
+        with self._lock:
+            return sum(series.dropped for series in self._series.values())
+
+    def start(self) -> None:
+        if self._running:
+            msg = "polling engine is already running"
+            raise RuntimeError(msg)
+        self._running = True
+        if not self.instruments:
+            return
+        self._routes = {}
+        for instrument in self.instruments.values():
+            self._pace(instrument)
+            instrument.last = None
+            instrument.ended = False
+            self._routes[_address(instrument.device._dev)] = instrument  # noqa: SLF001 access private member
+        self.session = self.sr.session(
+            devices=[instrument.device for instrument in self.instruments.values()]
+        )
+        self.session.add_stage(self._receive)
+        self.session.start()
+
+    def stop(self) -> None:
+        """stops and releases the session, also when all instruments ended"""
+        self._running = False
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def close(self) -> None:
+        """stops the engine and forgets its instruments"""
+        self.stop()
+        self.instruments.clear()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
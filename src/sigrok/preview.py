@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from sigrok.logic import sample_count, unpack_channels
+from sigrok.sigrok import EndPacket, LogicPacket
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    import numpy.typing as npt
+
+    from sigrok.sigrok import Session
+
+
+class PreviewFrame(NamedTuple):
+    # arrays are shaped (channels, buckets), oldest bucket first
+    minimum: npt.NDArray[np.uint8]
+    maximum: npt.NDArray[np.uint8]
+    edges: npt.NDArray[np.bool_]
+    start: int
+    samples_per_bucket: int
+
+    @property
+    def width(self) -> int:
+        return int(self.minimum.shape[1])
+
+
+class LogicPreview:
+    """
+    reduces a logic packet stream to per-channel min/max/edge envelopes
+    over a fixed number of buckets, rate-limited to `refresh_rate` frames/s
+    """
+
+    def __init__(
+        self,
+        *,
+        width: int,
+        samples_per_bucket: int,
+        channels: Sequence[int] | None = None,
+        refresh_rate: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if width < 1:
+            raise ValueError(f"width must be positive: {width}")
+        if samples_per_bucket < 1:
+            raise ValueError(
+                f"samples_per_bucket must be positive: {samples_per_bucket}"
+            )
+        if refresh_rate <= 0:
+            raise ValueError(f"refresh_rate must be positive: {refresh_rate}")
+
+        self.width = width
+        self.samples_per_bucket = samples_per_bucket
+        self.refresh_interval = 1 / refresh_rate
+        self._channels = list(channels) if channels is not None else None
+        self._clock = clock
+        self._next_refresh = clock()
+
+        # allocated on the first packet, once the number of channels is known
+        self._minimum = np.empty((0, 0), dtype=np.uint8)
+        self._maximum = np.empty((0, 0), dtype=np.uint8)
+        self._edges = np.empty((0, 0), dtype=np.bool_)
+        self._pending = np.empty((0, 0), dtype=np.uint8)
+        self._pending_length = 0
+        self._last: npt.NDArray[np.uint8] | None = None
+        self._head = 0
+        self._filled = 0
+        self._buckets = 0
+
+    def feed(self, packet: LogicPacket) -> PreviewFrame | None:
+        return self.feed_data(packet.data, packet.unitsize)
+
+    def feed_data(self, data: bytes, unitsize: int) -> PreviewFrame | None:
+        self._push(memoryview(data), unitsize)
+        if (now := self._clock()) < self._next_refresh:
+            return None
+        self._next_refresh = now + self.refresh_interval
+        return self.frame()
+
+    def frames(
+        self, session: Session, timeout: float | None = None
+    ) -> Iterator[PreviewFrame]:
+        while not isinstance(packet := session.next_packet(timeout=timeout), EndPacket):
+            if isinstance(packet, LogicPacket) and (frame := self.feed(packet)):
+                yield frame
+        yield self.frame()
+
+    def frame(self) -> PreviewFrame:
+        order = (self._head - self._filled + np.arange(self._filled)) % self.width
+        return PreviewFrame(
+            minimum=self._minimum[order].T.copy(),
+            maximum=self._maximum[order].T.copy(),
+            edges=self._edges[order].T.copy(),
+            start=(self._buckets - self._filled) * self.samples_per_bucket,
+            samples_per_bucket=self.samples_per_bucket,
+        )
+
+    def _allocate(self, unitsize: int) -> None:
+        channels = len(self._channels) if self._channels is not None else unitsize * 8
+        if self._minimum.shape == (self.width, channels):
+            return
+        self._minimum = np.zeros((self.width, channels), dtype=np.uint8)
+        self._maximum = np.zeros((self.width, channels), dtype=np.uint8)
+        self._edges = np.zeros((self.width, channels), dtype=np.bool_)
+        self._pending = np.zeros((self.samples_per_bucket, channels), dtype=np.uint8)
+
+    def _unpack(self, data: memoryview, unitsize: int) -> npt.NDArray[np.uint8]:
+        bits = unpack_channels(data, unitsize)
+        return bits if self._channels is None else bits[:, self._channels]
+
+    def _push(self, data: memoryview, unitsize: int) -> None:
+        self._allocate(unitsize)
+        spb = self.samples_per_bucket
+        samples = sample_count(data, unitsize)
+
+        if self._pending_length:
+            take = min(spb - self._pending_length, samples)
+            self._pending[self._pending_length : self._pending_length + take] = (
+                self._unpack(data[: take * unitsize], unitsize)
+            )
+            self._pending_length += take
+            data, samples = data[take * unitsize :], samples - take
+            if self._pending_length < spb:
+                return
+            self._store(self._pending[np.newaxis])
+            self._pending_length = 0
+
+        complete = samples // spb
+        # buckets which would be overwritten within this packet are never unpacked
+        if (skipped := max(0, complete - self.width)) > 0:
+            self._last = self._unpack(
+                data[(skipped * spb - 1) * unitsize : skipped * spb * unitsize],
+                unitsize,
+            )[0]
+            self._buckets += skipped
+        if complete > skipped:
+            bits = self._unpack(
+                data[skipped * spb * unitsize : complete * spb * unitsize], unitsize
+            )
+            self._store(bits.reshape(complete - skipped, spb, -1))
+
+        if rest := samples - complete * spb:
+            self._pending[:rest] = self._unpack(
+                data[complete * spb * unitsize :], unitsize
+            )
+            self._pending_length = rest
+
+    def _store(self, blocks: npt.NDArray[np.uint8]) -> None:
+        first = blocks[:, 0]
+        previous = np.concatenate(
+            (
+                first[:1] if self._last is None else self._last[np.newaxis],
+                blocks[:-1, -1],
+            )
+        )
+        edges = (first != previous) | np.any(blocks[:, 1:] != blocks[:, :-1], axis=1)
+
+        slots = (self._head + np.arange(len(blocks))) % self.width
+        self._minimum[slots] = blocks.min(axis=1)
+        self._maximum[slots] = blocks.max(axis=1)
+        self._edges[slots] = edges
+
+        self._last = blocks[-1, -1].copy()
+        self._head = (self._head + len(blocks)) % self.width
+        self._filled = min(self.width, self._filled + len(blocks))
+        self._buckets += len(blocks)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import collections
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# the stages of a packet, on the acquisition thread (or the drain thread with
+# staging) and on the consumer thread:
+#   driver    between two datafeed callbacks, in sr_session_run and the driver
+#             including the ctypes trampoline into python
+#   callback  the whole python datafeed callback
+#   parse     parse_packet, including the copy of logic payloads
+#   stages    the python stages of the session
+#   queue     queue.put
+#   latency   from queue.put until the consumer got the packet
+#   wait      next_packet blocking on the queue
+#   consumer  the consumer between two next_packet calls
+ProfileStage = Literal[
+    "driver", "callback", "parse", "stages", "queue", "latency", "wait", "consumer"
+]
+ProfileStages: tuple[ProfileStage, ...] = (
+    "driver",
+    "callback",
+    "parse",
+    "stages",
+    "queue",
+    "latency",
+    "wait",
+    "consumer",
+)
+
+# durations are kept in nanoseconds, in power of two buckets
+HistogramBuckets = 65
+
+
+class StageHistogram:
+    """durations of one stage, each stage must only be recorded by one thread"""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * HistogramBuckets
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, duration: int) -> None:
+        self.buckets[max(duration, 0).bit_length()] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """upper bound in ns of the bucket the percentile falls into"""
+        if not self.count:
+            return 0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min((1 << bucket) - 1, self.max)
+        return self.max
+
+
+class TraceEvent(NamedTuple):
+    stage: ProfileStage
+    thread: int
+    start: int
+    end: int
+
+
+class SessionProfiler:
+    """
+    timestamps the stages of each packet of a session with perf_counter_ns,
+    aggregates them into histograms and with `trace` also keeps the latest
+    `max_events` spans for a chrome trace (chrome://tracing or perfetto)
+    """
+
+    def __init__(self, *, trace: bool = False, max_events: int = 1_000_000) -> None:
+        self.histograms = {stage: StageHistogram() for stage in ProfileStages}
+        self.trace = trace
+        self.events: collections.deque[TraceEvent] = collections.deque(
+            maxlen=max_events
+        )
+        self._origin = time.perf_counter_ns()
+        self._threads: dict[int, str] = {}
+        # enqueue times, in queue order
+        self._enqueued: collections.deque[int] = collections.deque()
+        self._callback_end: int | None = None
+        self._consumer_since: int | None = None
+
+    def record(self, stage: ProfileStage, start: int, end: int | None = None) -> int:
+        """records `stage` from `start` until `end` (or now), returns the end"""
+        if end is None:
+            end = time.perf_counter_ns()
+        self.histograms[stage].add(end - start)
+        if self.trace:
+            thread = threading.get_ident()
+            if thread not in self._threads:
+                self._threads[thread] = threading.current_thread().name
+            self.events.append(TraceEvent(stage, thread, start, end))
+        return end
+
+    def callback_started(self) -> int:
+        start = time.perf_counter_ns()
+        if self._callback_end is not None:
+            self.record("driver", self._callback_end, start)
+        return start
+
+    def callback_finished(self, start: int) -> None:
+        self._callback_end = self.record("callback", start)
+
+    def enqueued(self, start: int) -> None:
+        self._enqueued.append(self.record("queue", start))
+
+    def waiting(self) -> int:
+        start = time.perf_counter_ns()
+        if self._consumer_since is not None:
+            self.record("consumer", self._consumer_since, start)
+        return start
+
+    def dequeued(self, start: int) -> None:
+        end = self.record("wait", start)
+        if self._enqueued:
+            # a span between threads, it only goes into the histogram
+            self.histograms["latency"].add(end - self._enqueued.popleft())
+        self._consumer_since = end
+
+    def report(self) -> str:
+        lines = [
+            f"{'stage':>9} {'count':>9} {'mean [us]':>10} {'p50 [us]':>9} "
+            f"{'p99 [us]':>9} {'max [us]':>9}"
+        ]
+        for stage, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            lines.append(
+                f"{stage:>9} {histogram.count:9d} {histogram.mean / 1e3:10.1f} "
+                f"{histogram.percentile(50) / 1e3:9.1f} "
+                f"{histogram.percentile(99) / 1e3:9.1f} {histogram.max / 1e3:9.1f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        pid = os.getpid()
+        events: list[dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": thread,
+                "args": {"name": name},
+            }
+            for thread, name in self._threads.items()
+        ]
+        events.extend(
+            {
+                "name": event.stage,
+                "ph": "X",
+                "pid": pid,
+                "tid": event.thread,
+                "ts": (event.start - self._origin) / 1e3,
+                "dur": (event.end - event.start) / 1e3,
+            }
+            for event in list(self.events)
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ns"}
+
+    def write_trace(self, path: Path) -> None:
+        with path.open("w") as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import collections
+import ctypes as ct
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
+
+from sigrok.bindings import lib
+from sigrok.sigrok import _cast_p, _try, sigrok_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from sigrok.bindings import Pointer
+
+logger = sigrok_logger.getChild("resources")
+
+# filled by the release workflow, the package is never imported from a zip
+PackageFirmwarePath = Path(__file__).parent / "firmware"
+
+ResourceSource = Literal["memory", "cache", "disk", "missing"]
+
+
+def default_firmware_dirs() -> list[Path]:
+    """the directories libsigrok searches by default, in its order"""
+    dirs = []
+    if firmware_dir := os.environ.get("SIGROK_FIRMWARE_DIR"):
+        dirs.append(Path(firmware_dir))
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs.extend(
+        Path(data_dir) / "sigrok-firmware"
+        for data_dir in [data_home, *data_dirs.split(os.pathsep)]
+    )
+    return dirs
+
+
+class FirmwareCache:
+    """
+    keeps firmware files in memory once read, shared by all contexts,
+    so reopening devices (e.g. after a USB reset) does not touch the disk
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._files: dict[Path, bytes] = {}
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return sum(map(len, self._files.values()))
+
+    def get(self, path: Path) -> bytes | None:
+        with self._lock:
+            return self._files.get(path)
+
+    def load(self, path: Path) -> bytes:
+        content = path.read_bytes()
+        with self._lock:
+            return self._files.setdefault(path, content)
+
+    def preload(self, dirs: Iterable[Path], names: Iterable[str] | None = None) -> int:
+        """reads the named (or all) files of `dirs`, returns the number of files"""
+        wanted = None if names is None else set(names)
+        loaded = 0
+        for directory in dirs:
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                if (wanted is None or path.name in wanted) and path.is_file():
+                    self.load(path)
+                    loaded += 1
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+
+
+firmware_cache = FirmwareCache()
+
+
+class ResourceOpen(NamedTuple):
+    name: str
+    source: ResourceSource
+    size: int
+    duration: float
+
+
+class ResourceHooks:
+    """
+    serves the resources (firmware) of one libsigrok context from memory
+    and its own directories, instead of the process-wide SIGROK_FIRMWARE_DIR
+    """
+
+    def __init__(
+        self,
+        firmware_dirs: Iterable[Path] = (),
+        firmware: Mapping[str, bytes] | None = None,
+        *,
+        cache: FirmwareCache = firmware_cache,
+        history: int = 100,
+    ) -> None:
+        self.firmware_dirs = list(firmware_dirs)
+        self.firmware = dict(firmware or {})
+        self.cache = cache
+        # the latest opens by libsigrok, to diagnose slow device opens
+        self.history: collections.deque[ResourceOpen] = collections.deque(
+            maxlen=history
+        )
+        self._lock = threading.Lock()
+        self._handles = itertools.count(1)
+        # open resources by handle: content and read position
+        self._open: dict[int, tuple[bytes, int]] = {}
+        self._callbacks: tuple[Any, ...] = ()
+
+    def install(self, sr: Pointer[lib.type_sr_context]) -> None:
+        if not self._callbacks:
+            arg_types = lib.sr_resource_set_hooks.arg_types  # type: ignore[attr-defined]
+            self._callbacks = (
+                arg_types[1](self._on_open),
+                arg_types[2](self._on_close),
+                arg_types[3](self._on_read),
+            )
+        _try(lib.sr_resource_set_hooks(sr, *self._callbacks, None))
+
+    def preload(self, names: Iterable[str] | None = None) -> int:
+        return self.cache.preload(self.firmware_dirs, names)
+
+    def load(self, name: str) -> bytes | None:
+        return self._find(name)[0]
+
+    def _find(self, name: str) -> tuple[bytes | None, ResourceSource]:
+        if (content := self.firmware.get(name)) is not None:
+            return content, "memory"
+        for directory in self.firmware_dirs:
+            path = directory / name
+            if (content := self.cache.get(path)) is not None:
+                return content, "cache"
+            if path.is_file():
+                return self.cache.load(path), "disk"
+        return None, "missing"
+
+    def _on_open(self, res: Any, name: bytes, _data: Any) -> int:
+        # exceptions must not reach libsigrok, ctypes would report success
+        try:
+            resource = _cast_p(res, lib.sr_resource).contents
+            if resource.type != lib.SR_RESOURCE_FIRMWARE:
+                return int(lib.SR_ERR_ARG)
+            start = time.perf_counter()
+            content, source = self._find(name.decode("utf-8"))
+            opened = ResourceOpen(
+                name.decode("utf-8"),
+                source,
+                len(content or b""),
+                time.perf_counter() - start,
+            )
+            self.history.append(opened)
+            logger.debug(
+                "%s from %s (%d bytes) in %.3fms",
+                opened.name,
+                opened.source,
+                opened.size,
+                opened.duration * 1e3,
+            )
+            if content is None:
+                return int(lib.SR_ERR)
+            with self._lock:
+                handle = next(self._handles)
+                self._open[handle] = (content, 0)
+            resource.size = len(content)
+            resource.handle = handle
+        except Exception:
+            logger.exception("opening %s failed", name)
+            return int(lib.SR_ERR)
+        return int(lib.SR_OK)
+
+    def _on_close(self, res: Any, _data: Any) -> int:
+        with self._lock:
+            self._open.pop(_cast_p(res, lib.sr_resource).contents.handle, None)
+        return int(lib.SR_OK)
+
+    def _on_read(self, res: Any, buf: Any, count: int, _data: Any) -> int:
+        handle = _cast_p(res, lib.sr_resource).contents.handle
+        with self._lock:
+            if (entry := self._open.get(handle)) is None:
+                return int(lib.SR_ERR_ARG)
+            content, position = entry
+            chunk = content[position : position + count]
+            self._open[handle] = (content, position + len(chunk))
+        ct.memmove(buf, chunk, len(chunk))
+        return len(chunk)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import abc
+from typing import TYPE_CHECKING, Generic, NamedTuple, TypeVar
+
+import numpy as np
+
+from sigrok.logic import sample_count, sample_words
+from sigrok.sigrok import LogicPacket
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+    import numpy.typing as npt
+
+    from sigrok.sigrok import Packet
+
+# all searches take one packet (or a whole capture) at a time and keep the
+# state at its end, so results do not depend on where packets are split.
+# positions are sample indices counted from the first sample fed
+
+Result = TypeVar("Result")
+
+# trigger-like conditions per channel: level low/high, rising/falling/either edge
+Conditions = ("0", "1", "r", "f", "e")
+
+
+def _words(data: bytes | memoryview, unitsize: int) -> npt.NDArray[np.unsignedinteger]:
+    """one integer per sample, without a copy where the unitsize allows it"""
+    if unitsize in (1, 2, 4, 8):
+        return np.frombuffer(
+            data, dtype=f"<u{unitsize}", count=sample_count(data, unitsize)
+        )
+    return sample_words(data, unitsize)
+
+
+def _channel_bits(
+    data: bytes | memoryview, unitsize: int, channel: int
+) -> npt.NDArray[np.uint8]:
+    samples = np.frombuffer(
+        data, dtype=np.uint8, count=sample_count(data, unitsize) * unitsize
+    ).reshape(-1, unitsize)
+    return (samples[:, channel // 8] >> np.uint8(channel % 8)) & np.uint8(1)
+
+
+class StreamSearch(abc.ABC, Generic[Result]):
+    def __init__(self) -> None:
+        self.position = 0
+
+    @abc.abstractmethod
+    def _search(self, data: bytes | memoryview, unitsize: int) -> Result: ...
+
+    def _found(self, result: Result) -> bool:
+        return bool(len(result))  # type: ignore[arg-type]
+
+    def feed_data(self, data: bytes | memoryview, unitsize: int) -> Result:
+        result = self._search(data, unitsize)
+        self.position += sample_count(data, unitsize)
+        return result
+
+    def feed(self, packet: Packet) -> Result | None:
+        if isinstance(packet, LogicPacket):
+            return self.feed_data(packet.data, packet.unitsize)
+        return None
+
+    def search(self, packets: Iterable[Packet]) -> Iterator[Result]:
+        """yields the results of all packets which found anything"""
+        for packet in packets:
+            if (result := self.feed(packet)) is not None and self._found(result):
+                yield result
+
+
+class ConditionSearch(StreamSearch["npt.NDArray[np.int64]"]):
+    """
+    finds the samples where all channel conditions hold,
+    e.g. {cs: "0", clk: "r"} for "CS low and CLK rising"
+    """
+
+    def __init__(self, conditions: Mapping[int, str]) -> None:
+        super().__init__()
+        masks = dict.fromkeys(Conditions, 0)
+        for channel, condition in conditions.items():
+            if condition not in masks:
+                raise ValueError(f"unknown condition {condition!r} for {channel}")
+            masks[condition] |= 1 << channel
+        self.level_mask = masks["0"] | masks["1"]
+        self.level_value = masks["1"]
+        self.rising = masks["r"]
+        self.falling = masks["f"]
+        self.either = masks["e"]
+        self._last: int | None = None
+
+    @classmethod
+    def pattern(cls, value: int, channels: Iterable[int] = range(8)) -> ConditionSearch:
+        """matches `value` on `channels`, the lowest channel is bit 0 of value"""
+        return cls(
+            {
+                channel: "1" if value >> bit & 1 else "0"
+                for bit, channel in enumerate(channels)
+            }
+        )
+
+    def _search(self, data: bytes | memoryview, unitsize: int) -> npt.NDArray[np.int64]:
+        words = _words(data, unitsize)
+        if not len(words):
+            return np.empty(0, dtype=np.int64)
+        dtype = words.dtype.type
+        matches = (words & dtype(self.level_mask)) == dtype(self.level_value)
+
+        if edges := self.rising | self.falling | self.either:
+            previous = np.empty_like(words)
+            # the first sample of a capture cannot be an edge
+            previous[0] = words[0] if self._last is None else self._last
+            previous[1:] = words[:-1]
+            changed = words ^ previous
+            matches &= (changed & dtype(edges)) == dtype(edges)
+            if self.rising:
+                matches &= (words & dtype(self.rising)) == dtype(self.rising)
+            if self.falling:
+                matches &= (words & dtype(self.falling)) == 0
+        self._last = int(words[-1])
+
+        return np.flatnonzero(matches).astype(np.int64) + self.position
+
+
+class Pulses(NamedTuple):
+    start: npt.NDArray[np.int64]
+    width: npt.NDArray[np.int64]
+    # the channel of each pulse, for searches over several channels
+    channel: npt.NDArray[np.int64]
+
+    @classmethod
+    def empty(cls) -> Pulses:
+        return cls(*(np.empty(0, dtype=np.int64) for _ in range(3)))
+
+
+class PulseSearch(StreamSearch[Pulses]):
+    """
+    finds completed pulses at `level` on `channel`, only those shorter than
+    `shorter_than` or longer than `longer_than` samples if any is given.
+    a pulse running at the start of the capture is never reported
+    """
+
+    def __init__(
+        self,
+        channel: int,
+        level: int = 1,
+        *,
+        shorter_than: int | None = None,
+        longer_than: int | None = None,
+    ) -> None:
+        super().__init__()
+        self.channel = channel
+        self.level = level
+        self.shorter_than = shorter_than
+        self.longer_than = longer_than
+        self._previous: int | None = None
+        # start of the running pulse, -1 if it started before the first sample
+        self._open: int | None = None
+
+    def _search(self, data: bytes | memoryview, unitsize: int) -> Pulses:
+        active = (_channel_bits(data, unitsize, self.channel) == self.level).astype(
+            np.int8
+        )
+        if not len(active):
+            return Pulses.empty()
+
+        if self._previous is None and active[0]:
+            self._open = -1
+        previous = active[0] if self._previous is None else self._previous
+        transitions = np.diff(active, prepend=np.int8(previous))
+        starts = np.flatnonzero(transitions == 1) + self.position
+        ends = np.flatnonzero(transitions == -1) + self.position
+        self._previous = int(active[-1])
+
+        if self._open is not None:
+            starts = np.concatenate(([self._open], starts))
+        if len(starts) > len(ends):
+            self._open = int(starts[-1])
+            starts = starts[:-1]
+        else:
+            self._open = None
+
+        widths = ends - starts
+        selected = starts >= 0
+        if self.shorter_than is not None or self.longer_than is not None:
+            outside = np.zeros(len(widths), dtype=bool)
+            if self.shorter_than is not None:
+                outside |= widths < self.shorter_than
+            if self.longer_than is not None:
+                outside |= widths > self.longer_than
+            selected &= outside
+        return Pulses(
+            starts[selected].astype(np.int64),
+            widths[selected].astype(np.int64),
+            np.full(np.count_nonzero(selected), self.channel, dtype=np.int64),
+        )
+
+    def _found(self, result: Pulses) -> bool:
+        return bool(len(result.start))
+
+
+class GlitchSearch(StreamSearch[Pulses]):
+    """finds high and low pulses of at most `max_width` samples on `channels`"""
+
+    def __init__(self, channels: Iterable[int], max_width: int) -> None:
+        super().__init__()
+        self.channels = np.array(list(channels), dtype=np.uint64)
+        self.max_width = max_width
+        self._mask = int(np.bitwise_or.reduce(np.uint64(1) << self.channels))
+        self._previous: int | None = None
+        # last transition of each channel, -1 before the first one
+        self._last = np.full(len(self.channels), -1, dtype=np.int64)
+
+    def _search(self, data: bytes | memoryview, unitsize: int) -> Pulses:
+        words = _words(data, unitsize).astype(np.uint64, copy=False)
+        if not len(words):
+            return Pulses.empty()
+        previous = np.empty_like(words)
+        previous[0] = words[0] if self._previous is None else self._previous
+        previous[1:] = words[:-1]
+        self._previous = int(words[-1])
+
+        # only samples where any channel changes are looked at per channel
+        changed = (words ^ previous) & np.uint64(self._mask)
+        rows = np.flatnonzero(changed)
+        bits = (changed[rows, None] >> self.channels[None, :]) & np.uint64(1)
+        # channel-major, so the transitions of each channel are in order
+        columns, indices = np.nonzero(bits.T)
+        samples = rows[indices] + self.position
+
+        # every pulse lies between two transitions of its channel,
+        # the first one of each channel pairs with the one carried over
+        counts = np.bincount(columns, minlength=len(self.channels))
+        groups = np.cumsum(counts) - counts
+        carried, self._last = self._last, self._last.copy()
+        self._last[counts > 0] = samples[(groups + counts - 1)[counts > 0]]
+        columns = np.insert(columns, groups, np.arange(len(self.channels)))
+        samples = np.insert(samples, groups, carried)
+
+        same = columns[1:] == columns[:-1]
+        starts = samples[:-1][same]
+        widths = np.diff(samples)[same]
+        pulse_columns = columns[:-1][same]
+
+        selected = (starts >= 0) & (widths <= self.max_width)
+        order = np.argsort(starts[selected], kind="stable")
+        return Pulses(
+            starts[selected][order],
+            widths[selected][order],
+            self.channels[pulse_columns[selected][order]].astype(np.int64),
+        )
+
+    def _found(self, result: Pulses) -> bool:
+        return bool(len(result.start))
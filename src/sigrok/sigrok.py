@@ -1,27 +1,38 @@
 from __future__ import annotations
 
 import abc
+import collections
+import copy
 import ctypes as ct
 import enum
-import importlib.resources
+import functools
+import importlib
 import itertools
 import logging
-import os
 import queue
 import threading
-from contextlib import suppress
-from typing import TYPE_CHECKING, Any, ClassVar
+import time
+import weakref
+from contextlib import contextmanager, suppress
+from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple, Protocol
 
 from sigrok.bindings import Pointer, lib
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator
+    from collections.abc import Callable, Iterable, Iterator, Mapping
+    from fractions import Fraction
     from pathlib import Path
     from types import TracebackType
 
     from pyclibrary.c_library import CallResult  # type: ignore[import-untyped]
     from typing_extensions import Self
 
+    from sigrok.profiling import SessionProfiler
+    from sigrok.staging import Staging
+
+    class SupportsFileno(Protocol):
+        def fileno(self) -> int: ...
+
 
 sigrok_logger = logging.getLogger("sigrok")
 
@@ -126,6 +137,11 @@ class DeviceNotFoundError(SigrokError):
         super().__init__("no matching device found")
 
 
+class SigrokSubinterpreterError(SigrokError):
+    def __init__(self) -> None:
+        super().__init__("logging can only be redirected by the main interpreter")
+
+
 def _iter_g_slist(slist: Any) -> Iterator[Any]:
     gslist = _cast_p(slist, lib.GSList)
     for idx in itertools.count():
@@ -158,9 +174,24 @@ def _cast_p(value: Any, dt: Any) -> Any:
     return ct.cast(value, ct.POINTER(dt))
 
 
-class ChannelType(enum.IntEnum):
-    Analog = lib.SR_CHANNEL_ANALOG
-    Logic = lib.SR_CHANNEL_LOGIC
+def _address(value: Any) -> int | None:
+    """the address a pointer holds, to compare instances of libsigrok"""
+    return ct.cast(value, ct.c_void_p).value
+
+
+if TYPE_CHECKING:
+
+    class ChannelType(enum.IntEnum):
+        Analog = lib.SR_CHANNEL_ANALOG
+        Logic = lib.SR_CHANNEL_LOGIC
+
+
+def _channel_type() -> type[ChannelType]:
+    return enum.IntEnum(  # type: ignore[return-value]
+        "ChannelType",
+        {"Analog": lib.SR_CHANNEL_ANALOG, "Logic": lib.SR_CHANNEL_LOGIC},
+        module=__name__,
+    )
 
 
 class Channel:
@@ -181,7 +212,7 @@ class Channel:
 
     @property
     def type(self) -> ChannelType:
-        return ChannelType(self._ch.contents.type)
+        return _lazy("ChannelType")(self._ch.contents.type)  # type: ignore[no-any-return]
 
     @property
     def index(self) -> int:
@@ -204,15 +235,325 @@ class SigrokChannelNotFoundError(SigrokError):
         self.channels = channels
 
 
+class ChannelGroup:
+    def __init__(self, cg: Pointer[lib.type_sr_channel_group]) -> None:
+        self._cg = cg
+
+    @property
+    def name(self) -> str:
+        return self._cg.contents.name.decode("utf-8")
+
+    def channels(self) -> list[Channel]:
+        return [
+            Channel(_cast_p(ch, lib.sr_channel))
+            for ch in _iter_g_slist(self._cg.contents.channels)
+        ]
+
+    def __repr__(self) -> str:
+        channels = ", ".join(ch.name for ch in self.channels())
+        return f"<channel group {self.name} ({channels})>"
+
+
+class SigrokChannelGroupNotFoundError(SigrokError):
+    def __init__(self, name: str, channel_groups: list[str]) -> None:
+        super().__init__(
+            f"{name} (available channel groups: {', '.join(channel_groups)})"
+        )
+        self.name = name
+        self.channel_groups = channel_groups
+
+
 if TYPE_CHECKING:
     ConfigKey = lib.type_sr_configkey
-else:
-    ConfigKey = enum.IntEnum("ConfigKey", lib.sr_configkey)  # type: ignore[misc]
+
+
+def _config_key() -> type[ConfigKey]:
+    return enum.IntEnum("ConfigKey", lib.sr_configkey, module=__name__)  # type: ignore[return-value]
+
+
+class _GVariantConverter(NamedTuple):
+    new: Callable[[Any], Any]
+    get: Callable[[Any], Any]
+
+
+# converters of the basic GVariant types, by type string
+_BasicConverters = {
+    "t": _GVariantConverter(
+        new=lambda value: lib.g_variant_new_uint64(value).rval,
+        get=lambda variant: lib.g_variant_get_uint64(variant).rval,
+    ),
+    "x": _GVariantConverter(
+        new=lambda value: lib.g_variant_new_int64(value).rval,
+        get=lambda variant: lib.g_variant_get_int64(variant).rval,
+    ),
+    "i": _GVariantConverter(
+        new=lambda value: lib.g_variant_new_int32(value).rval,
+        get=lambda variant: lib.g_variant_get_int32(variant).rval,
+    ),
+    "u": _GVariantConverter(
+        new=lambda value: lib.g_variant_new_uint32(value).rval,
+        get=lambda variant: lib.g_variant_get_uint32(variant).rval,
+    ),
+    "d": _GVariantConverter(
+        new=lambda value: lib.g_variant_new_double(value).rval,
+        get=lambda variant: lib.g_variant_get_double(variant).rval,
+    ),
+    "b": _GVariantConverter(
+        new=lambda value: lib.g_variant_new_boolean(value).rval,
+        get=lambda variant: bool(lib.g_variant_get_boolean(variant).rval),
+    ),
+    "s": _GVariantConverter(
+        new=lambda value: lib.g_variant_new_string(value.encode("utf-8")).rval,
+        get=lambda variant: lib.g_variant_get_string(variant, None).rval.decode(
+            "utf-8"
+        ),
+    ),
+}
+# the GVariant type of rationals which are not config values, like transform options
+_RationalType = "(xt)"
+
+
+def _variant_type(variant: Any) -> str | None:
+    if not variant:
+        return None
+    return lib.g_variant_get_type_string(variant).rval.decode("utf-8")  # type: ignore[no-any-return]
+
+
+def _variant_value(variant: Any) -> Any:
+    """converts variants of supported types, returns None for all others"""
+    if (type_string := _variant_type(variant)) is None:
+        return None
+    try:
+        converter = _variant_converter(type_string)
+    except SigrokArgError:
+        return None
+    return converter.get(variant)
+
+
+def _split_types(type_string: str) -> list[str]:
+    """splits a sequence of complete GVariant types like "s(tt)a{sv}" """
+    types = []
+    start = 0
+    while start < len(type_string):
+        end = start
+        while type_string[end] in "am":
+            end += 1
+        if type_string[end] in "({":
+            depth = 1
+            while depth:
+                end += 1
+                depth += type_string[end] in "({"
+                depth -= type_string[end] in ")}"
+        types.append(type_string[start : end + 1])
+        start = end + 1
+    return types
+
+
+def _new_container(function: Any, *args: Any, children: list[Any]) -> Any:
+    """calls a g_variant_new_* function taking an array of children and its length"""
+    array = (ct.c_void_p * len(children))(*children)
+    pointer = ct.cast(array, function.arg_types[len(args)])
+    return function(*args, pointer, len(children)).rval
+
+
+def _children(variant: Any) -> Iterator[Any]:
+    for idx in range(lib.g_variant_n_children(variant).rval):
+        child = lib.g_variant_get_child_value(variant, idx).rval
+        try:
+            yield child
+        finally:
+            lib.g_variant_unref(child)
+
+
+def _tuple_converter(type_string: str) -> _GVariantConverter:
+    converters = [
+        _variant_converter(child) for child in _split_types(type_string[1:-1])
+    ]
+
+    def new(value: Iterable[Any]) -> Any:
+        values = list(value)
+        if len(values) != len(converters):
+            raise SigrokArgError(hint=f"{type_string} needs {len(converters)} values")
+        return _new_container(
+            lib.g_variant_new_tuple,
+            children=[
+                converter.new(item)
+                for converter, item in zip(converters, values, strict=True)
+            ],
+        )
+
+    def get(variant: Any) -> tuple[Any, ...]:
+        return tuple(
+            converter.get(child)
+            for converter, child in zip(converters, _children(variant), strict=True)
+        )
+
+    return _GVariantConverter(new=new, get=get)
+
+
+def _dict_entry_converter(type_string: str) -> _GVariantConverter:
+    key, value = (
+        _variant_converter(child) for child in _split_types(type_string[1:-1])
+    )
+    return _GVariantConverter(
+        new=lambda item: lib.g_variant_new_dict_entry(
+            key.new(item[0]), value.new(item[1])
+        ).rval,
+        get=_tuple_converter(type_string).get,
+    )
+
+
+def _array_converter(type_string: str) -> _GVariantConverter:
+    element = _variant_converter(type_string[1:])
+    # lives as long as the cached converter, empty arrays need the element type
+    element_type = lib.g_variant_type_new(type_string[1:].encode("utf-8")).rval
+    is_dict = type_string.startswith("a{")
+
+    def new(value: Any) -> Any:
+        items = value.items() if is_dict else value
+        return _new_container(
+            lib.g_variant_new_array,
+            element_type,
+            children=[element.new(item) for item in items],
+        )
+
+    def get(variant: Any) -> list[Any] | dict[Any, Any]:
+        items = [element.get(child) for child in _children(variant)]
+        return dict(items) if is_dict else items
+
+    return _GVariantConverter(new=new, get=get)
+
+
+def _new_boxed(value: Any) -> Any:
+    # the contained type is taken from the python value
+    for python_type, type_string in ((bool, "b"), (int, "x"), (float, "d"), (str, "s")):
+        if isinstance(value, python_type):
+            inner = _variant_converter(type_string).new(value)
+            return lib.g_variant_new_variant(inner).rval
+    raise SigrokArgError(hint=f"cannot box {type(value).__name__} into a variant")
+
+
+def _get_boxed(variant: Any) -> Any:
+    inner = lib.g_variant_get_variant(variant).rval
+    try:
+        return _variant_value(inner)
+    finally:
+        lib.g_variant_unref(inner)
+
+
+@functools.cache
+def _variant_converter(type_string: str) -> _GVariantConverter:
+    """builds and caches the converter of a complete GVariant type string"""
+    # basic types take the fast path without any parsing
+    if converter := _BasicConverters.get(type_string):
+        return converter
+    if type_string == _RationalType:
+        return _rational_converter(type_string)
+    if type_string == "v":
+        return _GVariantConverter(new=_new_boxed, get=_get_boxed)
+    if type_string.startswith("a") and len(type_string) > 1:
+        return _array_converter(type_string)
+    if type_string.startswith("(") and type_string.endswith(")"):
+        return _tuple_converter(type_string)
+    if type_string.startswith("{") and type_string.endswith("}"):
+        return _dict_entry_converter(type_string)
+    raise SigrokArgError(hint=f"unsupported GVariant type {type_string}")
+
+
+def _rational_converter(type_string: str) -> _GVariantConverter:
+    pair = _tuple_converter(type_string)
+
+    def new(value: Fraction | float) -> Any:
+        from fractions import Fraction
+
+        value = Fraction(value).limit_denominator()
+        return pair.new((value.numerator, value.denominator))
+
+    def get(variant: Any) -> Fraction:
+        from fractions import Fraction
+
+        return Fraction(*pair.get(variant))
+
+    return _GVariantConverter(new=new, get=get)
+
+
+def _config_data_types() -> dict[int, str]:
+    """GVariant types of the sr_datatype values, see libsigrok/src/hwdriver.c"""
+    return {
+        lib.SR_T_UINT64: "t",
+        lib.SR_T_STRING: "s",
+        lib.SR_T_BOOL: "b",
+        lib.SR_T_FLOAT: "d",
+        lib.SR_T_RATIONAL_PERIOD: "(tt)",
+        lib.SR_T_RATIONAL_VOLT: "(tt)",
+        lib.SR_T_KEYVALUE: "a{ss}",
+        lib.SR_T_UINT64_RANGE: "(tt)",
+        lib.SR_T_DOUBLE_RANGE: "(dd)",
+        lib.SR_T_INT32: "i",
+        lib.SR_T_MQ: "(ut)",
+        lib.SR_T_UINT32: "u",
+    }
+
+
+class ConfigKeyInfo(NamedTuple):
+    key: ConfigKey
+    id: str
+    name: str
+    description: str | None
+    datatype: int
+
+    @property
+    def type_string(self) -> str:
+        return _lazy("ConfigDataTypes")[self.datatype]  # type: ignore[no-any-return]
+
+    @property
+    def is_rational(self) -> bool:
+        return self.datatype in {lib.SR_T_RATIONAL_PERIOD, lib.SR_T_RATIONAL_VOLT}
+
+
+@functools.cache
+def _config_key_info(key: ConfigKey | str) -> ConfigKeyInfo:
+    if isinstance(key, str):
+        info = lib.sr_key_info_name_get(lib.SR_KEY_CONFIG, key.encode("utf-8")).rval
+    else:
+        info = lib.sr_key_info_get(lib.SR_KEY_CONFIG, key).rval
+    if not info:
+        raise SigrokArgError(hint=f"unknown config key {key}")
+    info = _cast_p(info, lib.sr_key_info).contents
+    return ConfigKeyInfo(
+        key=_lazy("ConfigKey")(info.key),
+        id=info.id.decode("utf-8"),
+        name=info.name.decode("utf-8"),
+        description=info.description.decode("utf-8") if info.description else None,
+        datatype=info.datatype,
+    )
+
+
+@functools.cache
+def _config_converter(key: ConfigKey | str) -> tuple[ConfigKeyInfo, _GVariantConverter]:
+    """resolves everything needed to convert values of a key only once"""
+    info = _config_key_info(key)
+    if info.datatype not in _lazy("ConfigDataTypes"):
+        raise SigrokArgError(hint=f"{info.id} has no convertible type")
+    if info.is_rational:
+        return info, _rational_converter(info.type_string)
+    return info, _variant_converter(info.type_string)
 
 
 class Device:
     def __init__(self, dev: Pointer[lib.type_sr_dev_inst]) -> None:
         self._dev = dev
+        self._is_open = False
+
+    @property
+    def is_open(self) -> bool:
+        """opened by this instance and not closed since"""
+        return self._is_open
+
+    def _rebind(self, device: Device) -> None:
+        """takes over the device instance of a rescan, which found it again"""
+        self._dev = device._dev
+        self.__dict__.pop("config", None)
 
     @property
     def vendor(self) -> str | None:
@@ -256,38 +597,136 @@ class Device:
                 return channel
         raise SigrokChannelNotFoundError(name, list(map(str, self.channels())))
 
-    def enable_channels(self, *channels: Channel | str) -> None:
-        channels_to_enable = [
-            ch.name if isinstance(ch, Channel) else ch for ch in channels
+    def channel_groups(self) -> list[ChannelGroup]:
+        return [
+            ChannelGroup(_cast_p(cg, lib.sr_channel_group))
+            for cg in _iter_g_slist(lib.sr_dev_inst_channel_groups_get(self._dev).rval)
         ]
-        for ch in self.channels():
-            ch.enabled = ch.name in channels_to_enable
+
+    def channel_group(self, name: str) -> ChannelGroup:
+        for channel_group in self.channel_groups():
+            if channel_group.name == name:
+                return channel_group
+        raise SigrokChannelGroupNotFoundError(
+            name, [cg.name for cg in self.channel_groups()]
+        )
+
+    def enable_channels(self, *channels: Channel | str) -> None:
+        self.configure().enable_channels(*channels).apply()
+
+    def configure(self) -> DeviceConfiguration:
+        return DeviceConfiguration(self)
+
+    @functools.cached_property
+    def config(self) -> DeviceConfig:
+        return DeviceConfig(self)
 
     def open(self) -> None:
         _try(lib.sr_dev_open(self._dev))
+        self._is_open = True
 
     def close(self) -> None:
         _try(lib.sr_dev_close(self._dev))
+        self._is_open = False
 
-    def set_config_uint64(self, config_key: ConfigKey, value: int) -> None:
-        self._set_config(config_key, lib.g_variant_new_uint64(value).rval)
+    def set_config_uint64(
+        self,
+        config_key: ConfigKey,
+        value: int,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> None:
+        self._set_config(config_key, _variant_converter("t"), value, channel_group)
 
-    def set_config_int32(self, config_key: ConfigKey, value: int) -> None:
-        self._set_config(config_key, lib.g_variant_new_int32(value).rval)
+    def set_config_int32(
+        self,
+        config_key: ConfigKey,
+        value: int,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> None:
+        self._set_config(config_key, _variant_converter("i"), value, channel_group)
 
-    def set_config_double(self, config_key: ConfigKey, value: float) -> None:
-        self._set_config(config_key, lib.g_variant_new_double(value).rval)
+    def set_config_double(
+        self,
+        config_key: ConfigKey,
+        value: float,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> None:
+        self._set_config(config_key, _variant_converter("d"), value, channel_group)
 
-    def set_config_bool(self, config_key: ConfigKey, *, enabled: bool) -> None:
-        self._set_config(config_key, lib.g_variant_new_boolean(enabled).rval)
+    def set_config_bool(
+        self,
+        config_key: ConfigKey,
+        *,
+        enabled: bool,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> None:
+        self._set_config(config_key, _variant_converter("b"), enabled, channel_group)
 
-    def set_config_string(self, config_key: ConfigKey, value: str) -> None:
-        self._set_config(
-            config_key, lib.g_variant_new_string(value.encode("utf-8")).rval
+    def set_config_string(
+        self,
+        config_key: ConfigKey,
+        value: str,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> None:
+        self._set_config(config_key, _variant_converter("s"), value, channel_group)
+
+    def _resolve_channel_group(
+        self, channel_group: ChannelGroup | str | None
+    ) -> ChannelGroup | None:
+        if isinstance(channel_group, str):
+            return self.channel_group(channel_group)
+        return channel_group
+
+    def _config_capabilities(
+        self, config_key: ConfigKey, channel_group: ChannelGroup | None
+    ) -> int:
+        return lib.sr_dev_config_capabilities_list(
+            self._dev,
+            channel_group._cg if channel_group else None,  # noqa: SLF001 access private member
+            config_key.value,
+        ).rval
+
+    def _get_config(
+        self,
+        config_key: ConfigKey,
+        converter: _GVariantConverter,
+        channel_group: ChannelGroup | None,
+    ) -> Any:
+        result = lib.sr_config_get(
+            lib.sr_dev_inst_driver_get(self._dev).rval,
+            self._dev,
+            channel_group._cg if channel_group else None,  # noqa: SLF001 access private member
+            config_key.value,
         )
+        if result.rval != lib.SR_OK:
+            return None
+        variant = result["data"]
+        try:
+            return converter.get(variant)
+        finally:
+            lib.g_variant_unref(variant)
 
-    def _set_config(self, config_key: ConfigKey, gvariant_ptr: int) -> None:
-        _try(lib.sr_config_set(self._dev, None, config_key.value, gvariant_ptr))
+    def _set_config(
+        self,
+        config_key: ConfigKey,
+        converter: _GVariantConverter,
+        value: Any,
+        channel_group: ChannelGroup | str | None,
+    ) -> None:
+        cg = self._resolve_channel_group(channel_group)
+        _try(
+            lib.sr_config_set(
+                self._dev,
+                cg._cg if cg else None,  # noqa: SLF001 access private member
+                config_key.value,
+                converter.new(value),
+            ),
+            hint=config_key.name,
+        )
 
     def __enter__(self) -> Self:
         self.open()
@@ -305,6 +744,366 @@ class Device:
         return f"<device {self.model} snr={self.serial_number}, connid={self.connection_identifier}>"
 
 
+class DeviceConfig:
+    """
+    reads and writes config keys of a device (or one of its channel groups),
+    values are converted according to the datatype libsigrok defines for the key
+    """
+
+    def __init__(
+        self, device: Device, channel_group: ChannelGroup | str | None = None
+    ) -> None:
+        self._device = device
+        self._dev = device._dev  # noqa: SLF001 access private member
+        self._driver = lib.sr_dev_inst_driver_get(self._dev).rval
+        cg = device._resolve_channel_group(channel_group)  # noqa: SLF001 access private member
+        self._cg = cg._cg if cg else None  # noqa: SLF001 access private member
+
+    def channel_group(self, channel_group: ChannelGroup | str) -> DeviceConfig:
+        return DeviceConfig(self._device, channel_group)
+
+    @staticmethod
+    def info(key: ConfigKey | str) -> ConfigKeyInfo:
+        return _config_key_info(key)
+
+    def keys(self) -> list[ConfigKey]:
+        config_key = _lazy("ConfigKey")
+        garray = lib.sr_dev_options(self._driver, self._dev, self._cg).rval
+        return [config_key(key) for key in _consume_g_array(garray, ct.c_uint32)]
+
+    def __iter__(self) -> Iterator[ConfigKey]:
+        return iter(self.keys())
+
+    def __contains__(self, key: ConfigKey | str) -> bool:
+        return _config_key_info(key).key in self.keys()
+
+    def capabilities(self, key: ConfigKey | str) -> int:
+        """SR_CONF_GET, SR_CONF_SET and SR_CONF_LIST flags"""
+        info = _config_key_info(key)
+        return lib.sr_dev_config_capabilities_list(self._dev, self._cg, info.key).rval
+
+    def __getitem__(self, key: ConfigKey | str) -> Any:
+        info, converter = _config_converter(key)
+        result = _try(
+            lib.sr_config_get(self._driver, self._dev, self._cg, info.key), hint=info.id
+        )
+        variant = result["data"]
+        try:
+            return converter.get(variant)
+        finally:
+            lib.g_variant_unref(variant)
+
+    def __setitem__(self, key: ConfigKey | str, value: Any) -> None:
+        info, converter = _config_converter(key)
+        _try(
+            lib.sr_config_set(self._dev, self._cg, info.key, converter.new(value)),
+            hint=info.id,
+        )
+
+    def get(self, key: ConfigKey | str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except SigrokCError:
+            return default
+
+    def possible_values(self, key: ConfigKey | str) -> Any:
+        """possible values of a key, as libsigrok lists them"""
+        info = _config_key_info(key)
+        result = _try(
+            lib.sr_config_list(self._driver, self._dev, self._cg, info.key),
+            hint=info.id,
+        )
+        variant = result["data"]
+        try:
+            return _variant_value(variant)
+        finally:
+            lib.g_variant_unref(variant)
+
+    def update(self, values: dict[ConfigKey | str, Any]) -> None:
+        for key, value in values.items():
+            self[key] = value
+
+    def __repr__(self) -> str:
+        return f"<config of {self._device}>"
+
+
+class _ConfigChange(NamedTuple):
+    config_key: ConfigKey
+    converter: _GVariantConverter
+    value: Any
+    channel_group: str | None
+
+
+class DeviceConfiguration:
+    """
+    collects channel and config changes, which are validated as a whole
+    and only applied to the device where they differ from its current state
+    """
+
+    def __init__(self, device: Device) -> None:
+        self._device = device
+        self._enabled_channels: dict[str, bool] = {}
+        self._changes: dict[tuple[int, str | None], _ConfigChange] = {}
+
+    def enable_channels(self, *channels: Channel | str) -> Self:
+        channels_to_enable = {
+            ch.name if isinstance(ch, Channel) else ch for ch in channels
+        }
+        for ch in self._device.channels():
+            self._enabled_channels[ch.name] = ch.name in channels_to_enable
+        for name in channels_to_enable - self._enabled_channels.keys():
+            self._enabled_channels[name] = True
+        return self
+
+    def set_channel(self, channel: Channel | str, *, enabled: bool) -> Self:
+        name = channel.name if isinstance(channel, Channel) else channel
+        self._enabled_channels[name] = enabled
+        return self
+
+    def set(
+        self,
+        key: ConfigKey | str,
+        value: Any,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> Self:
+        """sets any key, the value is converted by the datatype of the key"""
+        info, converter = _config_converter(key)
+        return self._set(info.key, converter, value, channel_group)
+
+    def set_uint64(
+        self,
+        config_key: ConfigKey,
+        value: int,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> Self:
+        return self._set(config_key, _variant_converter("t"), value, channel_group)
+
+    def set_int32(
+        self,
+        config_key: ConfigKey,
+        value: int,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> Self:
+        return self._set(config_key, _variant_converter("i"), value, channel_group)
+
+    def set_double(
+        self,
+        config_key: ConfigKey,
+        value: float,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> Self:
+        return self._set(config_key, _variant_converter("d"), value, channel_group)
+
+    def set_bool(
+        self,
+        config_key: ConfigKey,
+        *,
+        enabled: bool,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> Self:
+        return self._set(config_key, _variant_converter("b"), enabled, channel_group)
+
+    def set_string(
+        self,
+        config_key: ConfigKey,
+        value: str,
+        *,
+        channel_group: ChannelGroup | str | None = None,
+    ) -> Self:
+        return self._set(config_key, _variant_converter("s"), value, channel_group)
+
+    def _set(
+        self,
+        config_key: ConfigKey,
+        converter: _GVariantConverter,
+        value: Any,
+        channel_group: ChannelGroup | str | None,
+    ) -> Self:
+        name = (
+            channel_group.name
+            if isinstance(channel_group, ChannelGroup)
+            else channel_group
+        )
+        self._changes[(config_key.value, name)] = _ConfigChange(
+            config_key, converter, value, name
+        )
+        return self
+
+    def apply(self) -> int:
+        """validates all changes before applying them, returns the number of applied changes"""
+        device = self._device
+        channels = {ch.name: ch for ch in device.channels()}
+        channel_groups = {cg.name: cg for cg in device.channel_groups()}
+
+        for name in self._enabled_channels:
+            if name not in channels:
+                raise SigrokChannelNotFoundError(name, list(channels))
+        changes: list[tuple[_ConfigChange, ChannelGroup | None]] = []
+        for change in self._changes.values():
+            cg = channel_groups.get(change.channel_group or "")
+            if change.channel_group is not None and cg is None:
+                raise SigrokChannelGroupNotFoundError(
+                    change.channel_group, list(channel_groups)
+                )
+            if not device._config_capabilities(change.config_key, cg) & lib.SR_CONF_SET:  # noqa: SLF001 access private member
+                raise SigrokNotApplicableError(
+                    hint=f"{change.config_key.name} cannot be set"
+                )
+            changes.append((change, cg))
+
+        channel_changes = [
+            (channels[name], enabled)
+            for name, enabled in self._enabled_channels.items()
+            if channels[name].enabled != enabled
+        ]
+        config_changes = [
+            (change, cg)
+            for change, cg in changes
+            # values compare as plain values, snapshots store them so
+            if _plain_value(device._get_config(change.config_key, change.converter, cg))  # noqa: SLF001 access private member
+            != _plain_value(change.value)
+        ]
+
+        for channel, enabled in channel_changes:
+            channel.enabled = enabled
+        for change, cg in config_changes:
+            device._set_config(change.config_key, change.converter, change.value, cg)  # noqa: SLF001 access private member
+
+        self._enabled_channels.clear()
+        self._changes.clear()
+        return len(channel_changes) + len(config_changes)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.apply()
+
+
+def _plain_value(value: Any) -> Any:
+    """converted GVariant values as json values, the converters accept them back"""
+    if isinstance(value, (list, tuple)):
+        return [_plain_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain_value(item) for key, item in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    # rationals, which Fraction parses again
+    return str(value)
+
+
+def _settable_values(config: DeviceConfig) -> dict[str, Any]:
+    settable = lib.SR_CONF_GET | lib.SR_CONF_SET
+    values = {}
+    for key in config:
+        if config.capabilities(key) & settable != settable:
+            continue
+        try:
+            values[_config_key_info(key).id] = _plain_value(config[key])
+        except SigrokCError:
+            # keys without a convertible type or not readable right now
+            continue
+    return values
+
+
+class DeviceConfigSnapshot(NamedTuple):
+    """
+    the settable config of a device and its channel groups, the enabled channels
+    and the trigger stages of a session, all as plain values to be stored as json.
+    config keys are given by their id (e.g. "samplerate"), trigger stages map
+    channel names to conditions as Session.set_trigger takes them
+    """
+
+    config: dict[str, Any]
+    channel_groups: dict[str, dict[str, Any]]
+    channels: dict[str, bool]
+    triggers: tuple[dict[str, str], ...] = ()
+
+    @classmethod
+    def capture(
+        cls, device: Device, session: Session | None = None
+    ) -> DeviceConfigSnapshot:
+        """the config of `device`, with the trigger stages of `session` if given"""
+        return cls(
+            config=_settable_values(device.config),
+            channel_groups={
+                cg.name: _settable_values(device.config.channel_group(cg))
+                for cg in device.channel_groups()
+            },
+            channels={ch.name: ch.enabled for ch in device.channels()},
+            triggers=session.triggers if session is not None else (),
+        )
+
+    def configure(self, device: Device) -> DeviceConfiguration:
+        """the channel and config changes of the snapshot, to apply to `device`"""
+        configuration = device.configure()
+        for name, enabled in self.channels.items():
+            configuration.set_channel(name, enabled=enabled)
+        for key, value in self.config.items():
+            configuration.set(key, value)
+        for channel_group, values in self.channel_groups.items():
+            for key, value in values.items():
+                configuration.set(key, value, channel_group=channel_group)
+        return configuration
+
+    def apply(self, device: Device, session: Session | None = None) -> int:
+        """
+        only applies what differs from the device state, and sets the triggers
+        of `session` if given. returns the number of changed values
+        """
+        changed = self.configure(device).apply()
+        if session is not None:
+            session.set_trigger(self.triggers)
+        return changed
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**self._asdict(), "triggers": list(self.triggers)}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> DeviceConfigSnapshot:
+        return cls(
+            config=dict(data.get("config", {})),
+            channel_groups={
+                name: dict(values)
+                for name, values in data.get("channel_groups", {}).items()
+            },
+            channels=dict(data.get("channels", {})),
+            triggers=tuple(dict(stage) for stage in data.get("triggers", ())),
+        )
+
+
+@contextmanager
+def _scan_options(options: Mapping[ConfigKey | str, Any]) -> Iterator[Any]:
+    """a GSList of sr_config, built in python as libsigrok only reads it"""
+    configs = []
+    nodes = []
+    head = None
+    try:
+        for key, value in options.items():
+            info, converter = _config_converter(key)
+            variant = lib.g_variant_ref_sink(converter.new(value)).rval
+            configs.append(lib.sr_config(key=info.key, data=variant))
+        for config in reversed(configs):
+            nodes.append(
+                lib.GSList(data=ct.cast(ct.pointer(config), ct.c_void_p), next=head)
+            )
+            head = ct.pointer(nodes[-1])
+        yield head
+    finally:
+        for config in configs:
+            lib.g_variant_unref(config.data)
+
+
 class DeviceDriver:
     def __init__(
         self, sr: Pointer[lib.type_sr_context], dr: Pointer[lib.type_sr_dev_driver]
@@ -335,22 +1134,45 @@ class DeviceDriver:
     ) -> None:
         pass
 
+    def clear(self) -> None:
+        """
+        frees all device instances the scans of the driver created, closing open
+        ones. devices of the driver must not be used afterwards
+        """
+        _try(lib.sr_dev_clear(self._dr))
+
     def get_scan_options(self) -> list[ConfigKey] | None:
         garray = lib.sr_driver_scan_options_list(self._dr).rval
-        return [ConfigKey(cfg_key) for cfg_key in _consume_g_array(garray, ct.c_uint32)]
+        config_key = _lazy("ConfigKey")
+        return [
+            config_key(cfg_key) for cfg_key in _consume_g_array(garray, ct.c_uint32)
+        ]
 
-    def scan(self) -> list[Device]:
-        slist = lib.sr_driver_scan(self._dr, options=None).rval
+    def scan(
+        self, options: Mapping[ConfigKey | str, Any] | None = None
+    ) -> list[Device]:
+        """
+        `options` are scan options like {"conn": "tcp-raw/192.168.1.2/5025"},
+        which serial and network instruments need to be found
+        """
+        with _scan_options(options or {}) as slist_options:
+            slist = lib.sr_driver_scan(self._dr, options=slist_options).rval
         if slist is None:
             return []
         return [
             Device(dev=_cast_p(x, lib.sr_dev_inst)) for x in _consume_g_slist(slist)
         ]
 
-    def get_device(self, idx: int = 0, *, serial_number: str | None = None) -> Device:
+    def get_device(
+        self,
+        idx: int = 0,
+        *,
+        serial_number: str | None = None,
+        options: Mapping[ConfigKey | str, Any] | None = None,
+    ) -> Device:
         devices = [
             device
-            for device in self.scan()
+            for device in self.scan(options)
             if serial_number is None or device.serial_number == serial_number
         ]
         try:
@@ -366,19 +1188,43 @@ class DeviceDriver:
 
 
 class Packet:
+    # packets are built on the acquisition thread, so only scalars are copied
+    # eagerly and everything else gets decoded on first access
+    __slots__ = ("_device", "_sdi", "type")
+
     def __init__(
-        self, packet: Pointer[lib.type_sr_datafeed_packet], device: Device
+        self,
+        packet: Pointer[lib.type_sr_datafeed_packet],
+        device: Device | Pointer[lib.type_sr_dev_inst],
     ) -> None:
         self.type = packet.contents.type
-        self.device = device
+        self._set_device(device)
+
+    def _set_device(self, device: Device | Pointer[lib.type_sr_dev_inst]) -> None:
+        if isinstance(device, Device):
+            self._device: Device | None = device
+            self._sdi = None
+        else:
+            self._device = None
+            self._sdi = device
+
+    @property
+    def device(self) -> Device:
+        if self._device is None:
+            self._device = Device(dev=_cast_p(self._sdi, lib.sr_dev_inst))
+        return self._device
 
     def __repr__(self) -> str:
         return f"<packet type={self.type}>"
 
 
 class HeaderPacket(Packet):
+    __slots__ = ("feed_version",)
+
     def __init__(
-        self, packet: Pointer[lib.type_sr_datafeed_packet], device: Device
+        self,
+        packet: Pointer[lib.type_sr_datafeed_packet],
+        device: Device | Pointer[lib.type_sr_dev_inst],
     ) -> None:
         super().__init__(packet, device)
         payload = _cast_p(packet.contents.payload, lib.sr_datafeed_header)
@@ -389,84 +1235,858 @@ class HeaderPacket(Packet):
 
 
 class EndPacket(Packet):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return "<datafeed end>"
 
 
 class LogicPacket(Packet):
+    __slots__ = ("data", "length", "unitsize")
+
     def __init__(
-        self, packet: Pointer[lib.type_sr_datafeed_packet], device: Device
+        self,
+        packet: Pointer[lib.type_sr_datafeed_packet],
+        device: Device | Pointer[lib.type_sr_dev_inst],
     ) -> None:
         super().__init__(packet, device)
-        payload = _cast_p(packet.contents.payload, lib.sr_datafeed_logic)
-        self.length = payload.contents.length
-        self.unitsize = payload.contents.unitsize
-        self.data = bytes(
-            ct.cast(
-                payload.contents.data, ct.POINTER(ct.c_ubyte * self.length)
-            ).contents
-        )
+        payload = _cast_p(packet.contents.payload, lib.sr_datafeed_logic).contents
+        self.length = payload.length
+        self.unitsize = payload.unitsize
+        # the payload is only valid during the callback
+        self.data = ct.string_at(payload.data, self.length)
+
+    @classmethod
+    def from_data(
+        cls, data: bytes, unitsize: int, device: Device | Pointer[lib.type_sr_dev_inst]
+    ) -> Self:
+        packet = cls.__new__(cls)
+        packet.type = lib.SR_DF_LOGIC
+        packet._set_device(device)  # noqa: SLF001 access private member
+        packet.length = len(data)
+        packet.unitsize = unitsize
+        packet.data = data
+        return packet
+
+    def with_data(self, data: bytes) -> Self:
+        """returns a copy carrying `data` instead"""
+        packet = copy.copy(self)
+        packet.data = data
+        packet.length = len(data)
+        return packet
 
     def __repr__(self) -> str:
         return f"<logic packet {self.data[:8].hex(sep=' ').upper()}... {self.length}>"
 
 
+class MetaPacket(Packet):
+    __slots__ = ("config",)
+
+    def __init__(
+        self,
+        packet: Pointer[lib.type_sr_datafeed_packet],
+        device: Device | Pointer[lib.type_sr_dev_inst],
+    ) -> None:
+        super().__init__(packet, device)
+        payload = _cast_p(packet.contents.payload, lib.sr_datafeed_meta)
+        config_key = _lazy("ConfigKey")
+        self.config: dict[ConfigKey, Any] = {}
+        for item in _iter_g_slist(payload.contents.config):
+            config = _cast_p(item, lib.sr_config).contents
+            if (value := _variant_value(config.data)) is not None:
+                self.config[config_key(config.key)] = value
+
+    def __repr__(self) -> str:
+        config = ", ".join(f"{key.name}={value}" for key, value in self.config.items())
+        return f"<meta {config}>"
+
+
+class _AnalogEncoding(NamedTuple):
+    unitsize: int
+    is_signed: bool
+    is_float: bool
+    is_bigendian: bool
+    scale: float
+    offset: float
+
+
+class AnalogPacket(Packet):
+    __slots__ = (
+        "_channel_names",
+        "_channels",
+        "_data",
+        "_encoding",
+        "_raw",
+        "mq",
+        "mqflags",
+        "num_samples",
+        "unit",
+    )
+
+    def __init__(
+        self,
+        packet: Pointer[lib.type_sr_datafeed_packet],
+        device: Device | Pointer[lib.type_sr_dev_inst],
+    ) -> None:
+        super().__init__(packet, device)
+        payload = _cast_p(packet.contents.payload, lib.sr_datafeed_analog).contents
+        meaning = payload.meaning.contents
+        encoding = payload.encoding.contents
+        self.num_samples = payload.num_samples
+        self.mq = meaning.mq
+        self.unit = meaning.unit
+        self.mqflags = meaning.mqflags
+
+        # walks the list directly, g_slist_nth_data would be quadratic
+        channels = []
+        node = _cast_p(meaning.channels, lib.GSList)
+        while node:
+            channels.append(node.contents.data)
+            node = _cast_p(node.contents.next, lib.GSList)
+        self._channels = tuple(channels)
+        self._channel_names: list[str] | None = None
+
+        # samples of all channels are interleaved, decoded on first access
+        self._encoding = _AnalogEncoding(
+            unitsize=encoding.unitsize,
+            is_signed=bool(encoding.is_signed),
+            is_float=bool(encoding.is_float),
+            is_bigendian=bool(encoding.is_bigendian),
+            scale=encoding.scale.p / encoding.scale.q,
+            offset=encoding.offset.p / encoding.offset.q,
+        )
+        self._raw = ct.string_at(
+            payload.data, self.num_samples * len(channels) * encoding.unitsize
+        )
+        self._data: bytes | None = None
+
+    @property
+    def channels(self) -> list[str]:
+        if self._channel_names is None:
+            self._channel_names = [
+                Channel(_cast_p(ch, lib.sr_channel)).name for ch in self._channels
+            ]
+        return self._channel_names
+
+    @property
+    def data(self) -> bytes:
+        """native float32, use memoryview(data).cast("f") or numpy.frombuffer"""
+        if self._data is None:
+            self._data = _decode_analog(self._raw, self._encoding)
+        return self._data
+
+    @property
+    def values(self) -> memoryview:
+        return memoryview(self.data).cast("f")
+
+    def with_data(self, data: bytes) -> Self:
+        """returns a copy carrying the float32 values `data` instead"""
+        packet = copy.copy(self)
+        packet._data = data  # noqa: SLF001 access private member
+        return packet
+
+    def __repr__(self) -> str:
+        return f"<analog packet {','.join(self.channels)} {self.num_samples}>"
+
+
+def _decode_analog(raw: bytes, encoding: _AnalogEncoding) -> bytes:
+    """converts raw analog samples like sr_analog_to_float"""
+    # numpy is imported here to keep it out of the import time
+    import numpy as np
+
+    kind = "f" if encoding.is_float else "i" if encoding.is_signed else "u"
+    byteorder = ">" if encoding.is_bigendian else "<"
+    values = np.frombuffer(raw, dtype=f"{byteorder}{kind}{encoding.unitsize}").astype(
+        np.float32
+    )
+    if encoding.scale != 1 or encoding.offset != 0:
+        values = values * np.float32(encoding.scale) + np.float32(encoding.offset)
+    return values.tobytes()
+
+
+def _packet_types() -> dict[int, type[Packet]]:
+    return {
+        lib.SR_DF_HEADER: HeaderPacket,
+        lib.SR_DF_END: EndPacket,
+        lib.SR_DF_META: MetaPacket,
+        lib.SR_DF_LOGIC: LogicPacket,
+        lib.SR_DF_ANALOG: AnalogPacket,
+    }
+
+
 def parse_packet(
-    packet: Pointer[lib.type_sr_datafeed_packet], device: Device
+    packet: Pointer[lib.type_sr_datafeed_packet],
+    device: Device | Pointer[lib.type_sr_dev_inst],
 ) -> Packet:
-    if packet.contents.type == lib.SR_DF_HEADER:
-        return HeaderPacket(packet, device)
-    if packet.contents.type == lib.SR_DF_END:
-        return EndPacket(packet, device)
-    if packet.contents.type == lib.SR_DF_LOGIC:
-        return LogicPacket(packet, device)
-    return Packet(packet, device)
+    packet_type = _lazy("PacketTypes").get(packet.contents.type, Packet)
+    return packet_type(packet, device)  # type: ignore[no-any-return]
+
+
+class TransformOption(NamedTuple):
+    id: str
+    name: str
+    description: str
+    default: Any
+
+
+class TransformModule:
+    def __init__(self, tmod: Any) -> None:
+        self._tmod = tmod
+
+    @property
+    def id(self) -> str:
+        return lib.sr_transform_id_get(self._tmod).rval.decode("utf-8")
+
+    @property
+    def name(self) -> str:
+        return lib.sr_transform_name_get(self._tmod).rval.decode("utf-8")
+
+    @property
+    def description(self) -> str:
+        return lib.sr_transform_description_get(self._tmod).rval.decode("utf-8")
+
+    def _options(self) -> Iterator[Any]:
+        """yields the raw options, which are only valid while iterating"""
+        if not (options := lib.sr_transform_options_get(self._tmod).rval):
+            return
+        try:
+            for option in itertools.takewhile(
+                lambda opt: opt, _cast_p(options, ct.c_void_p)
+            ):
+                yield _cast_p(option, lib.sr_option).contents
+        finally:
+            lib.sr_transform_options_free(options)
+
+    def options(self) -> list[TransformOption]:
+        return [
+            TransformOption(
+                id=option.id.decode("utf-8"),
+                name=option.name.decode("utf-8"),
+                description=option.desc.decode("utf-8"),
+                default=_variant_value(getattr(option, "def")),
+            )
+            for option in self._options()
+        ]
+
+    def _new_options(self, options: dict[str, Any]) -> tuple[Any, list[bytes]]:
+        """builds the options hash table, the keys must outlive it"""
+        # the defaults are released with the options, only their types are kept
+        types = {
+            option.id.decode("utf-8"): _variant_type(getattr(option, "def"))
+            for option in self._options()
+        }
+        for name in options.keys() - types.keys():
+            raise SigrokArgError(hint=f"{self.id} has no option {name}")
+        converters = {}
+        for name in options:
+            if (type_string := types[name]) is None:
+                raise SigrokArgError(
+                    hint=f"option {name} of {self.id} is not supported"
+                )
+            converters[name] = _variant_converter(type_string)
+
+        table = lib.g_hash_table_new_full(
+            ct.cast(lib.g_str_hash.func, lib.g_hash_table_new_full.arg_types[0]),  # type: ignore[attr-defined]
+            ct.cast(lib.g_str_equal.func, lib.g_hash_table_new_full.arg_types[1]),  # type: ignore[attr-defined]
+            None,
+            ct.cast(lib.g_variant_unref.func, lib.g_hash_table_new_full.arg_types[3]),  # type: ignore[attr-defined]
+        ).rval
+        keys = []
+        for name, value in options.items():
+            key = name.encode("utf-8")
+            keys.append(key)
+            variant = lib.g_variant_ref_sink(converters[name].new(value)).rval
+            lib.g_hash_table_insert(table, key, variant)
+        return table, keys
+
+    def __repr__(self) -> str:
+        return f"<transform {self.id}>"
+
+
+class IOCondition(enum.IntFlag):
+    # GIOCondition, glib uses the poll() values on all platforms
+    IN = 1
+    PRI = 2
+    OUT = 4
+    ERR = 8
+    HUP = 16
+    NVAL = 32
+
+
+# native resources owned by python objects, to detect leaks in long-running services
+_live_resources: collections.Counter[str] = collections.Counter()
+_live_lock = threading.Lock()
+
+
+def _track(kind: str, delta: int = 1) -> None:
+    with _live_lock:
+        _live_resources[kind] += delta
+
+
+def live_resources() -> dict[str, int]:
+    """
+    the number of libsigrok contexts, sessions, inputs and triggers
+    and of GLib main contexts and sources currently alive
+    """
+    with _live_lock:
+        return {kind: count for kind, count in _live_resources.items() if count}
+
+
+class Source:
+    """a timer or fd source attached to the main context of a session"""
+
+    def __init__(self, source: Any, *callbacks: Any) -> None:
+        self._source = source
+        # the ctypes callbacks must outlive the source
+        self._callbacks = callbacks
+        _track("sources")
+
+    @property
+    def is_active(self) -> bool:
+        return (
+            self._source is not None
+            and not lib.g_source_is_destroyed(self._source).rval
+        )
+
+    def _dispatch(self, callback: Callable[[], bool | None]) -> bool:
+        try:
+            keep = callback() is not False
+        except Exception:
+            sigrok_logger.exception("source callback failed, removing it")
+            keep = False
+        return keep
+
+    def remove(self) -> None:
+        if self._source is not None:
+            lib.g_source_destroy(self._source)
+            lib.g_source_unref(self._source)
+            self._source = None
+            _track("sources", -1)
+
+    def __repr__(self) -> str:
+        return f"<source active={self.is_active}>"
+
+
+def _timer_source(
+    context: Any, interval: float, callback: Callable[[], bool | None]
+) -> Source:
+    gsource = lib.g_timeout_source_new(max(0, round(interval * 1000))).rval
+    source = Source(gsource)
+    source_func = lib.g_source_set_callback.arg_types[1](  # type: ignore[attr-defined]
+        lambda _data: source._dispatch(callback)  # noqa: SLF001 access private member
+    )
+    source._callbacks = (source_func,)  # noqa: SLF001 access private member
+    lib.g_source_set_callback(gsource, source_func, None, None)
+    lib.g_source_attach(gsource, context)
+    return source
+
+
+def _fd_source(
+    context: Any,
+    fd: int,
+    events: IOCondition,
+    callback: Callable[[int, IOCondition], bool | None],
+) -> Source:
+    poll_fd = lib.GPollFD(fd=fd, events=events, revents=0)
+    fields = dict(lib.GSourceFuncs._fields_)
+
+    def dispatch(_source: Any, _callback: Any, _data: Any) -> bool:
+        revents = IOCondition(poll_fd.revents)
+        return source._dispatch(lambda: callback(fd, revents))  # noqa: SLF001 access private member
+
+    check = fields["check"](lambda _source: bool(poll_fd.revents))
+    dispatch_func = fields["dispatch"](dispatch)
+    funcs = lib.GSourceFuncs(check=check, dispatch=dispatch_func)
+    gsource = lib.g_source_new(ct.byref(funcs), ct.sizeof(lib.GSource)).rval
+    source = Source(gsource, poll_fd, funcs, check, dispatch_func)
+    lib.g_source_add_poll(gsource, ct.byref(poll_fd))
+    lib.g_source_attach(gsource, context)
+    return source
+
+
+class _ReplayPacer:
+    """delays packets of a replayed capture to match the original samplerate"""
+
+    def __init__(
+        self,
+        speed: float,
+        samplerate: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.speed = speed
+        self.samplerate = samplerate
+        self._fixed_samplerate = samplerate is not None
+        self._clock = clock
+        self._origin_time = 0.0
+        self._origin_samples = 0
+        self._logic_samples = 0
+        self._analog_samples: dict[str, int] = {}
+
+    @property
+    def samples(self) -> int:
+        # mixed signal captures advance logic and analog channels in parallel
+        return max(self._logic_samples, *self._analog_samples.values(), 0)
+
+    def _rebase(self, samplerate: int | None) -> None:
+        self.samplerate = samplerate
+        self._origin_time = self._clock()
+        self._origin_samples = self.samples
+
+    def delay(self, packet: Packet) -> float:
+        """returns the time in seconds until `packet` is due"""
+        if isinstance(packet, HeaderPacket):
+            self._logic_samples = 0
+            self._analog_samples.clear()
+            self._rebase(
+                self.samplerate
+                if self._fixed_samplerate
+                else packet.device._get_config(  # noqa: SLF001 access private member
+                    _lazy("ConfigKey").SR_CONF_SAMPLERATE, _variant_converter("t"), None
+                )
+            )
+        elif isinstance(packet, MetaPacket):
+            samplerate = packet.config.get(_lazy("ConfigKey").SR_CONF_SAMPLERATE)
+            if samplerate and not self._fixed_samplerate:
+                self._rebase(samplerate)
+        elif isinstance(packet, LogicPacket):
+            self._logic_samples += packet.length // packet.unitsize
+        elif isinstance(packet, AnalogPacket):
+            for channel in packet.channels:
+                self._analog_samples[channel] = (
+                    self._analog_samples.get(channel, 0) + packet.num_samples
+                )
+        else:
+            return 0.0
+
+        # without a known samplerate packets are passed on unthrottled
+        if not self.samplerate:
+            return 0.0
+        due = self._origin_time + (self.samples - self._origin_samples) / (
+            self.samplerate * self.speed
+        )
+        return due - self._clock()
+
+
+def _trigger_match(condition: str) -> tuple[int, float]:
+    """
+    conditions like sigrok-cli takes them: "0", "1", "r", "f", "e" for logic
+    and ">1.5" or "<1.5" (over/under) for analog channels
+    """
+    matches = {
+        "0": lib.SR_TRIGGER_ZERO,
+        "1": lib.SR_TRIGGER_ONE,
+        "r": lib.SR_TRIGGER_RISING,
+        "f": lib.SR_TRIGGER_FALLING,
+        "e": lib.SR_TRIGGER_EDGE,
+    }
+    if condition in matches:
+        return matches[condition], 0.0
+    if condition[:1] in ("<", ">"):
+        try:
+            value = float(condition[1:])
+        except ValueError:
+            pass
+        else:
+            over = condition[0] == ">"
+            return (lib.SR_TRIGGER_OVER if over else lib.SR_TRIGGER_UNDER), value
+    raise SigrokArgError(hint=f"invalid trigger condition {condition!r}")
+
+
+def _new_trigger(
+    stages: Iterable[Mapping[str, str]], channels: Mapping[str, Channel]
+) -> Any:
+    # everything gets validated before the trigger is built
+    resolved = []
+    for matches in stages:
+        stage = []
+        for name, condition in matches.items():
+            if name not in channels:
+                raise SigrokChannelNotFoundError(name, list(channels))
+            stage.append((channels[name], condition, *_trigger_match(condition)))
+        resolved.append(stage)
+
+    trigger = lib.sr_trigger_new(None).rval
+    try:
+        for stage in resolved:
+            sr_stage = lib.sr_trigger_stage_add(trigger).rval
+            for channel, condition, match, value in stage:
+                _try(
+                    lib.sr_trigger_match_add(
+                        sr_stage,
+                        channel._ch,  # noqa: SLF001 access private member
+                        match,
+                        value,
+                    ),
+                    hint=f"{channel.name}={condition}",
+                )
+    except SigrokError:
+        lib.sr_trigger_free(trigger)
+        raise
+    _track("triggers")
+    return trigger
+
+
+def _free_trigger(trigger: Any) -> None:
+    lib.sr_trigger_free(trigger)
+    _track("triggers", -1)
+
+
+# how long closing waits for the threads of a running session
+StopTimeout = 10.0
+
+
+class _SessionResources:
+    """
+    the native resources of a session, released once either by Session.close
+    or by the finalizer of the session. it must not refer to the session
+    """
+
+    def __init__(self, sess: Pointer[lib.type_sr_session], context: Any) -> None:
+        self.sess = sess
+        self.context = context
+        self.sources: list[Source] = []
+        # threads which were never started keep their target, the session
+        self.threads: list[weakref.ref[threading.Thread]] = []
+        self.trigger: Any = None
+        self.input: Any = None
+        self.staging: Staging | None = None
+        _track("sessions")
+        _track("main_contexts")
+
+    def stop(self, timeout: float | None) -> None:
+        """raises TimeoutError if the session threads do not end within `timeout`"""
+        threads = [thread() for thread in self.threads]
+        if running := [thread for thread in threads if thread and thread.is_alive()]:
+            lib.sr_session_stop(self.sess)
+            for thread in running:
+                thread.join(timeout)
+            if any(thread.is_alive() for thread in running):
+                raise TimeoutError(timeout)
+
+    def release(self) -> None:
+        try:
+            self.stop(StopTimeout)
+        except TimeoutError:
+            # only at interpreter exit, destroying a running session would crash
+            sigrok_logger.warning("session still running, it is not released")
+            return
+        for source in self.sources:
+            source.remove()
+        try:
+            _try(lib.sr_session_destroy(self.sess))
+        finally:
+            _track("sessions", -1)
+            if self.trigger is not None:
+                _free_trigger(self.trigger)
+            if self.input is not None:
+                lib.sr_input_free(self.input)
+                _track("inputs", -1)
+            lib.g_main_context_unref(self.context)
+            _track("main_contexts", -1)
+            if self.staging is not None:
+                self.staging.close()
 
 
 class Session:
-    def __init__(self, sess: Pointer[lib.type_sr_session]) -> None:
+    def __init__(
+        self,
+        sess: Pointer[lib.type_sr_session],
+        *,
+        pacer: _ReplayPacer | None = None,
+        staging: Staging | None = None,
+        drain_interval: float = 0.001,
+        log_route: _LogRoute | None = None,
+    ) -> None:
         self._sess = sess
+        # the session loop runs on its own context, sources are attached to it
+        self._context = lib.g_main_context_new().rval
+        self._resources = _SessionResources(sess, self._context)
+        self._resources.staging = staging
+        self._finalizer = weakref.finalize(self, self._resources.release)
         self._queue: queue.Queue[Packet] = queue.Queue()
+        self._pacer = pacer
+        self._staging = staging
+        self._drain_interval = drain_interval
+        self._stopping = threading.Event()
+        # set once the session thread is done, the drain thread empties the
+        # staging buffer a last time and ends
+        self._acquired = threading.Event()
+        self._profiler: SessionProfiler | None = None
+        # libsigrok logs of the session thread go to the context of the session
         self._thread = threading.Thread(
-            target=lambda: _try(lib.sr_session_run(self._sess)), daemon=True
+            target=_log_router.bind(self._acquire, log_route or _log_router.current()),
+            name="sigrok-session",
+            daemon=True,
         )
+        self._drain_thread = threading.Thread(
+            target=self._drain, name="sigrok-drain", daemon=True
+        )
+        self._resources.threads += map(weakref.ref, (self._thread, self._drain_thread))
+        self._sources = self._resources.sources
+        self._devices: list[Device] = []
+        self._stages: list[Callable[[Packet], Packet | None]] = []
+        self._triggers: tuple[dict[str, str], ...] = ()
         self._packet_callback = lib.sr_session_datafeed_callback_add.arg_types[1](  # type: ignore[attr-defined]
-            lambda dev, packet, _data: self._queue.put(
-                parse_packet(
-                    _cast_p(packet, lib.sr_datafeed_packet),
-                    Device(dev=_cast_p(dev, lib.sr_dev_inst)),
-                )
-            )
+            self._on_packet
         )
 
     def add_device(self, device: Device) -> None:
         _try(lib.sr_session_dev_add(self._sess, device._dev))  # noqa: SLF001 access private member
+        self._devices.append(device)
+
+    def add_transform(
+        self,
+        module: TransformModule | str,
+        *,
+        device: Device | None = None,
+        **options: Any,
+    ) -> None:
+        """
+        chains a libsigrok transform module, which changes packets natively
+        before they reach python. the module is set up for `device`, which can
+        only be left out in sessions of a single device. transforms apply to
+        the packets of all devices and stay until the session gets destroyed
+        """
+        if isinstance(module, str):
+            module = Sigrok.get_transform(module)
+        device = self._transform_device(device)
+
+        table, _keys = module._new_options(options)  # noqa: SLF001 access private member
+        try:
+            transform = lib.sr_transform_new(
+                module._tmod,  # noqa: SLF001 access private member
+                table,
+                device._dev,  # noqa: SLF001 access private member
+            ).rval
+        finally:
+            lib.g_hash_table_destroy(table)
+        if not transform:
+            raise SigrokArgError(hint=f"invalid options for transform {module.id}")
+
+    def _transform_device(self, device: Device | None) -> Device:
+        if device is None:
+            if len(self._devices) != 1:
+                raise SigrokArgError(
+                    hint="transforms need the device of a session with "
+                    f"{len(self._devices)} devices"
+                )
+            return self._devices[0]
+        added = {_address(dev._dev) for dev in self._devices}  # noqa: SLF001 access private member
+        if _address(device._dev) not in added:  # noqa: SLF001 access private member
+            raise SigrokArgError(hint=f"{device} is not part of the session")
+        return device
+
+    def add_stage(self, stage: Callable[[Packet], Packet | None]) -> None:
+        """
+        chains a python stage, which runs after all transform modules and
+        returns the packet to pass on, a replacement or None to drop it
+        """
+        self._stages.append(stage)
+
+    def set_trigger(self, stages: Iterable[Mapping[str, str]] | None) -> None:
+        """
+        sets the trigger stages, each maps channel names of the session devices
+        to a condition ("0", "1", "r", "f", "e", ">1.5", "<1.5"),
+        without stages the trigger gets removed
+        """
+        stages = list(stages or ())
+        trigger = None
+        if stages:
+            channels = {
+                ch.name: ch for device in self._devices for ch in device.channels()
+            }
+            trigger = _new_trigger(stages, channels)
+        try:
+            _try(lib.sr_session_trigger_set(self._sess, trigger))
+        except SigrokCError:
+            # the session still uses the previous trigger
+            if trigger is not None:
+                _free_trigger(trigger)
+            raise
+        if self._resources.trigger is not None:
+            _free_trigger(self._resources.trigger)
+        self._resources.trigger = trigger
+        self._triggers = tuple(dict(stage) for stage in stages)
+
+    @property
+    def triggers(self) -> tuple[dict[str, str], ...]:
+        """the trigger stages as set_trigger took them"""
+        return self._triggers
+
+    @property
+    def profiler(self) -> SessionProfiler | None:
+        return self._profiler
+
+    def profile(self, profiler: SessionProfiler | None = None) -> SessionProfiler:
+        """
+        times each stage of every packet from now on,
+        should be enabled before the session gets started
+        """
+        if profiler is None:
+            from sigrok.profiling import SessionProfiler
+
+            profiler = SessionProfiler()
+        self._profiler = profiler
+        return profiler
 
     @property
     def is_running(self) -> bool:
         return bool(_try(lib.sr_session_is_running(self._sess)).rval)
 
+    @property
+    def dropped_packets(self) -> int:
+        """logic packets lost because the staging buffer was full"""
+        return self._staging.dropped if self._staging else 0
+
+    @property
+    def backlog(self) -> int:
+        """packets queued and not yet taken by next_packet"""
+        return self._queue.qsize()
+
+    def add_timer(self, interval: float, callback: Callable[[], bool | None]) -> Source:
+        """
+        calls `callback` every `interval` seconds on the session thread,
+        until the source gets removed or the callback returns False
+        """
+        source = _timer_source(self._context, interval, callback)
+        self._sources.append(source)
+        return source
+
+    def add_fd(
+        self,
+        fd: int | SupportsFileno,
+        callback: Callable[[int, IOCondition], bool | None],
+        events: IOCondition = IOCondition.IN,
+    ) -> Source:
+        """
+        calls `callback` on the session thread whenever `fd` is ready for `events`,
+        until the source gets removed or the callback returns False
+        """
+        if not isinstance(fd, int):
+            fd = fd.fileno()
+        source = _fd_source(self._context, fd, events, callback)
+        self._sources.append(source)
+        return source
+
     def next_packet(self, timeout: float | None = None) -> Packet:
+        profiler = self._profiler
+        start = profiler.waiting() if profiler is not None else 0
         try:
-            return self._queue.get(timeout=timeout)
+            packet = self._queue.get(timeout=timeout)
         except queue.Empty as e:
             raise TimeoutError(timeout) from e
+        if profiler is not None:
+            profiler.dequeued(start)
+        return packet
 
-    def start(self) -> None:
-        _try(
-            lib.sr_session_datafeed_callback_add(
-                self._sess, self._packet_callback, None
-            )
-        )
+    def _run(self) -> None:
+        _try(lib.sr_session_run(self._sess))
+
+    def _acquire(self) -> None:
+        try:
+            self._run()
+        finally:
+            self._acquired.set()
+
+    def _on_packet(self, dev: Any, packet: Any, _data: Any) -> None:
+        if (profiler := self._profiler) is None:
+            self._receive(parse_packet(_cast_p(packet, lib.sr_datafeed_packet), dev))
+            return
+        start = profiler.callback_started()
+        parsed = parse_packet(_cast_p(packet, lib.sr_datafeed_packet), dev)
+        profiler.record("parse", start)
+        self._receive(parsed)
+        profiler.callback_finished(start)
+
+    def _apply_stages(self, packet: Packet) -> Packet | None:
+        for stage in self._stages:
+            if (staged := stage(packet)) is None:
+                return None
+            packet = staged
+        return packet
+
+    def _receive(self, packet: Packet) -> None:
+        if self._pacer is not None and (delay := self._pacer.delay(packet)) > 0:
+            # runs on the acquisition thread, which throttles the data source
+            self._stopping.wait(delay)
+        if (profiler := self._profiler) is None:
+            if (staged := self._apply_stages(packet)) is not None:
+                self._queue.put(staged)
+            return
+        start = time.perf_counter_ns()
+        staged = self._apply_stages(packet)
+        start = profiler.record("stages", start)
+        if staged is not None:
+            self._queue.put(staged)
+            profiler.enqueued(start)
+
+    def _drain(self) -> None:
+        assert self._staging is not None  # noqa: S101 only started with staging
+        while True:
+            finished = self._acquired.is_set()
+            start = time.perf_counter_ns()
+            packets = self._staging.drain()
+            if self._profiler is not None and packets:
+                # all pending packets get built at once while draining
+                self._profiler.record("parse", start)
+            for packet in packets:
+                self._receive(packet)
+            if finished:
+                return
+            time.sleep(self._drain_interval)
+
+    def _add_callback(self) -> None:
+        if self._staging is None:
+            callback, data = self._packet_callback, None
+        else:
+            callback, data = self._staging.callback, self._staging.callback_data
+        _try(lib.sr_session_datafeed_callback_add(self._sess, callback, data))
 
-        _try(lib.sr_session_start(self._sess))
+    def start(self) -> None:
+        self._add_callback()
+        # libsigrok runs the session on the thread default context
+        lib.g_main_context_push_thread_default(self._context)
+        try:
+            _try(lib.sr_session_start(self._sess))
+        finally:
+            lib.g_main_context_pop_thread_default(self._context)
         self._thread.start()
+        if self._staging is not None:
+            self._drain_thread.start()
+
+    def _join(self, timeout: float | None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in (self._thread, self._drain_thread):
+            if thread.is_alive():
+                thread.join(
+                    None if deadline is None else max(0, deadline - time.monotonic())
+                )
+                if thread.is_alive():
+                    raise TimeoutError(timeout)
 
-    def stop(self) -> None:
+    def stop(self, timeout: float | None = None) -> None:
+        """raises TimeoutError if the session threads do not end within `timeout`"""
+        self._stopping.set()
         _try(lib.sr_session_stop(self._sess))
-        self._thread.join()
+        self._join(timeout)
         _try(lib.sr_session_datafeed_callback_remove_all(self._sess))
 
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self, timeout: float | None = StopTimeout) -> None:
+        """
+        stops the session if it is running and releases its native resources,
+        a session is closed at the latest when it gets garbage collected
+        or its Sigrok context exits
+        """
+        if self._thread.is_alive():
+            self.stop(timeout)
+        # raises while the threads run on, the finalizer stays armed for a retry
+        self._resources.stop(timeout)
+        self._finalizer()
+
     def __enter__(self) -> Self:
         self.start()
         return self
@@ -477,10 +2097,67 @@ class Session:
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> None:
-        self.stop()
+        self.stop(StopTimeout)
+
+
+class ReplaySession(Session):
+    """
+    replays a capture file through a libsigrok input module,
+    its virtual device emits the same packets as a hardware device would
+    """
+
+    def __init__(
+        self,
+        sess: Pointer[lib.type_sr_session],
+        input_: Any,
+        path: Path,
+        *,
+        pacer: _ReplayPacer | None = None,
+        chunk_size: int = 1 << 16,
+    ) -> None:
+        super().__init__(sess, pacer=pacer)
+        self._input = input_
+        self._resources.input = input_
+        _track("inputs")
+        self._path = path
+        self._chunk_size = chunk_size
 
-    def __del__(self) -> None:
-        _try(lib.sr_session_destroy(self._sess))
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def _send(self, data: bytes) -> None:
+        buf = lib.g_string_new_len(data, len(data)).rval
+        try:
+            _try(lib.sr_input_send(self._input, buf), hint=str(self._path))
+        finally:
+            lib.g_string_free(buf, free_segment=True)
+
+    def _run(self) -> None:
+        device: Device | None = None
+        with self._path.open("rb") as f:
+            while not self._stopping.is_set() and (data := f.read(self._chunk_size)):
+                # there is no session loop, sources are dispatched between chunks
+                while lib.g_main_context_iteration(self._context, may_block=False).rval:
+                    pass
+                self._send(data)
+                # the virtual device gets created once the input module
+                # has seen enough data to know the channels
+                if device is None and (
+                    sdi := lib.sr_input_dev_inst_get(self._input).rval
+                ):
+                    device = Device(dev=_cast_p(sdi, lib.sr_dev_inst))
+                    self.add_device(device)
+        _try(lib.sr_input_end(self._input), hint=str(self._path))
+
+    def start(self) -> None:
+        self._add_callback()
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopping.set()
+        self._join(timeout)
+        _try(lib.sr_session_datafeed_callback_remove_all(self._sess))
 
 
 class SigrokDriverNotFoundError(SigrokError):
@@ -490,36 +2167,215 @@ class SigrokDriverNotFoundError(SigrokError):
         self.drivers = drivers
 
 
-LogLevelMapping = {
-    lib.SR_LOG_ERR: logging.ERROR,
-    lib.SR_LOG_WARN: logging.WARNING,
-    lib.SR_LOG_INFO: logging.INFO,
-    lib.SR_LOG_DBG: logging.DEBUG,
-    lib.SR_LOG_SPEW: logging.DEBUG,
-}
+class SigrokTransformNotFoundError(SigrokError):
+    def __init__(self, name: str, transforms: list[str]) -> None:
+        super().__init__(f"{name} (available transforms: {', '.join(transforms)})")
+        self.name = name
+        self.transforms = transforms
 
 
-def log_callback(_data: None, level: int, log: bytes, args: int) -> int:
-    log_level = LogLevelMapping.get(level, logging.DEBUG)
-    logger = sigrok_logger
+class SigrokInputFormatNotFoundError(SigrokError):
+    def __init__(self, name: str, input_formats: list[str]) -> None:
+        super().__init__(
+            f"{name} (available input formats: {', '.join(input_formats)})"
+        )
+        self.name = name
+        self.input_formats = input_formats
+
+
+def _log_level_mapping() -> dict[int, int]:
+    return {
+        lib.SR_LOG_ERR: logging.ERROR,
+        lib.SR_LOG_WARN: logging.WARNING,
+        lib.SR_LOG_INFO: logging.INFO,
+        lib.SR_LOG_DBG: logging.DEBUG,
+        lib.SR_LOG_SPEW: logging.DEBUG,
+    }
+
+
+class _LogRoute(NamedTuple):
+    # the id of the Sigrok instance routed to
+    key: int
+    logger: logging.Logger
+    level: int
+
 
+class _LogRouter:
+    """
+    libsigrok has a single log callback per process, its user data points to
+    this router, which passes each message to the context active on the thread
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._routes: dict[int, _LogRoute] = {}
+        # the libsigrok level before the first route, restored after the last one
+        self._initial_level: int | None = None
+        # keeps the user data pointer valid
+        self.handle = ct.py_object(self)
+
+    @property
+    def user_data(self) -> int | None:
+        return ct.cast(ct.pointer(self.handle), ct.c_void_p).value
+
+    def current(self) -> _LogRoute | None:
+        route: _LogRoute | None = getattr(self._local, "route", None)
+        # threads may still hold the route of a context which exited
+        if route is not None and route.key not in self._routes:
+            return None
+        return route
+
+    @contextmanager
+    def route(self, route: _LogRoute | None) -> Iterator[None]:
+        previous, self._local.route = self.current(), route
+        try:
+            yield
+        finally:
+            self._local.route = previous
+
+    def activate(self, route: _LogRoute | None) -> None:
+        self._local.route = route
+
+    def bind(
+        self, func: Callable[[], None], route: _LogRoute | None
+    ) -> Callable[[], None]:
+        """routes the messages of `func` by `route`, wherever it runs"""
+
+        def routed() -> None:
+            with self.route(route):
+                func()
+
+        return routed
+
+    def register(self, route: _LogRoute) -> None:
+        # the libsigrok level is process-wide, it is filtered for each route
+        with self._lock:
+            if self._initial_level is None:
+                self._initial_level = lib.sr_log_loglevel_get().rval
+            self._routes[route.key] = route
+            self._set_level()
+
+    def unregister(self, key: int) -> None:
+        with self._lock:
+            if self._routes.pop(key, None) is not None:
+                self._set_level()
+        # other threads drop the route on their own, as current() skips it
+        if (route := getattr(self._local, "route", None)) is not None and (
+            route.key == key
+        ):
+            self._local.route = None
+
+    def _set_level(self) -> None:
+        if self._routes:
+            level = max(route.level for route in self._routes.values())
+        else:
+            level, self._initial_level = self._initial_level, None
+        if level is not None:
+            _try(lib.sr_log_loglevel_set(level))
+
+    def log(self, level: int, message: str) -> None:
+        route = self.current()
+        if route is not None and level > route.level:
+            return
+        logger = route.logger if route is not None else sigrok_logger
+        log_level = _lazy("LogLevelMapping").get(level, logging.DEBUG)
+
+        logger_message = message.split(": ", maxsplit=1)
+        if len(logger_message) == 1:
+            logger.log(log_level, logger_message[0])
+        else:
+            logger.getChild(logger_message[0]).log(log_level, logger_message[1])
+
+
+_log_router = _LogRouter()
+
+
+def log_callback(data: int | None, level: int, log: bytes, args: int) -> int:
     buf = (ct.c_char * 1024)()
     lib.sr_vsprintf_ascii(buf, log, args)
 
-    logger_message = buf.value.decode("utf-8").split(": ", maxsplit=1)
-    if len(logger_message) == 1:
-        message = logger_message[0]
-        logger = sigrok_logger
-    else:
-        message = logger_message[1]
-        logger = logger.getChild(logger_message[0])
-
-    logger.log(log_level, message)
+    router = (
+        ct.cast(data, ct.POINTER(ct.py_object)).contents.value if data else _log_router
+    )
+    router.log(level, buf.value.decode("utf-8"))
 
     return 0
 
 
-c_log_callback = lib.sr_log_callback_set.arg_types[0](log_callback)  # type: ignore[attr-defined]
+def _interpreter_ids(module: str) -> tuple[Any, Any] | None:
+    """the current and the main interpreter id, None if `module` does not tell"""
+    try:
+        interpreters = importlib.import_module(module)
+        current, main = interpreters.get_current(), interpreters.get_main()
+    except (ImportError, AttributeError):
+        # private modules, which may change or vanish with any python version
+        return None
+    # python 3.13 returns (id, whence) tuples, earlier versions interpreter ids
+    if isinstance(current, tuple) and isinstance(main, tuple):
+        return current[0], main[0]
+    return current, main
+
+
+def _is_main_interpreter() -> bool:
+    for module in ("_interpreters", "_xxsubinterpreters"):
+        if (ids := _interpreter_ids(module)) is not None:
+            return bool(ids[0] == ids[1])
+    return True
+
+
+def _c_log_callback() -> Any:
+    return lib.sr_log_callback_set.arg_types[0](log_callback)  # type: ignore[attr-defined]
+
+
+class _ContextResources:
+    """
+    the libsigrok context of a Sigrok instance and the sessions created on it,
+    released by Sigrok.exit or the finalizer of the instance
+    """
+
+    def __init__(self) -> None:
+        self.sr: Pointer[lib.type_sr_context] | None = None
+        self.lock = threading.Lock()
+        self.sessions: weakref.WeakSet[Session] = weakref.WeakSet()
+
+    def _close(self, session: Session) -> Exception | None:
+        try:
+            session.close()
+        except (TimeoutError, SigrokError) as e:
+            return e
+        with self.lock:
+            self.sessions.discard(session)
+        return None
+
+    def release(self) -> None:
+        """
+        closes all sessions before the context, sessions which fail to close
+        keep the context alive, so a later release can retry them
+        """
+        with self.lock:
+            sessions = list(self.sessions)
+        # sessions refer to devices of the context, they are destroyed first
+        errors = [error for session in sessions if (error := self._close(session))]
+        if errors:
+            # destroying the context under a running session would crash
+            sigrok_logger.warning(
+                "%d sessions did not close, keeping their context", len(errors)
+            )
+            if not isinstance(errors[0], TimeoutError):
+                raise errors[0]
+            return
+        # may race with the finalizer on another thread, sr_exit must only run once
+        with self.lock:
+            sr, self.sr = self.sr, None
+        if sr is not None:
+            _track("contexts", -1)
+            _try(lib.sr_exit(sr))
+
+
+def _finalize_context(context: _ContextResources, key: int) -> None:
+    context.release()
+    _log_router.unregister(key)
 
 
 class Sigrok:
@@ -552,27 +2408,100 @@ class Sigrok:
     def __init__(
         self,
         *,
-        redirect_logging: bool = True,
+        redirect_logging: bool | None = None,
         log_level: int = 5,
+        logger: logging.Logger | None = None,
         firmware_path: Path | None = None,
+        firmware: Mapping[str, bytes] | None = None,
     ) -> None:
-        self._sr: Pointer[lib.type_sr_context] | None = None
+        """
+        each instance is an independent libsigrok context with its own
+        firmware sources (`firmware` maps file names to their content and
+        takes precedence over `firmware_path`) and its own `logger`.
+        libsigrok logs of a thread go to the context which last initialized
+        on it or is routed by `route_logs()`, sessions keep the route of
+        the thread creating them.
+        the libsigrok log callback is process-wide and may be called on any thread,
+        so logging is only redirected by the main interpreter (redirect_logging=None)
+        """
+        self._context = _ContextResources()
+        self._finalizer = weakref.finalize(
+            self, _finalize_context, self._context, id(self)
+        )
+        self._log_route = _LogRoute(id(self), logger or sigrok_logger, log_level)
 
+        if redirect_logging is None:
+            redirect_logging = _is_main_interpreter()
+        elif redirect_logging and not _is_main_interpreter():
+            raise SigrokSubinterpreterError
+        self._redirect_logging = redirect_logging
         if redirect_logging:
-            _try(lib.sr_log_callback_set(c_log_callback, None))
-            _try(lib.sr_log_loglevel_set(log_level))
+            _try(
+                lib.sr_log_callback_set(_lazy("c_log_callback"), _log_router.user_data)
+            )
+            with self.route_logs():
+                _log_router.register(self._log_route)
+
+        from sigrok.resources import (
+            PackageFirmwarePath,
+            ResourceHooks,
+            default_firmware_dirs,
+        )
+
+        self.resources = ResourceHooks(
+            firmware_dirs=[
+                (firmware_path or PackageFirmwarePath).absolute(),
+                *default_firmware_dirs(),
+            ],
+            firmware=firmware,
+        )
+
+    def preload_firmware(self, names: Iterable[str] | None = None) -> int:
+        """
+        reads the named (or all) firmware files into the process-wide cache,
+        so opening devices does not wait for the disk. returns the number of files
+        """
+        return self.resources.preload(names)
+
+    @contextmanager
+    def route_logs(self) -> Iterator[None]:
+        """passes libsigrok logs of the current thread to this context"""
+        with _log_router.route(self._route):
+            yield
 
-        if firmware_path is None:
-            firmware_path = importlib.resources.path("sigrok", "firmware").__enter__()
-        os.environ["SIGROK_FIRMWARE_DIR"] = str(firmware_path.absolute())
+    @property
+    def _route(self) -> _LogRoute | None:
+        return self._log_route if self._redirect_logging else None
+
+    @property
+    def _sr(self) -> Pointer[lib.type_sr_context] | None:
+        return self._context.sr
 
     def init(self) -> None:
-        self._sr = _cast_p(_try(lib.sr_init())["ctx"], lib.sr_context)
+        with self._context.lock:
+            # a second init keeps the context, a new one would leak the first
+            if self._context.sr is not None:
+                return
+            if self._redirect_logging:
+                # registered again after an exit, the route lasts until the next
+                _log_router.register(self._log_route)
+                _log_router.activate(self._log_route)
+            sr = _cast_p(_try(lib.sr_init())["ctx"], lib.sr_context)
+            _track("contexts")
+            self._context.sr = sr
+            self.resources.install(sr)
 
     def exit(self) -> None:
-        if self._sr is not None:
-            _try(lib.sr_exit(self._sr))
-            self._sr = None
+        """closes the sessions of the context before the context itself"""
+        self._context.release()
+        # a context kept for sessions which did not close still logs
+        if self._context.sr is None:
+            _log_router.unregister(id(self))
+
+    def _own(self, session: Session) -> Session:
+        with self._context.lock:
+            self._context.sessions.add(session)
+        return session
 
     def get_drivers(self) -> list[DeviceDriver]:
         if self._sr is None:
@@ -596,13 +2525,35 @@ class Sigrok:
                 return driver
         raise SigrokDriverNotFoundError(name, list(map(repr, self.get_drivers())))
 
-    def session(self, *, devices: list[Device] | Device | None = None) -> Session:
-        session = Session(
-            sess=ct.cast(
-                _try(lib.sr_session_new(self._sr))["session"],
-                ct.POINTER(lib.sr_session),  # type: ignore[call-overload]
+    def _new_session(self) -> Pointer[lib.type_sr_session]:
+        return ct.cast(
+            _try(lib.sr_session_new(self._sr))["session"],
+            ct.POINTER(lib.sr_session),  # type: ignore[call-overload]
+        )
+
+    def session(
+        self,
+        *,
+        devices: list[Device] | Device | None = None,
+        staging: bool | Staging = False,
+        profiler: bool | SessionProfiler = False,
+    ) -> Session:
+        """
+        with `staging` logic payloads are only copied on the acquisition thread
+        and packets get built by a separate drain thread,
+        with `profiler` the stages of each packet get timed
+        """
+        if staging is True:
+            from sigrok.staging import create_staging
+
+            staging = create_staging()
+        session = self._own(
+            Session(
+                sess=self._new_session(), staging=staging or None, log_route=self._route
             )
         )
+        if profiler is not False:
+            session.profile(None if profiler is True else profiler)
 
         if devices is None:
             devices = []
@@ -614,6 +2565,87 @@ class Sigrok:
 
         return session
 
+    @staticmethod
+    def get_transforms() -> list[TransformModule]:
+        if (ptr := lib.sr_transform_list().rval) == 0:
+            return []
+        return [
+            TransformModule(tmod)
+            for tmod in itertools.takewhile(
+                lambda tmod: tmod, _cast_p(ptr, ct.c_void_p)
+            )
+        ]
+
+    @staticmethod
+    def get_transform(name: str) -> TransformModule:
+        if not (tmod := lib.sr_transform_find(name.encode("utf-8")).rval):
+            raise SigrokTransformNotFoundError(
+                name, [transform.id for transform in Sigrok.get_transforms()]
+            )
+        return TransformModule(tmod)
+
+    @staticmethod
+    def get_input_formats() -> list[str]:
+        if (ptr := lib.sr_input_list().rval) == 0:
+            return []
+        return [
+            lib.sr_input_id_get(imod).rval.decode("utf-8")
+            for imod in itertools.takewhile(
+                lambda imod: imod, _cast_p(ptr, ct.c_void_p)
+            )
+        ]
+
+    def replay(
+        self,
+        path: Path,
+        *,
+        speed: float | None = 1.0,
+        samplerate: int | None = None,
+        input_format: str | None = None,
+        chunk_size: int = 1 << 16,
+    ) -> Session:
+        """
+        replays a capture as virtual device, `speed` is a factor of real-time
+        (None replays as fast as possible), `samplerate` overrides the samplerate
+        of the capture for pacing. `.sr` files are loaded as sigrok session,
+        any other file is read by the input module `input_format` (auto-detected)
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError(f"speed must be positive: {speed}")
+        pacer = _ReplayPacer(speed, samplerate) if speed is not None else None
+        filename = str(path).encode("utf-8")
+
+        if input_format is None and path.suffix == ".sr":
+            sess = ct.cast(
+                _try(lib.sr_session_load(self._sr, filename), hint=str(path))[
+                    "session"
+                ],
+                ct.POINTER(lib.sr_session),  # type: ignore[call-overload]
+            )
+            return self._own(Session(sess, pacer=pacer, log_route=self._route))
+
+        if input_format is None:
+            input_ = _try(lib.sr_input_scan_file(filename), hint=str(path))["in"]
+        else:
+            if not (imod := lib.sr_input_find(input_format.encode("utf-8")).rval):
+                raise SigrokInputFormatNotFoundError(
+                    input_format, self.get_input_formats()
+                )
+            if not (input_ := lib.sr_input_new(imod, None).rval):
+                raise SigrokArgError(hint=f"cannot create input {input_format}")
+
+        # the session thread takes the route of the thread creating it
+        with self.route_logs():
+            return self._own(
+                ReplaySession(
+                    self._new_session(),
+                    input_,
+                    path,
+                    pacer=pacer,
+                    chunk_size=chunk_size,
+                )
+            )
+
     def __enter__(self) -> Self:
         self.init()
         return self
@@ -626,5 +2658,32 @@ class Sigrok:
     ) -> None:
         self.exit()
 
-    def __del__(self) -> None:
-        self.exit()
+
+# attributes mirroring libsigrok definitions are built on first access,
+# so importing this module does not load the C library
+_LazyAttributes: dict[str, Callable[[], Any]] = {
+    "ChannelType": _channel_type,
+    "ConfigDataTypes": _config_data_types,
+    "ConfigKey": _config_key,
+    "LogLevelMapping": _log_level_mapping,
+    "PacketTypes": _packet_types,
+    "c_log_callback": _c_log_callback,
+}
+_lazy_lock = threading.Lock()
+_Missing = object()
+
+
+def _lazy(name: str) -> Any:
+    # built ones are read without the lock, parse_packet looks up every packet
+    if (value := globals().get(name, _Missing)) is not _Missing:
+        return value
+    with _lazy_lock:
+        if name not in globals():
+            globals()[name] = _LazyAttributes[name]()
+        return globals()[name]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LazyAttributes:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import abc
+import collections
+import ctypes as ct
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from sigrok.bindings import lib
+from sigrok.sigrok import Device, LogicPacket, SigrokError, _cast_p, parse_packet
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sigrok.sigrok import Packet
+
+# [sdi][length][unitsize] followed by the payload padded to 8 bytes
+RecordHeader = struct.Struct("=QQQ")
+
+
+def _record_size(length: int) -> int:
+    return RecordHeader.size + ((length + 7) & ~7)
+
+
+def native_library_name() -> str:
+    if sys.platform.startswith("win"):
+        return "sigrok_staging.dll"
+    if sys.platform == "darwin":
+        return "libsigrok_staging.dylib"
+    return "libsigrok_staging.so"
+
+
+NativeLibraryPath = Path(__file__).parent / "native" / native_library_name()
+
+
+def _datafeed_callback_type() -> Any:
+    return lib.sr_session_datafeed_callback_add.arg_types[1]  # type: ignore[attr-defined]
+
+
+def load_native() -> ct.CDLL | None:
+    """loads the staging helper built by `inv native.build`, if available"""
+    try:
+        native = ct.CDLL(str(NativeLibraryPath))
+    except OSError:
+        return None
+    native.sigrok_staging_new.argtypes = [
+        ct.c_size_t,
+        _datafeed_callback_type(),
+        ct.c_void_p,
+    ]
+    native.sigrok_staging_new.restype = ct.c_void_p
+    native.sigrok_staging_free.argtypes = [ct.c_void_p]
+    native.sigrok_staging_free.restype = None
+    native.sigrok_staging_read.argtypes = [ct.c_void_p, ct.c_void_p, ct.c_size_t]
+    native.sigrok_staging_read.restype = ct.c_size_t
+    native.sigrok_staging_written.argtypes = [ct.c_void_p]
+    native.sigrok_staging_written.restype = ct.c_uint64
+    native.sigrok_staging_dropped.argtypes = [ct.c_void_p]
+    native.sigrok_staging_dropped.restype = ct.c_uint64
+    return native
+
+
+class Staging(abc.ABC):
+    """
+    buffers packets on the acquisition thread, so it only copies logic payloads
+    and the packets get built when another thread drains them
+    """
+
+    def __init__(self) -> None:
+        # control packets are tagged with the number of logic packets before them
+        self._control: collections.deque[tuple[int, Packet]] = collections.deque()
+        self._read = 0
+        self._devices: dict[int, Device] = {}
+        self._forward = _datafeed_callback_type()(self._on_control)
+
+    @property
+    @abc.abstractmethod
+    def callback(self) -> Any: ...
+
+    @property
+    def callback_data(self) -> Any:
+        return None
+
+    @property
+    @abc.abstractmethod
+    def written(self) -> int: ...
+
+    @property
+    def dropped(self) -> int:
+        return 0
+
+    def close(self) -> None:  # noqa: B027 nothing to release by default
+        pass
+
+    @abc.abstractmethod
+    def _read_logic(self) -> list[tuple[int, int, bytes]]: ...
+
+    def _on_control(self, dev: Any, packet: Any, _data: Any) -> None:
+        self._control.append(
+            (self.written, parse_packet(_cast_p(packet, lib.sr_datafeed_packet), dev))
+        )
+
+    def _device(self, sdi: int) -> Device:
+        if (device := self._devices.get(sdi)) is None:
+            device = self._devices[sdi] = Device(dev=_cast_p(sdi, lib.sr_dev_inst))
+        return device
+
+    def _pop_control(self, position: int) -> Iterator[Packet]:
+        while self._control and self._control[0][0] <= position:
+            yield self._control.popleft()[1]
+
+    def drain(self) -> list[Packet]:
+        packets: list[Packet] = []
+        for sdi, unitsize, data in self._read_logic():
+            packets.extend(self._pop_control(self._read))
+            packets.append(LogicPacket.from_data(data, unitsize, self._device(sdi)))
+            self._read += 1
+        packets.extend(self._pop_control(self._read))
+        return packets
+
+
+class NativeStaging(Staging):
+    """lock-free ring buffer filled by the native callback without the GIL"""
+
+    def __init__(self, native: ct.CDLL, capacity: int) -> None:
+        super().__init__()
+        self._native = native
+        self._staging = native.sigrok_staging_new(capacity, self._forward, None)
+        if not self._staging:
+            raise MemoryError(capacity)
+        self._out = (ct.c_uint8 * capacity)()
+
+    @property
+    def callback(self) -> Any:
+        return ct.cast(self._native.sigrok_staging_callback, _datafeed_callback_type())
+
+    @property
+    def callback_data(self) -> Any:
+        return self._staging
+
+    @property
+    def written(self) -> int:
+        return int(self._native.sigrok_staging_written(self._staging))
+
+    @property
+    def dropped(self) -> int:
+        return int(self._native.sigrok_staging_dropped(self._staging))
+
+    def close(self) -> None:
+        if self._staging:
+            self._native.sigrok_staging_free(self._staging)
+            self._staging = None
+
+    def _read_logic(self) -> list[tuple[int, int, bytes]]:
+        size = self._native.sigrok_staging_read(
+            self._staging, self._out, len(self._out)
+        )
+        buffer = memoryview(self._out).cast("B")[:size]
+        records = []
+        offset = 0
+        while offset < size:
+            sdi, length, unitsize = RecordHeader.unpack_from(buffer, offset)
+            offset += RecordHeader.size
+            records.append((sdi, unitsize, bytes(buffer[offset : offset + length])))
+            offset += (length + 7) & ~7
+        return records
+
+
+class PythonStaging(Staging):
+    """
+    pure ctypes fallback, which still needs the GIL but builds no packets.
+    records take the same space as in the native ring buffer, logic packets
+    which do not fit into `capacity` bytes anymore are dropped
+    """
+
+    def __init__(self, capacity: int = 64 << 20) -> None:
+        super().__init__()
+        self.capacity = capacity
+        self._records: collections.deque[tuple[int, int, bytes]] = collections.deque()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._written = 0
+        self._dropped = 0
+        self._callback = _datafeed_callback_type()(self._on_packet)
+
+    @property
+    def callback(self) -> Any:
+        return self._callback
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def _on_packet(self, dev: Any, packet: Any, data: Any) -> None:
+        contents = _cast_p(packet, lib.sr_datafeed_packet).contents
+        if contents.type != lib.SR_DF_LOGIC:
+            self._on_control(dev, packet, data)
+            return
+        logic = _cast_p(contents.payload, lib.sr_datafeed_logic).contents
+        size = _record_size(logic.length)
+        with self._lock:
+            if self._size + size > self.capacity:
+                self._dropped += 1
+                return
+            self._size += size
+        self._records.append(
+            (
+                ct.cast(dev, ct.c_void_p).value or 0,
+                logic.unitsize,
+                ct.string_at(logic.data, logic.length),
+            )
+        )
+        self._written += 1
+
+    def _read_logic(self) -> list[tuple[int, int, bytes]]:
+        records = []
+        while self._records:
+            records.append(self._records.popleft())
+        with self._lock:
+            self._size -= sum(_record_size(len(data)) for _sdi, _unit, data in records)
+        return records
+
+
+def create_staging(capacity: int = 64 << 20, *, native: bool | None = None) -> Staging:
+    """
+    uses the native helper when available (native=None), or requires it (True)
+    """
+    if native is not False and (library := load_native()) is not None:
+        return NativeStaging(library, capacity)
+    if native:
+        raise SigrokError(f"native staging helper not found: {NativeLibraryPath}")
+    return PythonStaging(capacity)
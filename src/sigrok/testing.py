@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import collections
+import socketserver
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from types import TracebackType
+    from typing import TypeAlias
+
+    from typing_extensions import Self
+
+    # a response or a function of the command returning the response, None
+    # for commands without a response
+    Response: TypeAlias = str | None | Callable[[str], str | None]
+
+# stand-ins for instruments, to test against without hardware
+
+# libsigrok aliases the vendor to "Agilent", a model the scpi-dmm driver knows
+DefaultIdn = "Agilent Technologies,34405A,MY00000001,1.0"
+NoError = '0,"No error"'
+UndefinedHeader = '-113,"Undefined header"'
+
+
+def _format_reading(value: float) -> str:
+    return f"{value:+.8E}"
+
+
+class _ScpiHandler(socketserver.StreamRequestHandler):
+    server: _ScpiTCPServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            for command in line.decode("ascii", errors="replace").split(";"):
+                if not (command := command.strip()):
+                    continue
+                if (response := self.server.instrument.respond(command)) is not None:
+                    self.wfile.write(f"{response}\n".encode("ascii"))
+
+
+class _ScpiTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], instrument: ScpiServer) -> None:
+        super().__init__(address, _ScpiHandler)
+        self.instrument = instrument
+
+
+class ScpiServer:
+    """
+    a stand-in SCPI instrument on a local TCP port, libsigrok connects to it
+    by the scan option {"conn": server.conn}. it answers like a DMM by default,
+    measuring what `measure` returns, `responses` add or replace commands
+    """
+
+    def __init__(
+        self,
+        responses: Mapping[str, Response] | None = None,
+        *,
+        idn: str = DefaultIdn,
+        measure: Callable[[], float] = lambda: 1.0,
+        host: str = "127.0.0.1",
+    ) -> None:
+        self.measure = measure
+        self.host = host
+        # all commands received, for assertions
+        self.commands: list[str] = []
+        self._errors: collections.deque[str] = collections.deque()
+        self._lock = threading.Lock()
+        self.responses: dict[str, Response] = {
+            "*IDN?": idn,
+            "*RST": None,
+            "*CLS": None,
+            "*OPC?": "1",
+            "SYST:ERR?": lambda _command: self._next_error(),
+            "CONF?": '"VOLT +1.00000000E+01,+1.00000000E-06"',
+            "READ?": self._reading,
+            "MEAS?": self._reading,
+            "FETC?": self._reading,
+        }
+        self.responses.update(
+            {
+                command.upper(): response
+                for command, response in (responses or {}).items()
+            }
+        )
+        self._server: _ScpiTCPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def respond(self, command: str) -> str | None:
+        with self._lock:
+            self.commands.append(command)
+        # arguments are ignored for the lookup, "CONF:VOLT:DC 10" -> "CONF:VOLT:DC"
+        header = command.split(maxsplit=1)[0].upper()
+        if header in self.responses:
+            response = self.responses[header]
+            return response(command) if callable(response) else response
+        if header.startswith(("CONF:", "SENS:")):
+            # settings are accepted and forgotten
+            return None
+        with self._lock:
+            self._errors.append(UndefinedHeader)
+        return None
+
+    def _reading(self, _command: str) -> str:
+        return _format_reading(self.measure())
+
+    def _next_error(self) -> str:
+        with self._lock:
+            return self._errors.popleft() if self._errors else NoError
+
+    @property
+    def port(self) -> int:
+        if self._server is None:
+            msg = "server is not running"
+            raise RuntimeError(msg)
+        return int(self._server.server_address[1])
+
+    @property
+    def conn(self) -> str:
+        """the libsigrok connection string"""
+        return f"tcp-raw/{self.host}/{self.port}"
+
+    def start(self) -> None:
+        self._server = _ScpiTCPServer((self.host, 0), self)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="scpi-server", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = self._thread = None
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from sigrok.sigrok import AnalogPacket, LogicPacket
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sigrok.sigrok import Packet
+
+# python stages for Session.add_stage, they work on whole packets with numpy
+# and pass all packets through they do not handle
+
+
+class LogicInvert:
+    """inverts the given logic channel indices, all channels by default"""
+
+    def __init__(self, channels: Iterable[int] | None = None) -> None:
+        self.channels = None if channels is None else sorted(set(channels))
+
+    def _mask(self, unitsize: int) -> np.ndarray:
+        if self.channels is None:
+            return np.full(unitsize, 0xFF, dtype=np.uint8)
+        mask = np.zeros(unitsize, dtype=np.uint8)
+        for idx in self.channels:
+            if idx < unitsize * 8:
+                mask[idx // 8] |= 1 << (idx % 8)
+        return mask
+
+    def __call__(self, packet: Packet) -> Packet:
+        if not isinstance(packet, LogicPacket):
+            return packet
+        samples = np.frombuffer(packet.data, dtype=np.uint8).reshape(
+            -1, packet.unitsize
+        )
+        return packet.with_data((samples ^ self._mask(packet.unitsize)).tobytes())
+
+
+class LogicDecimate:
+    """keeps every factor-th logic sample, counting across packets"""
+
+    def __init__(self, factor: int) -> None:
+        if factor < 1:
+            raise ValueError(f"factor must be positive: {factor}")
+        self.factor = factor
+        self._phase = 0
+
+    def __call__(self, packet: Packet) -> Packet | None:
+        if not isinstance(packet, LogicPacket):
+            return packet
+        samples = np.frombuffer(packet.data, dtype=np.uint8).reshape(
+            -1, packet.unitsize
+        )
+        kept = samples[self._phase :: self.factor]
+        self._phase = (self._phase - len(samples)) % self.factor
+        if not len(kept):
+            return None
+        return packet.with_data(kept.tobytes())
+
+
+class AnalogScale:
+    """applies value * factor + offset to all analog values"""
+
+    def __init__(self, factor: float, offset: float = 0.0) -> None:
+        self.factor = factor
+        self.offset = offset
+
+    def __call__(self, packet: Packet) -> Packet:
+        if not isinstance(packet, AnalogPacket):
+            return packet
+        values = np.frombuffer(packet.data, dtype=np.float32)
+        return packet.with_data(
+            (values * np.float32(self.factor) + np.float32(self.offset)).tobytes()
+        )
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import json
+import socket
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import platformdirs
+
+from sigrok.logic import sample_count
+from sigrok.sigrok import DeviceConfigSnapshot, EndPacket, LogicPacket, sigrok_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from sigrok.sigrok import Device, Packet, Sigrok
+
+logger = sigrok_logger.getChild("tuning")
+
+# the staging buffer holds this many seconds of logic data at least
+StagingSeconds = 0.5
+MinStagingCapacity = 1 << 20
+# samplerates tried between the steps a driver reports, per decade
+RateSteps = (1, 2, 5)
+
+
+class TuningSettings(NamedTuple):
+    samplerate: int
+    # the number of logic channels enabled, in channel order
+    channels: int
+    # the staging buffer in bytes, 0 runs without staging
+    staging_capacity: int = 0
+
+    def apply(self, device: Device) -> None:
+        logic = _logic_channels(device)
+        device.configure().enable_channels(*logic[: self.channels]).set(
+            "samplerate", self.samplerate
+        ).apply()
+
+    def session_options(self) -> dict[str, Any]:
+        """keyword arguments for Sigrok.session"""
+        if not self.staging_capacity:
+            return {}
+        from sigrok.staging import create_staging
+
+        return {"staging": create_staging(self.staging_capacity)}
+
+
+class Calibration(NamedTuple):
+    settings: TuningSettings
+    samples: int
+    # seconds from the session start until the consumer took the end packet
+    elapsed: float
+    # the most packets queued for the consumer at once
+    backlog: int
+    # logic packets lost in the staging buffer
+    dropped: int
+
+    @property
+    def throughput(self) -> float:
+        """samples per second taken by the consumer"""
+        return self.samples / self.elapsed if self.elapsed else 0.0
+
+
+def _logic_channels(device: Device) -> list[str]:
+    return [ch.name for ch in device.channels() if ch.type.name == "Logic"]
+
+
+def _staging_capacity(samplerate: int, channels: int) -> int:
+    needed = int(samplerate * ((channels + 7) // 8) * StagingSeconds)
+    return max(MinStagingCapacity, 1 << max(needed - 1, 0).bit_length())
+
+
+def samplerate_candidates(possible_values: dict[str, Any]) -> list[int]:
+    """the samplerates a driver lists, or a 1-2-5 series within its steps"""
+    if samplerates := possible_values.get("samplerates"):
+        return sorted(samplerates)
+    low, high, _step = possible_values["samplerate-steps"]
+    candidates: list[int] = []
+    decade = 1
+    while decade <= high:
+        candidates.extend(
+            decade * step for step in RateSteps if low <= decade * step <= high
+        )
+        decade *= 10
+    return candidates
+
+
+class TuningLimits(NamedTuple):
+    # the share of the samplerate the consumer may fall short of
+    tolerance: float = 0.1
+    # the most packets which may queue up for the consumer
+    max_backlog: int = 256
+
+
+DefaultLimits = TuningLimits()
+
+
+class ThroughputTuner:
+    """
+    finds the highest samplerate a device and this host sustain, by short
+    calibration captures of `duration` seconds which each packet is handed
+    to `consumer` in, to include the processing of the application.
+    a calibration is safe when no packets were dropped, at most `max_backlog`
+    packets queued up and the consumer took the samples at the samplerate,
+    less a `tolerance`. calibrations are stopped once they cannot be safe anymore
+    """
+
+    def __init__(
+        self,
+        sr: Sigrok,
+        device: Device,
+        *,
+        consumer: Callable[[Packet], object] | None = None,
+        duration: float = 0.25,
+        limits: TuningLimits = DefaultLimits,
+    ) -> None:
+        self.sr = sr
+        self.device = device
+        self.consumer = consumer
+        self.duration = duration
+        self.limits = limits
+        self.calibrations: list[Calibration] = []
+
+    def calibrate(self, settings: TuningSettings, timeout: float = 5.0) -> Calibration:
+        """captures `duration` seconds with `settings`, which stay applied"""
+        settings.apply(self.device)
+        limit = max(1, int(settings.samplerate * self.duration))
+        self.device.config["limit_samples"] = limit
+        session = self.sr.session(devices=self.device, **settings.session_options())
+        # taking longer than this is below the tolerated throughput
+        deadline = self.duration / (1 - self.limits.tolerance)
+        samples = backlog = 0
+        try:
+            start = time.perf_counter()
+            with session:
+                while not isinstance(
+                    packet := session.next_packet(timeout=timeout), EndPacket
+                ):
+                    backlog = max(backlog, session.backlog + 1)
+                    if isinstance(packet, LogicPacket):
+                        samples += sample_count(packet.data, packet.unitsize)
+                    if self.consumer is not None:
+                        self.consumer(packet)
+                    if time.perf_counter() - start > deadline:
+                        break
+                elapsed = time.perf_counter() - start
+            dropped = session.dropped_packets
+        finally:
+            session.close()
+        calibration = Calibration(settings, samples, elapsed, backlog, dropped)
+        logger.debug("calibrated %s: %.0f samples/s", settings, calibration.throughput)
+        self.calibrations.append(calibration)
+        return calibration
+
+    def is_safe(self, calibration: Calibration) -> bool:
+        return (
+            not calibration.dropped
+            and calibration.backlog <= self.limits.max_backlog
+            and calibration.throughput
+            >= calibration.settings.samplerate * (1 - self.limits.tolerance)
+        )
+
+    def _safe_settings(
+        self, samplerate: int, channels: int, *, staging: bool
+    ) -> TuningSettings | None:
+        """the settings at `samplerate` if they are safe, with staging if needed"""
+        settings = TuningSettings(samplerate, channels)
+        if self.is_safe(self.calibrate(settings)):
+            return settings
+        if staging:
+            settings = settings._replace(
+                staging_capacity=_staging_capacity(samplerate, channels)
+            )
+            if self.is_safe(self.calibrate(settings)):
+                return settings
+        return None
+
+    def tune(
+        self, channels: int | None = None, *, staging: bool = True, apply: bool = False
+    ) -> TuningSettings | None:
+        """
+        bisects the samplerates of the device for the highest safe one, with
+        `channels` logic channels (all by default, the other channels get
+        disabled) and staging where it helps.
+        the device config is restored afterwards, unless the result gets applied
+        """
+        if channels is None:
+            channels = len(_logic_channels(self.device))
+        candidates = samplerate_candidates(
+            self.device.config.possible_values("samplerate")
+        )
+        snapshot = DeviceConfigSnapshot.capture(self.device)
+        best = None
+        try:
+            low, high = 0, len(candidates) - 1
+            while low <= high:
+                middle = (low + high) // 2
+                if (
+                    settings := self._safe_settings(
+                        candidates[middle], channels, staging=staging
+                    )
+                ) is not None:
+                    best = settings
+                    low = middle + 1
+                else:
+                    high = middle - 1
+        finally:
+            snapshot.apply(self.device)
+        if best is not None and apply:
+            best.apply(self.device)
+        return best
+
+
+def profile_path(host: str | None = None) -> Path:
+    return platformdirs.user_data_path("python-sigrok") / (
+        f"tuning-{host or socket.gethostname()}.json"
+    )
+
+
+def device_key(device: Device) -> str:
+    identity = device.serial_number or device.connection_identifier
+    return " ".join(part for part in (device.vendor, device.model, identity) if part)
+
+
+class HostProfile:
+    """tuned settings per device, stored as json for each host"""
+
+    def __init__(
+        self, path: Path, settings: dict[str, TuningSettings] | None = None
+    ) -> None:
+        self.path = path
+        self.settings = settings or {}
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> HostProfile:
+        """the profile of this host, empty if there is none yet"""
+        path = path or profile_path()
+        if not path.exists():
+            return cls(path)
+        return cls(
+            path,
+            {
+                key: TuningSettings(**values)
+                for key, values in json.loads(path.read_text()).items()
+            },
+        )
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(
+                {key: settings._asdict() for key, settings in self.settings.items()},
+                indent=2,
+            )
+        )
+
+    def get(self, device: Device) -> TuningSettings | None:
+        return self.settings.get(device_key(device))
+
+    def set(self, device: Device, settings: TuningSettings) -> None:
+        self.settings[device_key(device)] = settings
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import collections
+import queue
+import threading
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+from sigrok.sigrok import sigrok_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+    from sigrok.sigrok import Device, DeviceDriver
+
+logger = sigrok_logger.getChild("watch")
+
+
+class DeviceKey(NamedTuple):
+    driver: str
+    # only set without a serial number, which stays the same on other ports
+    connection_identifier: str | None
+    serial_number: str | None
+    model: str | None
+    # tells apart devices with neither connection identifier nor serial number
+    occurrence: int
+
+
+class DeviceEvent(NamedTuple):
+    kind: Literal["added", "removed"]
+    key: DeviceKey
+    device: Device
+
+
+def device_keys(driver: str, devices: Iterable[Device]) -> dict[DeviceKey, Device]:
+    occurrences: collections.Counter[tuple[str | None, ...]] = collections.Counter()
+    keys = {}
+    for device in devices:
+        serial_number = device.serial_number
+        connection_identifier = None if serial_number else device.connection_identifier
+        identity = (connection_identifier, serial_number, device.model)
+        keys[DeviceKey(driver, *identity, occurrences[identity])] = device
+        occurrences[identity] += 1
+    return keys
+
+
+class DeviceWatcher:
+    """
+    scans a driver in the background and reports added and removed devices.
+    every poll scans the driver (or each port in `conns` on its own) and diffs
+    the result against the known devices, a change is only reported after
+    `debounce` consecutive scans agree, the interval doubles up to
+    `max_interval` while nothing changes.
+    scans leave open devices alone: while a known device is open, the driver
+    is not scanned, or only the ports in `conns` of no open device.
+    the watcher must be the only one scanning its driver, as it frees the
+    instances of the previous scan while no device is open. known devices
+    take over the instances of the rescan, removed devices are invalid then
+    """
+
+    def __init__(
+        self,
+        driver: DeviceDriver,
+        *,
+        interval: float = 1.0,
+        max_interval: float = 10.0,
+        debounce: int = 2,
+        on_event: Callable[[DeviceEvent], None] | None = None,
+    ) -> None:
+        if debounce < 1:
+            raise ValueError(f"debounce must be positive: {debounce}")
+        self.driver = driver
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.debounce = debounce
+        self._on_event = on_event
+        # ports to scan with the conn scan option, the driver scans all without
+        self.conns: list[str] = []
+        self._devices: dict[DeviceKey, Device] = {}
+        # consecutive scans a key was seen (unknown keys) or missed (known keys)
+        self._pending: collections.Counter[DeviceKey] = collections.Counter()
+        self._candidates: dict[DeviceKey, Device] = {}
+        self._events: queue.Queue[DeviceEvent] = queue.Queue()
+        self._current_interval = interval
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def devices(self) -> dict[DeviceKey, Device]:
+        """the devices reported as added and not removed since"""
+        with self._lock:
+            return dict(self._devices)
+
+    def _scan(self) -> dict[DeviceKey, Device] | None:
+        """the devices found, None if the scan was skipped for open devices"""
+        with self._lock:
+            known = dict(self._devices)
+        opened = {key: device for key, device in known.items() if device.is_open}
+        if opened and not self.conns:
+            return None
+        if not opened:
+            # libsigrok keeps every instance a scan creates, the ones of the
+            # previous scan are freed, as known devices take over the new ones
+            self.driver.clear()
+        if self.conns:
+            busy = {device.connection_identifier for device in opened.values()}
+            devices = [
+                device
+                for conn in self.conns
+                if conn not in busy
+                for device in self.driver.scan({"conn": conn})
+            ]
+        else:
+            devices = self.driver.scan()
+        # open devices were not scanned, they are still there
+        return {**device_keys(self.driver.name, devices), **opened}
+
+    def poll(self) -> list[DeviceEvent]:
+        """scans once and returns (and queues) the resulting events"""
+        if (scanned := self._scan()) is None:
+            self._adapt_interval(changed=False)
+            return []
+        with self._lock:
+            events = self._diff(scanned)
+        for event in events:
+            self._emit(event)
+        self._adapt_interval(changed=bool(events or self._pending))
+        return events
+
+    def _diff(self, scanned: dict[DeviceKey, Device]) -> list[DeviceEvent]:
+        events = []
+
+        for key, device in scanned.items():
+            if (known := self._devices.get(key)) is not None:
+                # known devices keep their object, which takes over the rescan
+                if known is not device:
+                    known._rebind(device)  # noqa: SLF001 access private member
+                self._pending.pop(key, None)
+                continue
+            self._pending[key] += 1
+            self._candidates[key] = device
+            if self._pending[key] >= self.debounce:
+                del self._pending[key]
+                self._devices[key] = self._candidates.pop(key)
+                events.append(DeviceEvent("added", key, self._devices[key]))
+
+        for key in list(self._pending):
+            if key not in scanned and key not in self._devices:
+                # a device which vanished before it was reported
+                del self._pending[key]
+                self._candidates.pop(key, None)
+
+        for key in list(self._devices):
+            if key in scanned:
+                continue
+            self._pending[key] += 1
+            if self._pending[key] >= self.debounce:
+                del self._pending[key]
+                events.append(DeviceEvent("removed", key, self._devices.pop(key)))
+        return events
+
+    def _emit(self, event: DeviceEvent) -> None:
+        self._events.put(event)
+        if self._on_event is not None:
+            try:
+                self._on_event(event)
+            except Exception:
+                logger.exception("device event handler failed")
+
+    def _adapt_interval(self, *, changed: bool) -> None:
+        if changed:
+            self._current_interval = self.interval
+        else:
+            self._current_interval = min(self._current_interval * 2, self.max_interval)
+
+    def next_event(self, timeout: float | None = None) -> DeviceEvent:
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty as e:
+            raise TimeoutError(timeout) from e
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("scanning %s failed", self.driver.name)
+            if self._stopping.wait(self._current_interval):
+                return
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
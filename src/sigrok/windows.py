@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from sigrok.logic import sample_count
+from sigrok.sigrok import EndPacket, LogicPacket
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import numpy.typing as npt
+
+    from sigrok.sigrok import Packet, Session
+
+
+class SampleWindow(NamedTuple):
+    # windows within one packet are views on it, windows across packets are
+    # assembled in reused buffers and only valid until the next feed
+    data: memoryview
+    unitsize: int
+    # the sample index of the first sample, counted from the first sample fed
+    offset: int
+
+    @property
+    def samples(self) -> int:
+        return sample_count(self.data, self.unitsize)
+
+    def array(self) -> npt.NDArray[np.uint8]:
+        """a (samples, unitsize) view on the window"""
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(-1, self.unitsize)
+
+    def copy(self) -> SampleWindow:
+        return self._replace(data=memoryview(bytes(self.data)))
+
+
+class SampleWindows:
+    """
+    reassembles logic payloads into windows of `size` samples, each starting
+    `size - overlap` samples after the previous one, regardless of packet sizes
+    """
+
+    def __init__(self, size: int, overlap: int = 0) -> None:
+        if size < 1:
+            raise ValueError(f"size must be positive: {size}")
+        if not 0 <= overlap < size:
+            raise ValueError(f"overlap must be within [0, {size}): {overlap}")
+        self.size = size
+        self.overlap = overlap
+        self.step = size - overlap
+        self.position = 0
+        # allocated on the first packet, once the unitsize is known. the
+        # buffer in use starts with the samples carried over from the last
+        # packet, beginning with the next window
+        self._buffers: tuple[memoryview, ...] = ()
+        self._unitsize = 0
+        self._buffer = 0
+        self._carry = 0
+        self._offset = 0
+
+    def _allocate(self, unitsize: int) -> None:
+        if unitsize == self._unitsize:
+            return
+        if self._buffers:
+            raise ValueError(f"unitsize changed from {self._unitsize} to {unitsize}")
+        self._unitsize = unitsize
+        # the carry and the samples to complete all windows starting within it
+        self._buffers = tuple(
+            memoryview(bytearray(2 * self.size * unitsize)) for _ in range(2)
+        )
+
+    def _windows(
+        self, view: memoryview, start: int, end: int, windows: list[SampleWindow]
+    ) -> int:
+        """appends the windows starting before `end`, returns the next start"""
+        unitsize = self._unitsize
+        while start < end and start + self.size <= len(view) // unitsize:
+            windows.append(
+                SampleWindow(
+                    view[start * unitsize : (start + self.size) * unitsize],
+                    unitsize,
+                    self._offset,
+                )
+            )
+            self._offset += self.step
+            start += self.step
+        return start
+
+    def _keep(self, view: memoryview, start: int, *, swap: bool) -> None:
+        """carries the samples from `start` on over, into the other buffer with `swap`"""
+        if swap:
+            self._buffer ^= 1
+        carry = len(view) // self._unitsize - start
+        self._buffers[self._buffer][: carry * self._unitsize] = view[
+            start * self._unitsize :
+        ]
+        self._carry = carry
+
+    def feed_data(self, data: bytes | memoryview, unitsize: int) -> list[SampleWindow]:
+        self._allocate(unitsize)
+        samples = sample_count(data, unitsize)
+        view = memoryview(data).cast("B")[: samples * unitsize]
+        self.position += samples
+        windows: list[SampleWindow] = []
+        start = 0
+
+        if carry := self._carry:
+            # all windows starting within the carry end within size - 1 samples
+            take = min(samples, self.size - 1)
+            buffer = self._buffers[self._buffer]
+            buffer[carry * unitsize : (carry + take) * unitsize] = view[
+                : take * unitsize
+            ]
+            assembled = buffer[: (carry + take) * unitsize]
+            start = self._windows(assembled, 0, carry, windows)
+            if start < carry:
+                # the whole packet went into the buffer, the next window is incomplete
+                if windows:
+                    self._keep(assembled, start, swap=True)
+                else:
+                    self._carry = carry + take
+                return windows
+            start -= carry
+
+        # windows within the packet are not copied
+        start = self._windows(view, start, samples, windows)
+        # the windows assembled in the buffer stay valid until the next feed
+        self._keep(view, start, swap=bool(carry))
+        return windows
+
+    def feed(self, packet: Packet) -> list[SampleWindow]:
+        if isinstance(packet, LogicPacket):
+            return self.feed_data(packet.data, packet.unitsize)
+        return []
+
+    def flush(self) -> SampleWindow | None:
+        """the samples of the incomplete window, as a shorter window"""
+        if not self._carry:
+            return None
+        window = SampleWindow(
+            self._buffers[self._buffer][: self._carry * self._unitsize],
+            self._unitsize,
+            self._offset,
+        )
+        self._carry = 0
+        return window
+
+    def windows(
+        self, session: Session, timeout: float | None = None, *, partial: bool = False
+    ) -> Iterator[SampleWindow]:
+        """yields the windows of a session, with `partial` also the incomplete one"""
+        while not isinstance(packet := session.next_packet(timeout=timeout), EndPacket):
+            yield from self.feed(packet)
+        if partial and (window := self.flush()) is not None:
+            yield window
@@ -1,7 +1,14 @@
 from invoke import Collection
 
-from tasks import dev, stubs
+from tasks import bench, cache, dev, native, stubs
 
 ns = Collection(
-    dev, stubs, fl=dev.format_and_lint, tests=dev.tests, stubgen=stubs.bindings
+    bench,
+    cache,
+    dev,
+    native,
+    stubs,
+    fl=dev.format_and_lint,
+    tests=dev.tests,
+    stubgen=stubs.bindings,
 )
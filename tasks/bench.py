@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import ctypes as ct
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from invoke import Context, task
+
+from tasks.common import SrcPath
+
+ImportTimeRegex = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_imports(statement: str) -> list[tuple[int, int, int, str]]:
+    command = [sys.executable, "-X", "importtime", "-c", statement]
+    # -X importtime only reports uncached modules, the first run warms up the bytecode cache
+    subprocess.run(command, cwd=SrcPath, capture_output=True, check=True)  # noqa: S603 trusted input
+    result = subprocess.run(  # noqa: S603 trusted input
+        command, cwd=SrcPath, capture_output=True, check=True, text=True
+    )
+    return [
+        (int(self_us), int(cumulative_us), len(indent) // 2, name)
+        for self_us, cumulative_us, indent, name in ImportTimeRegex.findall(
+            result.stderr
+        )
+    ]
+
+
+@task
+def import_time(
+    _: Context, statement: str = "from sigrok import Sigrok", budget_ms: float = 40
+) -> None:
+    """profiles the imports triggered by `statement` and checks them against a budget"""
+    interpreter_startup = {name for *_, name in profile_imports("pass")}
+    imports = [
+        entry
+        for entry in profile_imports(statement)
+        if entry[3] not in interpreter_startup
+    ]
+    total_ms = (
+        sum(cumulative for _, cumulative, level, _ in imports if level == 0) / 1000
+    )
+
+    print(f"{'self [ms]':>10} {'cumulative [ms]':>16}  module")
+    for self_us, cumulative_us, level, name in sorted(imports, key=lambda i: -i[0])[
+        :20
+    ]:
+        print(
+            f"{self_us / 1000:10.1f} {cumulative_us / 1000:16.1f}  {'  ' * level}{name}"
+        )
+    print(f"total: {total_ms:.1f}ms (budget: {budget_ms:.1f}ms)")
+
+    if total_ms > budget_ms:
+        sys.exit(1)
+
+
+@task
+def packets(_: Context, count: int = 100_000, payload: int = 4096) -> None:
+    """measures construction time and memory per packet, as built in the datafeed callback"""
+    from sigrok.bindings import lib
+    from sigrok.sigrok import parse_packet
+
+    data = (ct.c_uint8 * payload)()
+    logic = lib.sr_datafeed_logic(
+        length=payload, unitsize=1, data=ct.cast(data, ct.c_void_p)
+    )
+    header = lib.sr_datafeed_header(feed_version=1)
+    # the device is never touched, it is resolved lazily
+    sdi = ct.POINTER(lib.sr_dev_inst)()
+
+    print(f"{'packet':>8} {'construction [us]':>18} {'memory [B]':>11}")
+    for name, packet_type, payload_struct, payload_size in (
+        ("header", lib.SR_DF_HEADER, header, 0),
+        ("logic", lib.SR_DF_LOGIC, logic, payload),
+        ("end", lib.SR_DF_END, None, 0),
+    ):
+        packet = ct.pointer(
+            lib.sr_datafeed_packet(
+                type=packet_type,
+                payload=ct.cast(ct.pointer(payload_struct), ct.c_void_p)
+                if payload_struct is not None
+                else None,
+            )
+        )
+
+        start = time.perf_counter()
+        for _iteration in range(count):
+            parse_packet(packet, sdi)
+        construction_us = (time.perf_counter() - start) / count * 1e6
+
+        tracemalloc.start()
+        kept = [parse_packet(packet, sdi) for _iteration in range(min(count, 10_000))]
+        memory, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # the payload copy is inherent, only the packet overhead is reported
+        overhead = memory / len(kept) - payload_size
+
+        print(f"{name:>8} {construction_us:18.2f} {overhead:11.0f}")
+
+
+@task
+def config(_: Context, count: int = 10_000) -> None:
+    """measures setting and getting config keys of the demo device"""
+    from sigrok import ConfigKey, Sigrok
+
+    with Sigrok() as sr, sr.get_driver("demo") as driver, driver.get_device() as dev:
+        samplerate = ConfigKey.SR_CONF_SAMPLERATE
+        for name, operation in (
+            ("set_config", lambda: dev.set_config_uint64(samplerate, 1_000)),
+            ("config[]=", lambda: dev.config.__setitem__(samplerate, 1_000)),
+            ("config[]", lambda: dev.config[samplerate]),
+        ):
+            start = time.perf_counter()
+            for _iteration in range(count):
+                operation()
+            print(f"{name:>12} {(time.perf_counter() - start) / count * 1e6:8.2f}us")
+
+
+@task
+def session(_: Context, samples: int = 1_000_000, trace: str = "") -> None:
+    """profiles the stages of a demo capture, optionally writing a chrome trace"""
+    from sigrok import ConfigKey, EndPacket, Sigrok
+    from sigrok.profiling import SessionProfiler
+
+    profiler = SessionProfiler(trace=bool(trace))
+    with Sigrok() as sr, sr.get_driver("demo") as driver, driver.get_device() as dev:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, samples)
+        with sr.session(devices=dev, profiler=profiler) as sess:
+            while not isinstance(sess.next_packet(timeout=1), EndPacket):
+                pass
+    print(profiler.report())
+    if trace:
+        profiler.write_trace(Path(trace))
+
+
+@task
+def tune(_: Context, driver: str = "demo", *, save: bool = False) -> None:
+    """finds the highest samplerate this host sustains, optionally saving it"""
+    from sigrok import Sigrok
+    from sigrok.tuning import HostProfile, ThroughputTuner
+
+    with Sigrok() as sr, sr.get_driver(driver) as drv, drv.get_device() as dev:
+        tuner = ThroughputTuner(sr, dev)
+        settings = tuner.tune()
+        for calibration in tuner.calibrations:
+            print(
+                f"{calibration.settings.samplerate:>13} Hz "
+                f"staging {calibration.settings.staging_capacity:>10} "
+                f"{calibration.throughput:>15.0f} samples/s "
+                f"backlog {calibration.backlog:>5} "
+                f"{'safe' if tuner.is_safe(calibration) else 'unsafe'}"
+            )
+        print(f"recommended: {settings}")
+        if save and settings is not None:
+            profile = HostProfile.load()
+            profile.set(dev, settings)
+            profile.save()
+            print(f"saved to {profile.path}")
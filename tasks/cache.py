@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from invoke import Context, task
+
+from tasks.common import ModulePath
+
+PrebuiltCachePath = ModulePath / "cache"
+
+
+@task
+def prebuild(_: Context) -> None:
+    """parses the headers of all bundled and the local libsigrok into prebuilt caches"""
+    from sigrok.library import (
+        cache_filename,
+        cache_key,
+        header_paths,
+        load_parser,
+        platform_lib_paths,
+        windows_lib_paths,
+    )
+
+    targets = [
+        windows_lib_paths(dll_path)
+        for dll_path in sorted(ModulePath.glob("libsigrok-windows-*"))
+    ]
+    with platform_lib_paths() as local_lib_paths:
+        targets.append(local_lib_paths)
+
+    PrebuiltCachePath.mkdir(exist_ok=True)
+    package_includes = ModulePath / "include"
+    for lib_paths in targets:
+        headers = header_paths(lib_paths, package_includes)
+        load_parser(headers, lib_paths.libsigrok).write_cache(
+            str(
+                PrebuiltCachePath
+                / cache_filename(cache_key(headers, lib_paths.libsigrok))
+            )
+        )
+        print(f"prebuilt cache for {lib_paths.libsigrok}")
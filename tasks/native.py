@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from invoke import Context, task
+
+
+@task
+def build(ctx: Context, compiler: str = "cc") -> None:
+    """builds the native staging helper for the local platform"""
+    import pkgconfig  # type: ignore[import-untyped]
+
+    from sigrok.staging import NativeLibraryPath
+
+    source = NativeLibraryPath.with_name("staging.c")
+    cflags = pkgconfig.cflags("libsigrok")
+    ctx.run(
+        f"{compiler} -O2 -std=c11 -shared -fPIC {cflags}"
+        f" -o {NativeLibraryPath} {source}"
+    )
+    print(f"built {NativeLibraryPath}")
@@ -0,0 +1,4 @@
+# the fixtures of test_sigrok, shared with the tests of the optional modules
+from tests.test_sigrok import dev, dr, session, sr
+
+__all__ = ["dev", "dr", "session", "sr"]
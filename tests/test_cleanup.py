@@ -0,0 +1,138 @@
+import gc
+import threading
+import time
+
+import pytest
+
+import sigrok.sigrok
+from sigrok import (
+    ConfigKey,
+    Device,
+    EndPacket,
+    Session,
+    Sigrok,
+    SigrokError,
+    SigrokGenericError,
+    live_resources,
+)
+
+SoakSessions = 2000
+SoakSamples = 16
+BlockingCallback = 0.5
+ShortTimeout = 0.01
+
+
+def blocking_callback() -> bool:
+    time.sleep(BlockingCallback)
+    return False
+
+
+class FlakySession:
+    """fails to close `failures` times"""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.closed = False
+
+    def close(self) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise SigrokGenericError(hint="stuck")
+        self.closed = True
+
+
+def capture(session: Session) -> None:
+    with session:
+        while not isinstance(session.next_packet(timeout=1), EndPacket):
+            pass
+
+
+class TestSessionCleanup:
+    def test_close(self, sr: Sigrok, dev: Device) -> None:
+        before = live_resources()
+        session = sr.session(devices=dev)
+        session.add_timer(1, lambda: None)
+        assert live_resources()["sessions"] == before.get("sessions", 0) + 1
+
+        session.close()
+        assert session.closed
+        assert live_resources() == before
+        session.close()
+
+    def test_close_stops_running_session(self, sr: Sigrok, dev: Device) -> None:
+        session = sr.session(devices=dev)
+        session.start()
+        session.close()
+        assert not session.is_running
+        assert session.closed
+
+    def test_finalizer(self, sr: Sigrok, dev: Device) -> None:
+        before = live_resources()
+        session = sr.session(devices=dev)
+        session.set_trigger([{"D0": "r"}])
+        del session
+        gc.collect()
+        assert live_resources() == before
+
+    def test_exit_closes_sessions(self) -> None:
+        before = live_resources()
+        sr = Sigrok()
+        sr.init()
+        session = sr.session()
+        sr.exit()
+        assert session.closed
+        assert live_resources() == before
+
+    def test_stop_timeout(self, session: Session) -> None:
+        session.add_timer(0, blocking_callback)
+        session.start()
+        time.sleep(ShortTimeout)
+        with pytest.raises(TimeoutError):
+            session.stop(timeout=ShortTimeout)
+        session.stop()
+
+    def test_close_after_timeout(self, sr: Sigrok, dev: Device) -> None:
+        before = live_resources()
+        session = sr.session(devices=dev)
+        session.add_timer(0, blocking_callback)
+        session.start()
+        time.sleep(ShortTimeout)
+        with pytest.raises(TimeoutError):
+            session.close(timeout=ShortTimeout)
+        assert not session.closed
+
+        session.close()
+        assert session.closed
+        assert live_resources() == before
+
+
+class TestContextRelease:
+    def test_retry_failed_sessions(self) -> None:
+        context = sigrok.sigrok._ContextResources()  # noqa: SLF001 access private member
+        stuck, fine = FlakySession(failures=1), FlakySession()
+        context.sessions.update([stuck, fine])  # type: ignore[list-item]
+
+        with pytest.raises(SigrokError, match="stuck"):
+            context.release()
+        assert fine.closed
+        assert [id(session) for session in context.sessions] == [id(stuck)]
+
+        context.release()
+        assert stuck.closed
+        assert not context.sessions
+
+
+class TestSoak:
+    def test_many_sessions(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, SoakSamples)
+        gc.collect()
+        before = live_resources()
+        threads = threading.active_count()
+
+        for _iteration in range(SoakSessions):
+            session = sr.session(devices=dev)
+            capture(session)
+            session.close()
+
+        assert live_resources() == before
+        assert threading.active_count() == threads
@@ -0,0 +1,172 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sigrok import ConfigKey, Device, Session
+from sigrok.export import (
+    ColumnarExporter,
+    NpzChunkWriter,
+    ParquetChunkWriter,
+    open_chunk_writer,
+)
+
+
+def load_chunks(path: Path) -> list[dict[str, np.ndarray]]:
+    manifest = json.loads((path / "manifest.json").read_text())
+    return [dict(np.load(path / chunk)) for chunk in manifest["chunks"]]
+
+
+class TestColumnarExporter:
+    def test_chunks_logic_samples(self, tmp_path: Path) -> None:
+        chunk_samples = 16
+        data = bytes(range(40))
+
+        with ColumnarExporter(
+            NpzChunkWriter(tmp_path),
+            logic_channels={"D0": 0, "D1": 1},
+            samplerate=1_000,
+            chunk_samples=chunk_samples,
+        ) as exporter:
+            exporter.feed_logic(data[:10], unitsize=1)
+            exporter.feed_logic(data[10:], unitsize=1)
+
+        chunks = load_chunks(tmp_path)
+        assert [int(chunk["sample_index"]) for chunk in chunks] == [0, 16, 32]
+        assert [int(chunk["num_samples"]) for chunk in chunks] == [16, 16, 8]
+        assert float(chunks[1]["timestamp"]) == pytest.approx(0.016)
+
+        d1 = np.concatenate(
+            [np.unpackbits(chunk["D1"], bitorder="little") for chunk in chunks]
+        )
+        assert d1[: len(data)].tolist() == [(value >> 1) & 1 for value in data]
+        assert exporter.stats.logic_samples == len(data)
+
+    def test_analog_columns(self, tmp_path: Path) -> None:
+        values = np.arange(4, dtype=np.float32)
+
+        with ColumnarExporter(NpzChunkWriter(tmp_path), chunk_samples=8) as exporter:
+            exporter.feed_analog(["A0", "A1"], values.tobytes())
+
+        (chunk,) = load_chunks(tmp_path)
+        assert chunk["A0"].tolist() == [0.0, 2.0]
+        assert chunk["A1"].tolist() == [1.0, 3.0]
+
+    def test_analog_only(self, tmp_path: Path) -> None:
+        chunk_samples = 8
+        values = np.arange(20, dtype=np.float32)
+
+        with ColumnarExporter(
+            NpzChunkWriter(tmp_path),
+            analog_channels=["A0"],
+            samplerate=1_000,
+            chunk_samples=chunk_samples,
+        ) as exporter:
+            for start in range(0, len(values), 4):
+                exporter.feed_analog(["A0"], values[start : start + 4].tobytes())
+
+        chunks = load_chunks(tmp_path)
+        assert [int(chunk["sample_index"]) for chunk in chunks] == [0, 8, 16]
+        assert [int(chunk["num_samples"]) for chunk in chunks] == [8, 8, 4]
+        assert float(chunks[2]["timestamp"]) == pytest.approx(0.016)
+        assert np.concatenate([chunk["A0"] for chunk in chunks]).tolist() == (
+            values.tolist()
+        )
+
+    def test_analog_keeps_logic_chunks(self, tmp_path: Path) -> None:
+        chunk_samples = 8
+        analog_values = 12
+
+        with ColumnarExporter(
+            NpzChunkWriter(tmp_path),
+            logic_channels={"D0": 0},
+            analog_channels=["A0"],
+            chunk_samples=chunk_samples,
+        ) as exporter:
+            exporter.feed_logic(bytes(4), unitsize=1)
+            exporter.feed_analog(
+                ["A0"], np.zeros(analog_values, dtype=np.float32).tobytes()
+            )
+            exporter.feed_logic(bytes(4), unitsize=1)
+
+        (chunk,) = load_chunks(tmp_path)
+        assert int(chunk["num_samples"]) == chunk_samples
+        assert len(chunk["A0"]) == analog_values
+
+    def test_invalid_chunk_samples(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="multiple of 8"):
+            ColumnarExporter(NpzChunkWriter(tmp_path), chunk_samples=12)
+
+    def test_parquet(self, tmp_path: Path) -> None:
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "capture.parquet"
+
+        with ColumnarExporter(
+            ParquetChunkWriter(path), logic_channels={"D0": 0}, chunk_samples=8
+        ) as exporter:
+            exporter.feed_logic(bytes(20), unitsize=1)
+
+        table = pq.read_table(path)
+        assert table.column("num_samples").to_pylist() == [8, 8, 4]
+        metadata = json.loads(pq.read_metadata(path).metadata[b"sigrok"])
+        assert metadata["logic_channels"] == {"D0": 0}
+
+    def test_parquet_declared_channels(self, tmp_path: Path) -> None:
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "capture.parquet"
+        values = np.arange(4, dtype=np.float32)
+
+        with ColumnarExporter(
+            ParquetChunkWriter(path),
+            logic_channels={"D0": 0},
+            analog_channels=["A0"],
+            chunk_samples=8,
+        ) as exporter:
+            exporter.feed_logic(bytes(8), unitsize=1)
+            exporter.feed_analog(["A0"], values.tobytes())
+
+        table = pq.read_table(path)
+        assert table.column("A0").to_pylist() == [[], values.tolist()]
+        assert table.column("D0").to_pylist() == [bytes(1), b""]
+
+    def test_parquet_undeclared_channel(self, tmp_path: Path) -> None:
+        pytest.importorskip("pyarrow")
+        exporter = ColumnarExporter(
+            ParquetChunkWriter(tmp_path / "capture.parquet"), chunk_samples=8
+        )
+        exporter.feed_logic(bytes(8), unitsize=1)
+        exporter.feed_analog(["A0"], bytes(4))
+        with pytest.raises(ValueError, match="differ from the schema"):
+            exporter.flush()
+
+    def test_parquet_suffix(self, tmp_path: Path) -> None:
+        pytest.importorskip("pyarrow")
+        for writer in ("auto", "parquet"):
+            chunk_writer = open_chunk_writer(tmp_path / "capture", writer)
+            assert isinstance(chunk_writer, ParquetChunkWriter)
+            assert chunk_writer.path == tmp_path / "capture.parquet"
+
+    def test_export_session(
+        self, tmp_path: Path, session: Session, dev: Device
+    ) -> None:
+        limit_samples = 4096
+
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, limit_samples)
+        dev.set_config_uint64(ConfigKey.SR_CONF_SAMPLERATE, 1_000_000)
+        dev.enable_channels("D0", "D3", "A0")
+
+        exporter = ColumnarExporter.for_device(
+            tmp_path / "capture",
+            dev,
+            samplerate=1_000_000,
+            chunk_samples=1024,
+            writer="npz",
+        )
+        with session:
+            stats = exporter.export(session, timeout=1)
+
+        assert stats.logic_samples == limit_samples
+        assert stats.analog_samples > 0
+        chunks = load_chunks(tmp_path / "capture")
+        assert {"D0", "D3", "A0"} <= chunks[0].keys()
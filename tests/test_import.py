@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+import pytest
+
+import sigrok
+
+HeavyModules = {"sigrok.library", "pyclibrary", "pyparsing", "numpy"}
+
+
+def imported_modules(statement: str) -> set[str]:
+    result = subprocess.run(  # noqa: S603 trusted input
+        [sys.executable, "-c", f"{statement}\nimport sys\nprint(*sys.modules)"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyImport:
+    def test_package_import_loads_nothing(self) -> None:
+        modules = imported_modules("import sigrok")
+        assert not modules & {"sigrok.sigrok", "sigrok.bindings", *HeavyModules}
+
+    def test_core_import_does_not_load_library(self) -> None:
+        modules = imported_modules(
+            "from sigrok import Sigrok, Session\n"
+            "from sigrok.bindings import lib\n"
+            "assert not lib.loaded"
+        )
+        assert "sigrok.sigrok" in modules
+        assert not modules & HeavyModules
+
+    def test_star_import_does_not_load_library(self) -> None:
+        imported_modules(
+            "from sigrok import *\n"
+            "from sigrok.bindings import lib\n"
+            "assert not lib.loaded"
+        )
+
+    @pytest.mark.parametrize("module", ["sigrok.tuning", "sigrok.export"])
+    def test_module_import_does_not_load_library(self, module: str) -> None:
+        imported_modules(
+            f"import {module}\nfrom sigrok.bindings import lib\nassert not lib.loaded"
+        )
+
+    def test_library_enums_by_name(self) -> None:
+        assert {"ChannelType", "ConfigKey"} <= set(dir(sigrok))
+        assert "ConfigKey" not in sigrok.__all__
+
+    def test_submodule_attribute(self) -> None:
+        assert sigrok.logic.__name__ == "sigrok.logic"
+
+    def test_unknown_attribute(self) -> None:
+        with pytest.raises(AttributeError, match="unknown"):
+            _ = sigrok.unknown
+
+    def test_dir_lists_exports(self) -> None:
+        assert set(sigrok.__all__) <= set(dir(sigrok))
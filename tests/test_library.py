@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import platformdirs
+import pytest
+from pyclibrary import CParser  # type: ignore[import-untyped]
+
+from sigrok import library as sigrok_library
+
+
+@pytest.fixture
+def headers(tmp_path: Path) -> list[Path]:
+    header = tmp_path / "test.h"
+    header.write_text("typedef int my_int;\nint my_function(my_int value);\n")
+    return [header]
+
+
+@pytest.fixture
+def shared_library(tmp_path: Path) -> Path:
+    shared_library = tmp_path / "libtest.so"
+    shared_library.write_bytes(b"\x7fELF")
+    return shared_library
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(platformdirs, "user_cache_path", lambda *_, **__: cache_dir)
+    return cache_dir
+
+
+class TestHeaderCache:
+    def test_key_changes_with_header_content(
+        self, headers: list[Path], shared_library: Path
+    ) -> None:
+        key = sigrok_library.cache_key(headers, shared_library)
+        headers[0].write_text("typedef long my_int;\n")
+        assert sigrok_library.cache_key(headers, shared_library) != key
+
+    def test_key_changes_with_library_content(
+        self, headers: list[Path], shared_library: Path
+    ) -> None:
+        key = sigrok_library.cache_key(headers, shared_library)
+        shared_library.write_bytes(b"\x7fELF\x02")
+        assert sigrok_library.cache_key(headers, shared_library) != key
+
+    def test_writes_and_reuses_cache(
+        self,
+        headers: list[Path],
+        shared_library: Path,
+        cache_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        parser = sigrok_library.load_parser(headers, shared_library)
+        assert "my_function" in parser.defs["functions"]
+        assert (
+            cache_dir
+            / sigrok_library.cache_filename(
+                sigrok_library.cache_key(headers, shared_library)
+            )
+        ).is_file()
+
+        def fail(*_: object, **__: object) -> None:
+            pytest.fail("headers parsed although a cache exists")
+
+        monkeypatch.setattr(CParser, "process_all", fail)
+        parser = sigrok_library.load_parser(headers, shared_library)
+        assert "my_function" in parser.defs["functions"]
+
+    def test_concurrent_loads(
+        self, headers: list[Path], shared_library: Path, cache_dir: Path
+    ) -> None:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parsers = list(
+                executor.map(
+                    lambda _: sigrok_library.load_parser(headers, shared_library),
+                    range(4),
+                )
+            )
+
+        assert all("my_function" in parser.defs["functions"] for parser in parsers)
+        assert sorted(path.suffix for path in cache_dir.iterdir()) == [
+            ".cache",
+            ".lock",
+        ]
@@ -0,0 +1,141 @@
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from sigrok import ConfigKey, Device, DeviceDriver, Sigrok
+from sigrok.polling import PollingEngine, _Series
+from sigrok.testing import DefaultIdn, NoError, ScpiServer, UndefinedHeader
+
+Reading = 1.5
+MaxSamples = 4
+Overflow = 2
+# readings per second, the demo device acquires at this samplerate
+Rate = 100_000.0
+LimitSamples = 1000
+Timeout = 5.0
+
+
+def query(server: ScpiServer, command: str) -> str:
+    with socket.create_connection(("127.0.0.1", server.port)) as conn:
+        conn.sendall(f"{command}\n".encode("ascii"))
+        return conn.makefile().readline().strip()
+
+
+class TestScpiServer:
+    def test_idn(self) -> None:
+        with ScpiServer() as server:
+            assert query(server, "*IDN?") == DefaultIdn
+            assert server.conn == f"tcp-raw/127.0.0.1/{server.port}"
+
+    def test_measure(self) -> None:
+        with ScpiServer(measure=lambda: Reading) as server:
+            assert float(query(server, "READ?")) == Reading
+            assert query(server, "CONF:VOLT:DC 10;*OPC?") == "1"
+            assert server.commands == ["READ?", "CONF:VOLT:DC 10", "*OPC?"]
+
+    def test_responses(self) -> None:
+        with ScpiServer({"meas:curr?": "+2.0E-3"}) as server:
+            assert query(server, "MEAS:CURR?") == "+2.0E-3"
+
+    def test_errors(self) -> None:
+        with ScpiServer() as server:
+            assert query(server, "BOGUS;SYST:ERR?") == UndefinedHeader
+            assert query(server, "SYST:ERR?") == NoError
+
+
+class TestSeries:
+    def test_grows_and_drops_oldest(self) -> None:
+        series = _Series(MaxSamples)
+        for value in range(MaxSamples + Overflow):
+            series.append(float(value), np.array([value], dtype=np.float32))
+        timestamps, values = series.take()
+        assert values.tolist() == list(range(Overflow, MaxSamples + Overflow))
+        assert timestamps.tolist() == values.tolist()
+        assert series.dropped == Overflow
+        assert series.length == 0
+
+
+class TestPollingEngine:
+    def test_demo(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, LimitSamples)
+        engine = PollingEngine(sr)
+        engine.add(dev, name="demo")
+        with engine:
+            batch = engine.next_measurements(timeout=1)
+        engine.close()
+        assert batch
+        for measurements in batch:
+            assert measurements.key.instrument == "demo"
+            assert measurements.values.dtype == np.float32
+            assert len(measurements.timestamps) == len(measurements.values)
+
+    def test_rate(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, LimitSamples)
+        # a clock which stands still, only the first reading gets in
+        engine = PollingEngine(sr, clock=lambda: 0.0)
+        instrument = engine.add(dev, rate=Rate)
+        with engine:
+            assert engine.session is not None
+            engine.session.next_packet(timeout=1)
+        batch = engine.measurements()
+        engine.close()
+        assert all(len(measurements.values) == 1 for measurements in batch)
+        assert instrument.paced
+        assert dev.config["samplerate"] == Rate
+
+    def test_restart(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, LimitSamples)
+        engine = PollingEngine(sr)
+        engine.add(dev, name="demo")
+        for _run in range(2):
+            with engine:
+                assert engine.next_measurements(timeout=1)
+            assert engine.session is None
+        engine.close()
+
+    def test_shared_session(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, LimitSamples)
+        with ScpiServer(measure=lambda: Reading) as server:
+            driver = sr.get_driver("scpi-dmm")
+            with driver:
+                device = driver.get_device(options={"conn": server.conn})
+                engine = PollingEngine(sr)
+                engine.add(device, name="dmm")
+                with engine:
+                    engine.add(dev, name="demo")
+                    deadline = time.monotonic() + Timeout
+                    instruments: set[str] = set()
+                    while instruments != {"dmm", "demo"}:
+                        remaining = deadline - time.monotonic()
+                        batch = engine.next_measurements(timeout=remaining)
+                        instruments.update(m.key.instrument for m in batch)
+                engine.close()
+
+    def test_duplicate(self, sr: Sigrok, dev: Device) -> None:
+        engine = PollingEngine(sr)
+        engine.add(dev, name="demo")
+        with pytest.raises(ValueError, match="already added"):
+            engine.add(dev, name="demo")
+        engine.close()
+
+    def test_scpi_dmm(self, sr: Sigrok) -> None:
+        with ScpiServer(measure=lambda: Reading) as server:
+            driver = sr.get_driver("scpi-dmm")
+            with driver:
+                device = driver.get_device(options={"conn": server.conn})
+                engine = PollingEngine(sr)
+                instrument = engine.add(device, rate=Rate)
+                with engine:
+                    batch = engine.next_measurements(timeout=5)
+                engine.close()
+        assert batch[0].values.tolist() == [Reading]
+        assert not instrument.paced
+        assert "*IDN?" in server.commands
+
+    def test_scan_without_instrument(self, sr: Sigrok) -> None:
+        with ScpiServer(idn="Nobody,Nothing,0,0") as server:
+            driver: DeviceDriver = sr.get_driver("scpi-dmm")
+            with driver:
+                assert driver.scan({"conn": server.conn}) == []
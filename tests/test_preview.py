@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from sigrok import ConfigKey, Device, Session
+from sigrok.preview import LogicPreview
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def samples(*values: int) -> bytes:
+    return bytes(values)
+
+
+class TestLogicPreview:
+    def test_min_max_per_bucket(self) -> None:
+        preview = LogicPreview(width=4, samples_per_bucket=2)
+        frame = preview.feed_data(samples(0, 1, 1, 1, 0, 0, 1, 0), unitsize=1)
+
+        assert frame is not None
+        assert frame.width == preview.width
+        assert frame.start == 0
+        assert frame.minimum[0].tolist() == [0, 1, 0, 0]
+        assert frame.maximum[0].tolist() == [1, 1, 0, 1]
+        assert frame.maximum[1].tolist() == [0, 0, 0, 0]
+
+    def test_edges_across_bucket_and_packet_boundaries(self) -> None:
+        preview = LogicPreview(width=4, samples_per_bucket=2)
+        preview.feed_data(samples(0, 0, 0), unitsize=1)
+        preview.feed_data(samples(1, 1, 1, 1, 0), unitsize=1)
+
+        frame = preview.frame()
+        assert frame.edges[0].tolist() == [False, True, False, True]
+
+    def test_bounded_to_width(self) -> None:
+        total_samples = 10
+
+        preview = LogicPreview(width=3, samples_per_bucket=1)
+        frame = preview.feed_data(bytes(range(total_samples)), unitsize=1)
+
+        assert frame is not None
+        assert frame.width == preview.width
+        assert frame.start == total_samples - preview.width
+        assert frame.maximum[0].tolist() == [1, 0, 1]
+        assert frame.edges[0].tolist() == [True, True, True]
+
+    def test_channel_selection_and_unitsize(self) -> None:
+        preview = LogicPreview(width=2, samples_per_bucket=1, channels=[0, 9])
+        frame = preview.feed_data(
+            np.array([0x0001, 0x0200], dtype="<u2").tobytes(), unitsize=2
+        )
+
+        assert frame is not None
+        assert frame.maximum.tolist() == [[1, 0], [0, 1]]
+
+    def test_refresh_rate(self) -> None:
+        clock = Clock()
+        preview = LogicPreview(
+            width=2, samples_per_bucket=1, refresh_rate=10, clock=clock
+        )
+
+        assert preview.feed_data(samples(1), unitsize=1) is not None
+        clock.now = 0.05
+        assert preview.feed_data(samples(1), unitsize=1) is None
+        clock.now = 0.1
+        assert preview.feed_data(samples(1), unitsize=1) is not None
+
+    def test_invalid_width(self) -> None:
+        with pytest.raises(ValueError, match="width"):
+            LogicPreview(width=0, samples_per_bucket=1)
+
+    def test_frames_from_session(self, session: Session, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 4096)
+        dev.set_config_uint64(ConfigKey.SR_CONF_SAMPLERATE, 1_000_000)
+        dev.enable_channels("D0", "D1")
+
+        preview = LogicPreview(width=64, samples_per_bucket=64)
+        with session:
+            frames = list(preview.frames(session, timeout=1))
+
+        assert frames[-1].width == preview.width
+        assert frames[-1].minimum.shape == (8, preview.width)
@@ -0,0 +1,102 @@
+import json
+import threading
+from pathlib import Path
+
+from sigrok import ConfigKey, Device, EndPacket, Session, Sigrok
+from sigrok.profiling import SessionProfiler, StageHistogram
+
+LimitSamples = 4096
+Microsecond = 1_000
+Durations = (100, 100, 100, 5000)
+
+
+def consume(session: Session) -> None:
+    with session:
+        while not isinstance(session.next_packet(timeout=1), EndPacket):
+            pass
+
+
+class TestStageHistogram:
+    def test_percentiles(self) -> None:
+        histogram = StageHistogram()
+        for duration in Durations:
+            histogram.add(duration)
+        assert histogram.count == len(Durations)
+        # the upper bound of the bucket, capped to the max
+        assert histogram.percentile(50) == (1 << (100).bit_length()) - 1
+        assert histogram.percentile(100) == max(Durations)
+
+    def test_empty(self) -> None:
+        histogram = StageHistogram()
+        assert histogram.mean == 0
+        assert histogram.percentile(99) == 0
+
+
+class TestSessionProfiler:
+    def test_record(self) -> None:
+        profiler = SessionProfiler()
+        assert profiler.record("parse", 0, Microsecond) == Microsecond
+        assert profiler.histograms["parse"].total == Microsecond
+        assert not profiler.events
+        assert "parse" in profiler.report()
+
+    def test_latency_in_queue_order(self) -> None:
+        profiler = SessionProfiler()
+        profiler.enqueued(profiler.callback_started())
+        profiler.enqueued(profiler.callback_started())
+        profiler.dequeued(profiler.waiting())
+        assert profiler.histograms["latency"].count == 1
+        assert profiler.histograms["consumer"].count == 0
+        profiler.dequeued(profiler.waiting())
+        assert (
+            profiler.histograms["latency"].count == profiler.histograms["queue"].count
+        )
+        assert profiler.histograms["consumer"].count == 1
+
+    def test_chrome_trace(self, tmp_path: Path) -> None:
+        profiler = SessionProfiler(trace=True)
+        thread = threading.Thread(
+            target=profiler.record, args=("parse", 0, Microsecond), name="acquisition"
+        )
+        thread.start()
+        thread.join()
+        profiler.record("wait", 0, Microsecond)
+
+        profiler.write_trace(tmp_path / "trace.json")
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        names = {event["args"]["name"] for event in events if event["ph"] == "M"}
+        spans = [event for event in events if event["ph"] == "X"]
+        assert "acquisition" in names
+        assert [span["name"] for span in spans] == ["parse", "wait"]
+        assert spans[0]["dur"] == 1.0
+        assert spans[0]["tid"] != spans[1]["tid"]
+
+    def test_max_events(self) -> None:
+        profiler = SessionProfiler(trace=True, max_events=1)
+        profiler.record("parse", 0, 1)
+        profiler.record("queue", 1, 2)
+        assert [event.stage for event in profiler.events] == ["queue"]
+
+
+class TestProfiledSession:
+    def test_stages(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, LimitSamples)
+        session = sr.session(devices=dev, profiler=True)
+        consume(session)
+        assert session.profiler is not None
+        histograms = session.profiler.histograms
+        for stage in ("driver", "callback", "parse", "queue", "latency", "wait"):
+            assert histograms[stage].count, stage
+        assert histograms["queue"].count == histograms["latency"].count
+
+    def test_staging(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, LimitSamples)
+        profiler = SessionProfiler(trace=True)
+        consume(sr.session(devices=dev, staging=True, profiler=profiler))
+        assert profiler.histograms["parse"].count
+        names = [
+            event["args"]["name"]
+            for event in profiler.chrome_trace()["traceEvents"]
+            if event["ph"] == "M"
+        ]
+        assert "sigrok-drain" in names
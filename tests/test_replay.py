@@ -0,0 +1,95 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from sigrok import (
+    EndPacket,
+    HeaderPacket,
+    LogicPacket,
+    Packet,
+    Session,
+    Sigrok,
+    SigrokInputFormatNotFoundError,
+)
+
+# 1000 samples at 1MHz, D0 toggles every 250us
+VCD = """$timescale 1 us $end
+$scope module top $end
+$var wire 1 ! D0 $end
+$upscope $end
+$enddefinitions $end
+#0
+0!
+#250
+1!
+#500
+0!
+#750
+1!
+#1000
+0!
+"""
+CaptureDuration = 0.001
+
+
+@pytest.fixture
+def vcd(tmp_path: Path) -> Path:
+    path = tmp_path / "capture.vcd"
+    path.write_text(VCD)
+    return path
+
+
+def collect(session: Session) -> list[Packet]:
+    packets = [session.next_packet(timeout=5)]
+    while not isinstance(packets[-1], EndPacket):
+        packets.append(session.next_packet(timeout=5))
+    return packets
+
+
+class TestReplay:
+    def test_packet_stream(self, sr: Sigrok, vcd: Path) -> None:
+        with sr.replay(vcd, speed=None) as session:
+            packets = collect(session)
+
+        assert isinstance(packets[0], HeaderPacket)
+        logic = [packet for packet in packets if isinstance(packet, LogicPacket)]
+        assert logic
+        assert logic[0].data[0] & 1 == 0
+
+    def test_explicit_input_format(self, sr: Sigrok, vcd: Path) -> None:
+        with sr.replay(vcd, speed=None, input_format="vcd") as session:
+            assert isinstance(collect(session)[0], HeaderPacket)
+
+    def test_real_time_pacing(self, sr: Sigrok, vcd: Path) -> None:
+        speed = 0.01
+        start = time.monotonic()
+        with sr.replay(vcd, speed=speed) as session:
+            collect(session)
+        assert time.monotonic() - start >= CaptureDuration / speed * 0.9
+
+    def test_samplerate_override(self, sr: Sigrok, vcd: Path) -> None:
+        # pacing with a tenth of the samplerate takes ten times longer
+        speed = 0.1
+        start = time.monotonic()
+        with sr.replay(vcd, speed=speed, samplerate=100_000) as session:
+            collect(session)
+        assert time.monotonic() - start >= CaptureDuration * 10 / speed * 0.9
+
+    def test_stop_interrupts_pacing(self, sr: Sigrok, vcd: Path) -> None:
+        timeout = 1
+        start = time.monotonic()
+        with sr.replay(vcd, speed=1e-6) as session:
+            session.next_packet(timeout=timeout)
+        assert time.monotonic() - start < timeout + 1
+
+    def test_input_format_not_found(self, sr: Sigrok, vcd: Path) -> None:
+        with pytest.raises(SigrokInputFormatNotFoundError, match="unknown"):
+            sr.replay(vcd, input_format="unknown")
+
+    def test_invalid_speed(self, sr: Sigrok, vcd: Path) -> None:
+        with pytest.raises(ValueError, match="speed"):
+            sr.replay(vcd, speed=0)
+
+    def test_list_input_formats(self) -> None:
+        assert "vcd" in Sigrok.get_input_formats()
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from sigrok.resources import FirmwareCache, ResourceHooks
+
+
+class TestResourceHooks:
+    def test_load_from_memory(self, tmp_path: Path) -> None:
+        (tmp_path / "fw.bin").write_bytes(b"disk")
+        hooks = ResourceHooks(
+            [tmp_path], firmware={"fw.bin": b"memory"}, cache=FirmwareCache()
+        )
+        assert hooks.load("fw.bin") == b"memory"
+
+    def test_load_from_dirs(self, tmp_path: Path) -> None:
+        first, second = tmp_path / "first", tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+        (second / "fw.bin").write_bytes(b"second")
+        hooks = ResourceHooks([first, second], cache=FirmwareCache())
+        assert hooks.load("fw.bin") == b"second"
+
+    def test_missing(self, tmp_path: Path) -> None:
+        assert ResourceHooks([tmp_path], cache=FirmwareCache()).load("fw.bin") is None
+
+
+class TestFirmwareCache:
+    def test_keeps_loaded_files(self, tmp_path: Path) -> None:
+        path = tmp_path / "fw.bin"
+        path.write_bytes(b"firmware")
+        hooks = ResourceHooks([tmp_path], cache=FirmwareCache())
+        assert hooks.load("fw.bin") == b"firmware"
+        path.unlink()
+        assert hooks.load("fw.bin") == b"firmware"
+
+    def test_preload(self, tmp_path: Path) -> None:
+        for name in ("a.fw", "b.fw", "c.bit"):
+            (tmp_path / name).write_bytes(name.encode())
+        cache = FirmwareCache()
+        hooks = ResourceHooks([tmp_path, tmp_path / "missing"], cache=cache)
+
+        assert hooks.preload(["a.fw", "c.bit"]) == len(["a.fw", "c.bit"])
+        assert cache.get(tmp_path / "a.fw") == b"a.fw"
+        assert cache.get(tmp_path / "b.fw") is None
+        assert cache.size == len(b"a.fw") + len(b"c.bit")
+
+    def test_clear(self, tmp_path: Path) -> None:
+        (tmp_path / "fw.bin").write_bytes(b"firmware")
+        cache = FirmwareCache()
+        cache.preload([tmp_path])
+        cache.clear()
+        assert cache.size == 0
@@ -0,0 +1,82 @@
+import numpy as np
+
+from sigrok.search import ConditionSearch, GlitchSearch, PulseSearch
+
+CS, CLK = 0, 1
+SplitSeed = 7
+Samples = 10_000
+
+
+def samples(*values: int) -> bytes:
+    return bytes(values)
+
+
+class TestConditionSearch:
+    def test_pattern(self) -> None:
+        search = ConditionSearch.pattern(0xA5)
+        assert search.feed_data(samples(0x00, 0xA5, 0xA4, 0xA5), 1).tolist() == [1, 3]
+
+    def test_pattern_on_channels(self) -> None:
+        search = ConditionSearch.pattern(0b10, channels=[8, 9])
+        data = np.array([0x0000, 0x0200, 0x0300, 0x02FF], dtype="<u2").tobytes()
+        assert search.feed_data(data, 2).tolist() == [1, 3]
+
+    def test_level_and_edge_across_packets(self) -> None:
+        search = ConditionSearch({CS: "0", CLK: "r"})
+        assert search.feed_data(samples(0b00, 0b10, 0b00), 1).tolist() == [1]
+        # the rising edge is on the first sample of the second packet
+        assert search.feed_data(samples(0b10, 0b11, 0b01, 0b11), 1).tolist() == [3]
+
+    def test_first_sample_is_no_edge(self) -> None:
+        search = ConditionSearch({CLK: "e"})
+        assert search.feed_data(samples(0b10, 0b10, 0b00), 1).tolist() == [2]
+
+
+class TestPulseSearch:
+    def test_widths_outside_tolerance(self) -> None:
+        search = PulseSearch(0, shorter_than=2, longer_than=3)
+        pulses = search.feed_data(samples(0, 1, 0, 1, 1, 0, 1, 1, 1, 1, 0), 1)
+        assert pulses.start.tolist() == [1, 6]
+        assert pulses.width.tolist() == [1, 4]
+
+    def test_across_packets(self) -> None:
+        search = PulseSearch(0)
+        assert not search.feed_data(samples(0, 1, 1), 1).start.size
+        pulses = search.feed_data(samples(1, 0), 1)
+        assert pulses.start.tolist() == [1]
+        assert pulses.width.tolist() == [3]
+
+    def test_ignores_partial_pulses(self) -> None:
+        search = PulseSearch(0, level=0)
+        pulses = search.feed_data(samples(0, 0, 1, 0, 1, 0), 1)
+        assert pulses.start.tolist() == [3]
+
+
+class TestGlitchSearch:
+    def test_glitches(self) -> None:
+        search = GlitchSearch([0, 1], max_width=1)
+        pulses = search.feed_data(samples(0, 0, 2, 0, 0, 1, 1, 0, 1, 1), 1)
+        assert pulses.start.tolist() == [2, 7]
+        assert pulses.channel.tolist() == [1, 0]
+
+
+def test_results_independent_of_packet_boundaries() -> None:
+    rng = np.random.default_rng(SplitSeed)
+    # slowly changing signals, so there are pulses of many widths
+    data = np.repeat(rng.integers(0, 256, Samples // 4, dtype=np.uint8), 4)
+    data[rng.integers(0, Samples, 100)] ^= 0xFF
+    splits = np.sort(rng.integers(0, Samples, 20))
+
+    def run(chunks: list[bytes]) -> tuple[list[int], list[int], list[int]]:
+        condition = ConditionSearch({0: "1", 3: "f"})
+        pulses = PulseSearch(2, longer_than=6)
+        glitches = GlitchSearch(range(8), max_width=2)
+        found: tuple[list[int], list[int], list[int]] = ([], [], [])
+        for chunk in chunks:
+            found[0].extend(condition.feed_data(chunk, 1).tolist())
+            found[1].extend(pulses.feed_data(chunk, 1).start.tolist())
+            found[2].extend(glitches.feed_data(chunk, 1).start.tolist())
+        return found
+
+    chunks = [part.tobytes() for part in np.split(data, splits)]
+    assert run(chunks) == run([data.tobytes()])
@@ -1,23 +1,45 @@
+import gc
+import json
 import logging
+import socket
+import threading
+import time
 from collections.abc import Iterator
 
 import pytest
 
 from sigrok import (
+    AnalogPacket,
     Channel,
+    ChannelGroup,
     ChannelType,
     ConfigKey,
     Device,
+    DeviceConfig,
+    DeviceConfigSnapshot,
     DeviceDriver,
     DeviceNotFoundError,
     EndPacket,
     HeaderPacket,
+    IOCondition,
     LogicPacket,
     Session,
     Sigrok,
+    SigrokArgError,
+    SigrokChannelGroupNotFoundError,
     SigrokChannelNotFoundError,
     SigrokDriverNotFoundError,
+    SigrokNotApplicableError,
 )
+from sigrok.bindings import lib
+from sigrok.sigrok import _log_router
+
+TimerCalls = 3
+SampleRate = 200_000
+LimitSamples = 10
+SpewLevel = 5
+# samplerate, D0 and the amplitude of A0
+Deltas = 3
 
 
 def test_host_build_info() -> None:
@@ -182,6 +204,182 @@ class TestDevice:
     def test_set_bool_config(self, dev: Device) -> None:
         dev.set_config_bool(ConfigKey.SR_CONF_AVERAGING, enabled=True)
 
+    def test_list_channel_groups(self, dev: Device) -> None:
+        for cg in dev.channel_groups():
+            assert isinstance(cg, ChannelGroup)
+
+    def test_get_channel_group(self, dev: Device) -> None:
+        cg = dev.channel_group("Logic")
+        assert cg.name == "Logic"
+        assert "D0" in [ch.name for ch in cg.channels()]
+
+    def test_channel_group_not_found(self, dev: Device) -> None:
+        with pytest.raises(SigrokChannelGroupNotFoundError):
+            dev.channel_group("unknown")
+
+    def test_set_channel_group_config(self, dev: Device) -> None:
+        dev.set_config_string(
+            ConfigKey.SR_CONF_PATTERN_MODE, "random", channel_group="Logic"
+        )
+
+
+class TestDeviceConfig:
+    def test_get_set(self, dev: Device) -> None:
+        dev.config[ConfigKey.SR_CONF_SAMPLERATE] = SampleRate
+        assert dev.config[ConfigKey.SR_CONF_SAMPLERATE] == SampleRate
+
+    def test_key_by_id(self, dev: Device) -> None:
+        dev.config["limit_samples"] = LimitSamples
+        assert dev.config[ConfigKey.SR_CONF_LIMIT_SAMPLES] == LimitSamples
+
+    def test_bool(self, dev: Device) -> None:
+        dev.config[ConfigKey.SR_CONF_AVERAGING] = True
+        assert dev.config[ConfigKey.SR_CONF_AVERAGING] is True
+
+    def test_tuple(self, dev: Device) -> None:
+        config = dev.config.channel_group("A0")
+        mq = config[ConfigKey.SR_CONF_MEASURED_QUANTITY]
+        assert isinstance(mq, tuple)
+        config[ConfigKey.SR_CONF_MEASURED_QUANTITY] = mq
+
+    def test_channel_group(self, dev: Device) -> None:
+        config = dev.config.channel_group("A0")
+        config[ConfigKey.SR_CONF_AMPLITUDE] = 2.5
+        assert config[ConfigKey.SR_CONF_AMPLITUDE] == pytest.approx(2.5)
+
+    def test_keys(self, dev: Device) -> None:
+        assert ConfigKey.SR_CONF_SAMPLERATE in list(dev.config)
+        assert "samplerate" in dev.config
+
+    def test_possible_values(self, dev: Device) -> None:
+        assert "samplerate-steps" in dev.config.possible_values("samplerate")
+
+    def test_info(self) -> None:
+        info = DeviceConfig.info(ConfigKey.SR_CONF_SAMPLERATE)
+        assert info.id == "samplerate"
+        assert info.type_string == "t"
+
+    def test_unknown_key(self, dev: Device) -> None:
+        with pytest.raises(SigrokArgError):
+            dev.config["does-not-exist"]
+
+    def test_get_default(self, dev: Device) -> None:
+        assert dev.config.get(ConfigKey.SR_CONF_DATALOG, "n/a") == "n/a"
+
+
+class TestDeviceConfiguration:
+    def test_applies_only_changes(self, dev: Device) -> None:
+        channels = dev.channels()
+
+        assert dev.configure().enable_channels("D0").apply() == len(channels) - 1
+        assert dev.configure().enable_channels("D0").apply() == 0
+
+    def test_skips_unchanged_config(self, dev: Device) -> None:
+        configuration = dev.configure().set_uint64(
+            ConfigKey.SR_CONF_SAMPLERATE, 1_000_000
+        )
+        configuration.apply()
+
+        assert (
+            configuration.set_uint64(ConfigKey.SR_CONF_SAMPLERATE, 1_000_000).apply()
+            == 0
+        )
+
+    def test_channel_group_config(self, dev: Device) -> None:
+        with dev.configure() as configuration:
+            configuration.set_string(
+                ConfigKey.SR_CONF_PATTERN_MODE,
+                "random",
+                channel_group=dev.channel_group("Logic"),
+            )
+
+    def test_validates_before_applying(self, dev: Device) -> None:
+        configuration = dev.configure().set_channel("D0", enabled=False)
+        configuration.set_uint64(ConfigKey.SR_CONF_SAMPLERATE, 1_000)
+        configuration.set_channel("unknown", enabled=True)
+
+        with pytest.raises(SigrokChannelNotFoundError):
+            configuration.apply()
+        assert dev.channel("D0").enabled
+
+    def test_rejects_unsettable_keys(self, dev: Device) -> None:
+        configuration = dev.configure().set_channel("D0", enabled=False)
+        configuration.set_string(ConfigKey.SR_CONF_CONN, "usb")
+
+        with pytest.raises(SigrokNotApplicableError):
+            configuration.apply()
+        assert dev.channel("D0").enabled
+
+    def test_unknown_channel_group(self, dev: Device) -> None:
+        configuration = dev.configure().set_string(
+            ConfigKey.SR_CONF_PATTERN_MODE, "random", channel_group="unknown"
+        )
+
+        with pytest.raises(SigrokChannelGroupNotFoundError):
+            configuration.apply()
+
+
+class TestDeviceConfigSnapshot:
+    def test_capture(self, dev: Device, session: Session) -> None:
+        dev.config["samplerate"] = SampleRate
+        session.set_trigger([{"D0": "r"}])
+        snapshot = DeviceConfigSnapshot.capture(dev, session)
+        assert snapshot.config["samplerate"] == SampleRate
+        assert "A0" in snapshot.channel_groups
+        assert snapshot.channels["D0"] is True
+        assert snapshot.triggers == ({"D0": "r"},)
+
+    def test_json_roundtrip(self, dev: Device, session: Session) -> None:
+        session.set_trigger([{"D0": "1"}])
+        snapshot = DeviceConfigSnapshot.capture(dev, session)
+        restored = DeviceConfigSnapshot.from_dict(
+            json.loads(json.dumps(snapshot.to_dict()))
+        )
+        assert restored == snapshot
+        assert restored.apply(dev) == 0
+
+    def test_applies_only_deltas(self, dev: Device) -> None:
+        dev.config["samplerate"] = SampleRate
+        snapshot = DeviceConfigSnapshot.capture(dev)
+
+        dev.config["samplerate"] = SampleRate * 2
+        dev.channel("D0").enabled = False
+        dev.config.channel_group("A0")[ConfigKey.SR_CONF_AMPLITUDE] = 2.5
+
+        assert snapshot.apply(dev) == Deltas
+        assert dev.config["samplerate"] == SampleRate
+        assert dev.channel("D0").enabled
+        assert snapshot.apply(dev) == 0
+
+    def test_unknown_channel(self, dev: Device) -> None:
+        snapshot = DeviceConfigSnapshot(config={}, channel_groups={}, channels={})
+        with pytest.raises(SigrokChannelNotFoundError):
+            snapshot._replace(channels={"unknown": True}).apply(dev)
+
+    def test_sets_session_trigger(self, session: Session, dev: Device) -> None:
+        dev.config["limit_samples"] = LimitSamples
+        snapshot = DeviceConfigSnapshot.capture(dev)._replace(triggers=({"D0": "e"},))
+        snapshot.apply(dev, session)
+        assert session.triggers == snapshot.triggers
+        with session:
+            assert isinstance(session.next_packet(timeout=1), HeaderPacket)
+
+
+class TestTrigger:
+    def test_set_and_remove(self, session: Session) -> None:
+        session.set_trigger([{"D0": "1", "D1": "0"}, {"D2": "r"}, {"A0": ">0.5"}])
+        session.set_trigger(None)
+
+    def test_unknown_channel(self, session: Session) -> None:
+        with pytest.raises(SigrokChannelNotFoundError):
+            session.set_trigger([{"unknown": "1"}])
+
+    def test_invalid_condition(self, session: Session) -> None:
+        with pytest.raises(SigrokArgError):
+            session.set_trigger([{"D0": "x"}])
+        with pytest.raises(SigrokArgError):
+            session.set_trigger([{"A0": ">high"}])
+
 
 @pytest.fixture
 def ch(dev: Device) -> Channel:
@@ -227,6 +425,25 @@ class TestLogging:
             Sigrok()
         assert caplog.records
 
+    def test_exit_restores_log_level(self) -> None:
+        gc.collect()
+        level = lib.sr_log_loglevel_get().rval
+        sr = Sigrok(log_level=SpewLevel)
+        sr.init()
+        assert lib.sr_log_loglevel_get().rval == SpewLevel
+        sr.exit()
+        assert lib.sr_log_loglevel_get().rval == level
+
+    def test_exit_ends_log_route(self) -> None:
+        sr = Sigrok()
+        sr.init()
+        assert _log_router.current() is not None
+        sr.exit()
+        assert _log_router.current() is None
+        sr.init()
+        assert _log_router.current() is not None
+        sr.exit()
+
 
 @pytest.fixture
 def session(sr: Sigrok, dev: Device) -> Session:
@@ -271,3 +488,78 @@ class TestSession:
         assert len(logic.data) == logic.length
 
         assert isinstance(end, EndPacket)
+
+    def test_packets_are_slotted(self, session: Session, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 16)
+        with session:
+            header = session.next_packet(timeout=1)
+        assert not hasattr(header, "__dict__")
+        assert header.device.model == dev.model
+
+    def test_analog_packets(self, session: Session, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 64)
+        dev.enable_channels("A0")
+
+        with session:
+            packets = [session.next_packet(timeout=1)]
+            while not isinstance(packets[-1], EndPacket):
+                packets.append(session.next_packet(timeout=1))
+
+        analog = [packet for packet in packets if isinstance(packet, AnalogPacket)]
+        assert analog
+        for packet in analog:
+            assert packet.channels == ["A0"]
+            assert len(packet.values) == packet.num_samples
+
+
+class TestSessionSources:
+    def test_periodic_timer(self, session: Session) -> None:
+        fired = threading.Event()
+        calls: list[int] = []
+
+        def tick() -> None:
+            calls.append(threading.get_ident())
+            if len(calls) == TimerCalls:
+                fired.set()
+
+        session.add_timer(0.01, tick)
+        with session:
+            assert fired.wait(timeout=5)
+        assert threading.get_ident() not in calls
+
+    def test_timer_removed_by_callback(self, session: Session) -> None:
+        calls: list[None] = []
+
+        def once() -> bool:
+            calls.append(None)
+            return False
+
+        source = session.add_timer(0.01, once)
+        with session:
+            time.sleep(0.1)
+        assert len(calls) == 1
+        assert not source.is_active
+
+    def test_remove_timer(self, session: Session) -> None:
+        source = session.add_timer(0.01, lambda: None)
+        assert source.is_active
+        source.remove()
+        assert not source.is_active
+
+    def test_fd_source(self, session: Session) -> None:
+        received = threading.Event()
+        data: list[bytes] = []
+        ours, theirs = socket.socketpair()
+        with ours, theirs:
+
+            def on_readable(fd: int, condition: IOCondition) -> None:
+                assert fd == ours.fileno()
+                assert condition & IOCondition.IN
+                data.append(ours.recv(16))
+                received.set()
+
+            session.add_fd(ours, on_readable)
+            with session:
+                theirs.send(b"ping")
+                assert received.wait(timeout=5)
+        assert data == [b"ping"]
@@ -0,0 +1,89 @@
+import functools
+from collections.abc import Callable
+
+import pytest
+
+from sigrok import (
+    ConfigKey,
+    Device,
+    EndPacket,
+    HeaderPacket,
+    LogicPacket,
+    Packet,
+    Sigrok,
+)
+from sigrok.staging import Staging, create_staging, load_native
+
+Samples = 4096
+# smaller than any logic packet of the demo driver
+TinyCapacity = 64
+
+
+@pytest.fixture(params=[False, True], ids=["python", "native"])
+def make_staging(request: pytest.FixtureRequest) -> Callable[..., Staging]:
+    """creates stagings of the python fallback and of the native helper"""
+    if request.param and load_native() is None:
+        pytest.skip("native helper not built")
+    return functools.partial(create_staging, native=request.param)
+
+
+@pytest.fixture
+def configured(dev: Device) -> Device:
+    dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, Samples)
+    dev.set_config_uint64(ConfigKey.SR_CONF_SAMPLERATE, 1_000_000)
+    for ch in dev.channels():
+        ch.enabled = ch.name == "D0"
+    return dev
+
+
+def capture(sr: Sigrok, device: Device, staging: bool | Staging) -> list[Packet]:
+    with sr.session(devices=device, staging=staging) as session:
+        packets = [session.next_packet(timeout=5)]
+        while not isinstance(packets[-1], EndPacket):
+            packets.append(session.next_packet(timeout=5))
+    return packets
+
+
+def assert_stream(packets: list[Packet]) -> None:
+    assert isinstance(packets[0], HeaderPacket)
+    assert isinstance(packets[-1], EndPacket)
+    logic = [packet for packet in packets if isinstance(packet, LogicPacket)]
+    assert sum(packet.length // packet.unitsize for packet in logic) == Samples
+
+
+def logic_data(packets: list[Packet]) -> bytes:
+    return b"".join(
+        packet.data for packet in packets if isinstance(packet, LogicPacket)
+    )
+
+
+class TestStaging:
+    def test_staging(
+        self, sr: Sigrok, configured: Device, make_staging: Callable[..., Staging]
+    ) -> None:
+        staging = make_staging()
+        assert_stream(capture(sr, configured, staging))
+        assert staging.dropped == 0
+
+    def test_default_staging(self, sr: Sigrok, configured: Device) -> None:
+        assert_stream(capture(sr, configured, staging=True))
+
+    def test_matches_unstaged_stream(
+        self, sr: Sigrok, configured: Device, make_staging: Callable[..., Staging]
+    ) -> None:
+        unstaged = capture(sr, configured, staging=False)
+        staged = capture(sr, configured, make_staging())
+        assert [type(packet) for packet in staged] == [
+            type(packet) for packet in unstaged
+        ]
+        assert logic_data(staged) == logic_data(unstaged)
+
+    def test_drops_when_full(
+        self, sr: Sigrok, configured: Device, make_staging: Callable[..., Staging]
+    ) -> None:
+        staging = make_staging(TinyCapacity)
+        packets = capture(sr, configured, staging)
+        assert not any(isinstance(packet, LogicPacket) for packet in packets)
+        assert isinstance(packets[-1], EndPacket)
+        assert staging.dropped > 0
+        assert staging.written == 0
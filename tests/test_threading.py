@@ -0,0 +1,172 @@
+import importlib
+import importlib.util
+import logging
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import sigrok.sigrok
+from sigrok import ConfigKey, Device, DeviceDriver, EndPacket, LogicPacket, Sigrok
+from sigrok.bindings import lib
+
+Threads = 8
+Samples = 100_000
+
+
+def run_concurrently(count: int, func: Callable[[], object]) -> list[object]:
+    barrier = threading.Barrier(count)
+
+    def call(_: int) -> object:
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(call, range(count)))
+
+
+@pytest.fixture
+def devices(dr: DeviceDriver) -> Iterator[list[Device]]:
+    # scanning mutates driver state and stays on one thread
+    devices = [dr.scan()[0] for _ in range(Threads)]
+    for device in devices:
+        device.open()
+        device.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, Samples)
+        device.set_config_uint64(ConfigKey.SR_CONF_SAMPLERATE, 1_000_000)
+        device.enable_channels("D0")
+    yield devices
+    for device in devices:
+        device.close()
+
+
+class TestThreadSafety:
+    def test_library_definitions_are_shared(self) -> None:
+        results = run_concurrently(Threads, lambda: lib.sr_datafeed_logic)
+        assert all(result is results[0] for result in results)
+
+    def test_lazy_attributes_are_shared(self) -> None:
+        results = run_concurrently(
+            Threads, lambda: importlib.import_module("sigrok.sigrok").ChannelType
+        )
+        assert all(result is sigrok.sigrok.ChannelType for result in results)
+
+    def test_concurrent_exit(self) -> None:
+        sr = Sigrok()
+        sr.init()
+        run_concurrently(Threads, sr.exit)
+        assert not sr.get_drivers()
+
+    def test_parallel_sessions(self, sr: Sigrok, devices: list[Device]) -> None:
+        def capture(device: Device) -> int:
+            samples = 0
+            with sr.session(devices=device) as session:
+                while not isinstance(
+                    packet := session.next_packet(timeout=5), EndPacket
+                ):
+                    if isinstance(packet, LogicPacket):
+                        samples += packet.length // packet.unitsize
+            return samples
+
+        with ThreadPoolExecutor(len(devices)) as pool:
+            assert list(pool.map(capture, devices)) == [Samples] * len(devices)
+
+
+class TestIsolatedContexts:
+    def test_logs_are_routed_per_context(self) -> None:
+        handlers = {name: RecordingHandler() for name in ("first", "second")}
+
+        def run(name: str) -> None:
+            logger = logging.getLogger(f"contexts.{name}")
+            logger.addHandler(handlers[name])
+            logger.setLevel(logging.DEBUG)
+            with Sigrok(logger=logger) as sr:
+                sr.get_driver("demo").init()
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in handlers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for name, handler in handlers.items():
+            assert handler.records
+            assert all(
+                record.name.startswith(f"contexts.{name}") for record in handler.records
+            )
+
+    def test_init_keeps_context(self) -> None:
+        with Sigrok() as sr:
+            drivers = [driver.name for driver in sr.get_drivers()]
+            sr.init()
+            assert [driver.name for driver in sr.get_drivers()] == drivers
+
+    def test_firmware_per_context(self) -> None:
+        first = Sigrok(firmware={"fw.bin": b"first"})
+        second = Sigrok(firmware={"fw.bin": b"second"})
+        assert first.resources.load("fw.bin") == b"first"
+        assert second.resources.load("fw.bin") == b"second"
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("_interpreters") is None,
+    reason="subinterpreters need python 3.13",
+)
+class TestSubinterpreter:
+    def run(self, script: str) -> None:
+        interpreters = importlib.import_module("_interpreters")
+        interpreter = interpreters.create()
+        try:
+            assert interpreters.run_string(interpreter, script) is None
+        finally:
+            interpreters.destroy(interpreter)
+
+    def test_context(self) -> None:
+        self.run(
+            "from sigrok import Sigrok\n"
+            "with Sigrok() as sr:\n"
+            "    assert sr.get_driver('demo')\n"
+        )
+
+    def test_logic_capture(self) -> None:
+        self.run(
+            "from sigrok import ConfigKey, EndPacket, LogicPacket, Sigrok\n"
+            "with Sigrok() as sr, sr.get_driver('demo') as driver:\n"
+            "    device = driver.get_device()\n"
+            "    device.enable_channels('D0', 'D1')\n"
+            "    device.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 1000)\n"
+            "    samples = 0\n"
+            "    with sr.session(devices=device) as session:\n"
+            "        while not isinstance(\n"
+            "            packet := session.next_packet(timeout=5), EndPacket\n"
+            "        ):\n"
+            "            if isinstance(packet, LogicPacket):\n"
+            "                samples += packet.length // packet.unitsize\n"
+            "    assert samples == 1000, samples\n"
+        )
+
+    def test_main_interpreter_without_private_api(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.delattr(importlib.import_module("_interpreters"), "get_main")
+        assert sigrok.sigrok._is_main_interpreter()  # noqa: SLF001 access private member
+
+    def test_logging_stays_with_main_interpreter(self) -> None:
+        self.run(
+            "from sigrok import Sigrok, SigrokSubinterpreterError\n"
+            "try:\n"
+            "    Sigrok(redirect_logging=True)\n"
+            "except SigrokSubinterpreterError:\n"
+            "    pass\n"
+            "else:\n"
+            "    raise AssertionError\n"
+        )
@@ -0,0 +1,143 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from sigrok import (
+    AnalogPacket,
+    ConfigKey,
+    Device,
+    DeviceDriver,
+    EndPacket,
+    LogicPacket,
+    Packet,
+    Session,
+    Sigrok,
+    SigrokArgError,
+    SigrokTransformNotFoundError,
+)
+from sigrok.transforms import AnalogScale, LogicDecimate, LogicInvert
+
+DecimateFactor = 3
+
+
+def first_packet(session: Session, packet_type: type[Packet]) -> Packet:
+    with session:
+        while not isinstance(packet := session.next_packet(timeout=1), EndPacket):
+            if isinstance(packet, packet_type):
+                return packet
+    pytest.fail(f"no {packet_type.__name__} received")
+
+
+class TestTransformModules:
+    def test_get_transforms(self) -> None:
+        assert {"invert", "nop", "scale"} <= {
+            transform.id for transform in Sigrok.get_transforms()
+        }
+
+    def test_options(self) -> None:
+        (factor,) = Sigrok.get_transform("scale").options()
+        assert factor.id == "factor"
+        assert factor.default == Fraction(1)
+
+    def test_transform_not_found(self) -> None:
+        with pytest.raises(SigrokTransformNotFoundError):
+            Sigrok.get_transform("does-not-exist")
+
+    def test_unknown_option(self, session: Session) -> None:
+        with pytest.raises(SigrokArgError):
+            session.add_transform("scale", gain=2)
+
+    def test_needs_device(self, sr: Sigrok) -> None:
+        with pytest.raises(SigrokArgError):
+            sr.session().add_transform("nop")
+
+    def test_device_of_multi_device_session(
+        self, sr: Sigrok, dr: DeviceDriver, dev: Device
+    ) -> None:
+        with dr.scan()[0] as other:
+            session = sr.session(devices=[dev, other])
+            with pytest.raises(SigrokArgError, match="2 devices"):
+                session.add_transform("nop")
+            session.add_transform("nop", device=other)
+
+    def test_device_not_in_session(self, session: Session, dr: DeviceDriver) -> None:
+        with dr.scan()[0] as other, pytest.raises(SigrokArgError, match="not part"):
+            session.add_transform("nop", device=other)
+
+    def test_scale(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 64)
+        dev.enable_channels("A0")
+
+        plain = first_packet(sr.session(devices=dev), AnalogPacket)
+        session = sr.session(devices=dev)
+        session.add_transform("scale", factor=Fraction(2))
+        scaled = first_packet(session, AnalogPacket)
+
+        assert isinstance(plain, AnalogPacket)
+        assert isinstance(scaled, AnalogPacket)
+        assert list(scaled.values) == [value * 2 for value in plain.values]
+
+
+class TestStages:
+    def test_stages_run_in_order(self, session: Session, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 64)
+        seen: list[str] = []
+
+        def first(packet: Packet) -> Packet:
+            seen.append("first")
+            return packet
+
+        def second(packet: Packet) -> Packet:
+            seen.append("second")
+            return packet
+
+        session.add_stage(first)
+        session.add_stage(second)
+        first_packet(session, LogicPacket)
+        assert seen[:2] == ["first", "second"]
+
+    def test_dropping_stage(self, session: Session, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 64)
+        session.add_stage(
+            lambda packet: None if isinstance(packet, LogicPacket) else packet
+        )
+        with session:
+            packets = [session.next_packet(timeout=1)]
+            while not isinstance(packets[-1], EndPacket):
+                packets.append(session.next_packet(timeout=1))
+        assert not any(isinstance(packet, LogicPacket) for packet in packets)
+
+    def test_logic_invert(self, dev: Device) -> None:
+        packet = LogicPacket.from_data(bytes([0x00, 0x01, 0xF0, 0x0F]), 2, dev)
+        inverted = LogicInvert(channels=[0, 9])(packet)
+        assert isinstance(inverted, LogicPacket)
+        assert inverted.data == bytes([0x01, 0x03, 0xF1, 0x0D])
+        assert packet.data == bytes([0x00, 0x01, 0xF0, 0x0F])
+
+    def test_logic_decimate(self, dev: Device) -> None:
+        decimate = LogicDecimate(DecimateFactor)
+        kept = [
+            decimate(LogicPacket.from_data(bytes(range(start, start + 4)), 1, dev))
+            for start in (0, 4, 8)
+        ]
+        data = b"".join(
+            packet.data for packet in kept if isinstance(packet, LogicPacket)
+        )
+        assert data == bytes(range(0, 12, DecimateFactor))
+
+    def test_analog_scale(self, sr: Sigrok, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, 64)
+        dev.enable_channels("A0")
+
+        plain = first_packet(sr.session(devices=dev), AnalogPacket)
+        session = sr.session(devices=dev)
+        session.add_stage(AnalogScale(2.0, offset=1.0))
+        scaled = first_packet(session, AnalogPacket)
+
+        assert isinstance(plain, AnalogPacket)
+        assert isinstance(scaled, AnalogPacket)
+        assert np.allclose(
+            np.frombuffer(scaled.data, dtype=np.float32),
+            np.frombuffer(plain.data, dtype=np.float32) * 2 + 1,
+        )
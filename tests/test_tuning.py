@@ -0,0 +1,89 @@
+import time
+from pathlib import Path
+
+from sigrok import ConfigKey, Device, Packet, Sigrok
+from sigrok.tuning import (
+    HostProfile,
+    ThroughputTuner,
+    TuningSettings,
+    profile_path,
+    samplerate_candidates,
+)
+
+Kilohertz = 1_000
+Megahertz = 1_000_000
+Channels = 4
+Duration = 0.05
+SlowConsumer = 0.01
+
+
+def slow_consumer(_packet: Packet) -> None:
+    time.sleep(SlowConsumer)
+
+
+class TestSamplerateCandidates:
+    def test_listed(self) -> None:
+        samplerates = [Megahertz, Kilohertz]
+        assert samplerate_candidates({"samplerates": samplerates}) == sorted(
+            samplerates
+        )
+
+    def test_steps(self) -> None:
+        assert samplerate_candidates(
+            {"samplerate-steps": (2 * Kilohertz, Megahertz, 1)}
+        ) == [
+            2 * Kilohertz,
+            5 * Kilohertz,
+            10 * Kilohertz,
+            20 * Kilohertz,
+            50 * Kilohertz,
+            100 * Kilohertz,
+            200 * Kilohertz,
+            500 * Kilohertz,
+            Megahertz,
+        ]
+
+
+class TestHostProfile:
+    def test_empty(self, tmp_path: Path) -> None:
+        assert HostProfile.load(tmp_path / "profile.json").settings == {}
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        settings = TuningSettings(Megahertz, Channels, staging_capacity=Megahertz)
+        profile = HostProfile(tmp_path / "host" / "profile.json", {"demo": settings})
+        profile.save()
+        assert HostProfile.load(profile.path).settings == {"demo": settings}
+
+    def test_profile_path(self) -> None:
+        assert profile_path("lab-pc").name == "tuning-lab-pc.json"
+
+
+class TestThroughputTuner:
+    def test_calibrate(self, sr: Sigrok, dev: Device) -> None:
+        tuner = ThroughputTuner(sr, dev, duration=Duration)
+        calibration = tuner.calibrate(TuningSettings(Kilohertz * 100, Channels))
+        assert calibration.samples == int(Kilohertz * 100 * Duration)
+        assert tuner.is_safe(calibration)
+        assert sum(ch.enabled for ch in dev.channels()) == Channels
+
+    def test_tune_restores_config(self, sr: Sigrok, dev: Device) -> None:
+        samplerate = dev.config[ConfigKey.SR_CONF_SAMPLERATE]
+        settings = ThroughputTuner(sr, dev, duration=Duration).tune(Channels)
+        assert settings is not None
+        assert settings.channels == Channels
+        assert dev.config[ConfigKey.SR_CONF_SAMPLERATE] == samplerate
+
+    def test_tune_apply(self, sr: Sigrok, dev: Device) -> None:
+        settings = ThroughputTuner(sr, dev, duration=Duration).tune(
+            Channels, apply=True
+        )
+        assert settings is not None
+        assert dev.config[ConfigKey.SR_CONF_SAMPLERATE] == settings.samplerate
+
+    def test_slow_consumer(self, sr: Sigrok, dev: Device) -> None:
+        fast = ThroughputTuner(sr, dev, duration=Duration).tune(Channels)
+        slow = ThroughputTuner(sr, dev, duration=Duration, consumer=slow_consumer).tune(
+            Channels, staging=False
+        )
+        assert fast is not None
+        assert slow is None or slow.samplerate < fast.samplerate
@@ -0,0 +1,180 @@
+import threading
+from types import SimpleNamespace
+from typing import cast
+
+from sigrok import DeviceDriver
+from sigrok.watch import DeviceEvent, DeviceKey, DeviceWatcher, device_keys
+
+
+class FakeDevice(SimpleNamespace):
+    is_open = False
+    # the scan which created the instance
+    scan = 0
+
+    def _rebind(self, device: "FakeDevice") -> None:
+        self.scan = device.scan
+
+
+class FakeDriver:
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.devices: list[FakeDevice] = []
+        self.scans: list[str | None] = []
+        self.clears = 0
+
+    def plug(self, serial_number: str | None, conn: str = "1.2") -> None:
+        self.devices.append(
+            FakeDevice(
+                connection_identifier=conn, serial_number=serial_number, model="Fake"
+            )
+        )
+
+    def unplug(self, serial_number: str) -> None:
+        self.devices = [
+            device for device in self.devices if device.serial_number != serial_number
+        ]
+
+    def clear(self) -> None:
+        self.clears += 1
+
+    def scan(self, options: dict[str, str] | None = None) -> list[FakeDevice]:
+        conn = (options or {}).get("conn")
+        self.scans.append(conn)
+        # every scan builds new instances, like libsigrok drivers do
+        return [
+            FakeDevice(**{**vars(device), "scan": len(self.scans)})
+            for device in self.devices
+            if conn is None or device.connection_identifier == conn
+        ]
+
+
+def watcher(driver: FakeDriver, **kwargs: object) -> DeviceWatcher:
+    return DeviceWatcher(driver, **kwargs)  # type: ignore[arg-type]
+
+
+class TestDeviceKeys:
+    def test_identical_devices(self) -> None:
+        device = SimpleNamespace(
+            connection_identifier=None, serial_number=None, model="Demo"
+        )
+        keys = device_keys("demo", [device, device])  # type: ignore[list-item]
+        assert [key.occurrence for key in keys] == [0, 1]
+
+    def test_serial_number_over_port(self) -> None:
+        before, after = (
+            SimpleNamespace(connection_identifier=conn, serial_number="A", model="X")
+            for conn in ("1.2", "1.3")
+        )
+        assert device_keys("fake", [before]).keys() == (  # type: ignore[list-item]
+            device_keys("fake", [after]).keys()  # type: ignore[list-item]
+        )
+
+
+class TestDeviceWatcher:
+    def test_debounces_added(self) -> None:
+        driver = FakeDriver()
+        watch = watcher(driver, debounce=2)
+        driver.plug("A")
+        assert watch.poll() == []
+        (event,) = watch.poll()
+        assert event.kind == "added"
+        assert event.key.serial_number == "A"
+        assert list(watch.devices) == [event.key]
+
+    def test_keeps_known_instances(self) -> None:
+        driver = FakeDriver()
+        watch = watcher(driver, debounce=1)
+        driver.plug("A")
+        (event,) = watch.poll()
+        assert watch.poll() == []
+        assert watch.devices[event.key] is event.device
+
+    def test_rebinds_known_instances(self) -> None:
+        driver = FakeDriver()
+        watch = watcher(driver, debounce=1)
+        driver.plug("A")
+        (event,) = watch.poll()
+        watch.poll()
+        assert cast("FakeDevice", event.device).scan == len(driver.scans)
+        assert driver.clears == len(driver.scans)
+
+    def test_skips_driver_while_open(self) -> None:
+        driver = FakeDriver()
+        watch = watcher(driver, debounce=1)
+        driver.plug("A")
+        (event,) = watch.poll()
+        cast("FakeDevice", event.device).is_open = True
+        driver.unplug("A")
+        assert watch.poll() == []
+        assert driver.scans == [None]
+        assert list(watch.devices) == [event.key]
+
+    def test_skips_ports_while_open(self) -> None:
+        driver = FakeDriver()
+        watch = watcher(driver, debounce=1)
+        watch.conns = ["ttyUSB0", "ttyUSB1"]
+        driver.plug(None, conn="ttyUSB0")
+        (event,) = watch.poll()
+        cast("FakeDevice", event.device).is_open = True
+        driver.plug(None, conn="ttyUSB1")
+        (added,) = watch.poll()
+        assert added.key.connection_identifier == "ttyUSB1"
+        assert driver.scans == ["ttyUSB0", "ttyUSB1", "ttyUSB1"]
+        assert driver.clears == 1
+        assert [key.connection_identifier for key in watch.devices] == watch.conns
+
+    def test_removed(self) -> None:
+        driver = FakeDriver()
+        watch = watcher(driver, debounce=2)
+        driver.plug("A")
+        watch.poll()
+        watch.poll()
+        driver.unplug("A")
+        assert watch.poll() == []
+        assert [event.kind for event in watch.poll()] == ["removed"]
+        assert not watch.devices
+
+    def test_ignores_glitches(self) -> None:
+        driver = FakeDriver()
+        watch = watcher(driver, debounce=2)
+        driver.plug("A")
+        watch.poll()
+        watch.poll()
+        driver.unplug("A")
+        watch.poll()
+        driver.plug("A")
+        assert watch.poll() == []
+        assert len(watch.devices) == 1
+
+    def test_backs_off(self) -> None:
+        watch = watcher(FakeDriver(), interval=1.0, max_interval=3.0)
+        for _ in range(3):
+            watch.poll()
+        assert watch._current_interval == watch.max_interval  # noqa: SLF001 access private member
+
+    def test_background(self) -> None:
+        driver = FakeDriver()
+        received: list[DeviceEvent] = []
+        added = threading.Event()
+
+        def on_event(event: DeviceEvent) -> None:
+            received.append(event)
+            added.set()
+
+        driver.plug("A")
+        with watcher(driver, interval=0.01, debounce=1, on_event=on_event) as watch:
+            assert added.wait(timeout=5)
+            assert watch.next_event(timeout=1) == received[0]
+        assert not watch.is_running
+
+    def test_demo_driver(self, dr: DeviceDriver) -> None:
+        watch = DeviceWatcher(dr, debounce=1)
+        (event,) = watch.poll()
+        assert event.key == DeviceKey("demo", None, None, "Demo device", 0)
+
+    def test_demo_driver_rescan(self, dr: DeviceDriver) -> None:
+        watch = DeviceWatcher(dr, debounce=1)
+        (event,) = watch.poll()
+        assert watch.poll() == []
+        assert event.device.model == "Demo device"
@@ -0,0 +1,130 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from sigrok import ConfigKey, Device, Session
+from sigrok.windows import SampleWindows
+
+SplitSeed = 7
+Samples = 10_000
+Unitsize = 2
+WindowSize = 1000
+Overlap = 100
+LimitSamples = 4096
+
+
+def stream() -> bytes:
+    return np.random.default_rng(SplitSeed).bytes(Samples * Unitsize)
+
+
+def split(data: bytes, sizes: list[int]) -> list[bytes]:
+    bounds = np.cumsum([0, *sizes]) * Unitsize
+    return [data[start:end] for start, end in itertools.pairwise(bounds)]
+
+
+def reference(data: bytes, size: int, overlap: int) -> list[tuple[int, bytes]]:
+    step = size - overlap
+    return [
+        (offset, data[offset * Unitsize : (offset + size) * Unitsize])
+        for offset in range(0, Samples - size + 1, step)
+    ]
+
+
+def collect(windows: SampleWindows, packets: list[bytes]) -> list[tuple[int, bytes]]:
+    # buffered windows get reused, they are compared right away
+    return [
+        (window.offset, bytes(window.data))
+        for packet in packets
+        for window in windows.feed_data(packet, Unitsize)
+    ]
+
+
+class TestSampleWindows:
+    @pytest.mark.parametrize("overlap", [0, 1, Overlap, WindowSize - 1])
+    def test_independent_of_packet_sizes(self, overlap: int) -> None:
+        data = stream()
+        rng = np.random.default_rng(SplitSeed)
+        sizes = rng.integers(1, 3 * WindowSize, size=Samples).tolist()
+        while sum(sizes) > Samples:
+            sizes.pop()
+        sizes.append(Samples - sum(sizes))
+
+        assert collect(SampleWindows(WindowSize, overlap), split(data, sizes)) == (
+            reference(data, WindowSize, overlap)
+        )
+
+    def test_single_samples(self) -> None:
+        data = stream()
+        assert collect(
+            SampleWindows(WindowSize, Overlap), split(data, [1] * Samples)
+        ) == reference(data, WindowSize, Overlap)
+
+    def test_windows_within_packets_are_views(self) -> None:
+        data = stream()
+        windows = SampleWindows(WindowSize, Overlap).feed_data(data, Unitsize)
+        assert all(window.data.obj is data for window in windows)
+
+    def test_buffers_are_reused(self) -> None:
+        windows = SampleWindows(WindowSize)
+        third = WindowSize // 3
+        buffers = {
+            id(window.data.obj)
+            for packet in split(stream(), [third] * (Samples // third))
+            for window in windows.feed_data(packet, Unitsize)
+        }
+        assert buffers == {id(buffer.obj) for buffer in windows._buffers}  # noqa: SLF001 access private member
+
+    def test_copy_outlives_buffer(self) -> None:
+        data = stream()
+        windows = SampleWindows(WindowSize)
+        kept = [
+            window.copy()
+            for packet in split(
+                data, [WindowSize // 2] * (Samples // (WindowSize // 2))
+            )
+            for window in windows.feed_data(packet, Unitsize)
+        ]
+        assert [(w.offset, bytes(w.data)) for w in kept] == reference(
+            data, WindowSize, 0
+        )
+
+    def test_flush(self) -> None:
+        windows = SampleWindows(WindowSize, Overlap)
+        data = stream()[: (WindowSize + Overlap) * Unitsize]
+        (window,) = windows.feed_data(data, Unitsize)
+        rest = windows.flush()
+        assert rest is not None
+        assert rest.offset == WindowSize - Overlap
+        assert bytes(rest.data) == data[rest.offset * Unitsize :]
+        assert windows.flush() is None
+
+    def test_array(self) -> None:
+        (window,) = SampleWindows(WindowSize).feed_data(stream(), Unitsize)[:1]
+        assert window.array().shape == (WindowSize, Unitsize)
+        assert window.samples == WindowSize
+
+    @pytest.mark.parametrize(
+        ("size", "overlap"), [(0, 0), (WindowSize, WindowSize), (WindowSize, -1)]
+    )
+    def test_invalid(self, size: int, overlap: int) -> None:
+        with pytest.raises(ValueError, match="must be"):
+            SampleWindows(size, overlap)
+
+    def test_unitsize_change(self) -> None:
+        windows = SampleWindows(WindowSize)
+        windows.feed_data(bytes(4), 1)
+        with pytest.raises(ValueError, match="unitsize changed"):
+            windows.feed_data(bytes(4), 2)
+
+    def test_session(self, session: Session, dev: Device) -> None:
+        dev.set_config_uint64(ConfigKey.SR_CONF_LIMIT_SAMPLES, LimitSamples)
+        with session:
+            windows = list(
+                SampleWindows(WindowSize, Overlap).windows(
+                    session, timeout=1, partial=True
+                )
+            )
+        assert [window.offset for window in windows] == list(
+            range(0, LimitSamples - Overlap, WindowSize - Overlap)
+        )